@@ -1,3 +1,22 @@
-from .agent import VoiceAgent
-from .voice_handler import VoiceHandler
-from .rag_handler import RAGHandler
+# Exports are imported on first access so that importing one submodule (e.g. agent.providers)
+# does not pull in livekit, openai or qdrant
+import importlib
+
+_EXPORTS = {
+    'ProductionVoiceAgent': ('.agent', 'ProductionVoiceAgent'),
+    'VoiceAgent': ('.agent', 'ProductionVoiceAgent'),
+    'VoiceHandler': ('.voice_handler', 'VoiceHandler'),
+    'RAGHandler': ('.rag_handler', 'RAGHandler'),
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module, attr = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), attr)
+    globals()[name] = value
+    return value
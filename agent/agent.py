@@ -1,46 +1,140 @@
 import asyncio
 import os
 import logging
-import json
-import numpy as np
-from typing import Dict, Any, List, AsyncGenerator
-from livekit import rtc, api
-from openai import AsyncOpenAI
-import torch
+import threading
 import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 
-# Import new production components
-from security.ai-security.prompt_firewall import PromptFirewall, ToolCallAllowlists, ResponseValidator, PolicyEngine
-from audio_processing.voice_pipeline import VoicePipeline
-from agent.reliability.state_machine import AgentStateMachine
-from cost_optimization.control import CostController
+# Started before the imports below to time them (startup report); hence the E402 waivers
+_IMPORT_START = time.perf_counter()
+
+from livekit import rtc, api  # noqa: E402
+
+# Light components; heavy ones (openai, numpy-backed audio pipeline) are imported on first use
+from security.ai_security.prompt_firewall import PromptFirewall, ToolCallAllowlists, ResponseValidator, PolicyEngine  # noqa: E402
+from audio_processing.metrics import serve_prometheus  # noqa: E402
+from agent.reliability.state_machine import AgentStateMachine  # noqa: E402
+from agent.conversation_manager import ConversationManager  # noqa: E402
+from cost_optimization.control import CostController  # noqa: E402
+
+if TYPE_CHECKING:
+    from audio_processing.outbound import OutboundStage
+    from audio_processing.streaming_session import StreamingSession
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("production-voice-agent")
 
+END_CALL_NOTICE = "I'm sorry, I have to end our call now. Please try again a little later. Goodbye."
+
+
+class _component:
+    """Agent component built on first access (or by prewarm) with its build time recorded."""
+    def __init__(self, build: Callable[[Any], Any]):
+        self.build = build
+        self.name = build.__name__
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        # Once built the instance attribute shadows this (non-data) descriptor; one lock
+        # per component so prewarm threads build different components in parallel
+        with agent._build_locks.setdefault(self.name, threading.Lock()):
+            if self.name not in agent.__dict__:
+                start = time.perf_counter()
+                agent.__dict__[self.name] = self.build(agent)
+                agent.startup[self.name] = round((time.perf_counter() - start) * 1000, 2)
+        return agent.__dict__[self.name]
+
+
 class ProductionVoiceAgent:
     """Production-ready multi-modal voice AI agent with safety, reliability, and cost controls."""
-    
+    # Built concurrently in the background while the room connects
+    PREWARM = ('pipeline', 'openai', 'firewall', 'allowlists', 'validator', 'policy', 'cost_controller')
+
     def __init__(self, config: Dict[str, Any] = None):
+        created = time.perf_counter()
         self.config = config or self._load_default_config()
-        self.openai = AsyncOpenAI(api_key=self.config['openai_key'])
-        
-        # Security Components
-        self.firewall = PromptFirewall()
-        self.allowlists = ToolCallAllowlists()
-        self.validator = ResponseValidator()
-        self.policy = PolicyEngine()
-        
-        # Performance & Reliability Components
-        self.pipeline = VoicePipeline(self.config)
+        self.startup: Dict[str, float] = {'import': _IMPORT_MS}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._prewarm_task = None
+        self._calls: Dict["StreamingSession", "OutboundStage"] = {}  # live inbound tracks
+        self._ending = set()                                          # sessions winding down
+
+        # Reliability Components (needed before the first event)
         self.state_machine = AgentStateMachine()
-        self.cost_controller = CostController()
-        
+        self.conversations = ConversationManager()
+        self.session_id = f"agent-{id(self):x}"  # the room name once connected
+        self._turn_route = None  # RoutingDecision committed by the current turn, if any
+
         # LiveKit state
-        self.room = rtc.Room()
         self.url = self.config.get('livekit_url', "ws://localhost:7880")
         self.api_key = self.config.get('livekit_api_key', "devkey")
         self.api_secret = self.config.get('livekit_api_secret', "devsecret")
+        self.startup['init'] = round((time.perf_counter() - created) * 1000, 2)
+
+    @_component
+    def openai(self):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=self.config['openai_key'])
+
+    # Security Components
+    @_component
+    def firewall(self):
+        return PromptFirewall()
+
+    @_component
+    def allowlists(self):
+        return ToolCallAllowlists()
+
+    @_component
+    def validator(self):
+        return ResponseValidator()
+
+    @_component
+    def policy(self):
+        return PolicyEngine()
+
+    # Performance & Cost Components
+    @_component
+    def pipeline(self):
+        from audio_processing.voice_pipeline import VoicePipeline
+        pipeline = VoicePipeline(self.config)
+        if self.config.get('complexity_routing', True):
+            pipeline.model_router = self._route_model
+        return pipeline
+
+    @_component
+    def cache_faq(self):
+        from security.ai_security.pattern_matcher import PatternSet
+        return PatternSet(self.config.get('semantic_cache_faq', []))
+
+    @_component
+    def cost_controller(self):
+        return CostController()
+
+    @_component
+    def room(self):
+        return rtc.Room()
+
+    async def prewarm(self) -> None:
+        """Build every component concurrently off the loop, then pre-synthesize fillers."""
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(asyncio.to_thread(getattr, self, name) for name in self.PREWARM))
+            # Filler audio must be ready before the first slow turn
+            await self.pipeline.prepare_fillers()
+            # Fleet kill switch: flags cached locally, in-flight calls told on change
+            await self.cost_controller.kill_flags.start()
+            self.cost_controller.kill_flags.on_change(self._on_kill_switch)
+            self.cost_controller.cost_meter.start()
+        except Exception as e:
+            logger.error(f"Prewarm failed (components will build on first use): {e}")
+        self.startup['prewarm'] = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"Startup report (ms): {self.startup_report()}")
+
+    def startup_report(self) -> Dict[str, float]:
+        """Milliseconds spent on module import, __init__, connect, prewarm and each component."""
+        return dict(self.startup)
 
     def _load_default_config(self) -> Dict[str, Any]:
         return {
@@ -51,10 +145,13 @@ class ProductionVoiceAgent:
             'tenant_tier': 'enterprise',
             'voice_id': '21m00Tcm4TlvDq8ikWAM',
             'policy': {'min_confidence': 0.8},
-            'tenant': {'compliance': 'hipaa', 'id': 'tenant_123'}
+            'tenant': {'compliance': 'hipaa', 'id': 'tenant_123', 'fillers': True}
         }
 
     async def start(self, room_name: str, participant_name: str = "DukatAgent"):
+        self.session_id = room_name
+        # Heavy components build while we connect; a call arriving first builds what it needs
+        self._prewarm_task = asyncio.create_task(self.prewarm())
         token = self._generate_token(room_name, participant_name)
         
         @self.room.on("track_subscribed")
@@ -65,7 +162,9 @@ class ProductionVoiceAgent:
 
         try:
             logger.info(f"Connecting to {room_name}...")
+            connect_start = time.perf_counter()
             await self.room.connect(self.url, token)
+            self.startup['connect'] = round((time.perf_counter() - connect_start) * 1000, 2)
             self.state_machine.transition('start_call')
             logger.info("Connected and LISTENING")
         except Exception as e:
@@ -78,51 +177,222 @@ class ProductionVoiceAgent:
         return grant.to_jwt()
 
     async def _process_audio_stream(self, track: rtc.RemoteAudioTrack):
+        from audio_processing.jitter_buffer import AdaptiveJitterBuffer
+        from audio_processing.outbound import OutboundStage
+        from audio_processing.streaming_session import StreamingSession
+
         audio_stream = rtc.AudioStream(track)
         
         # Audio source for responding
         source = rtc.AudioSource(48000, 1)
         res_track = rtc.LocalAudioTrack.create_audio_track("agent-response", source)
         await self.room.local_participant.publish_track(res_track)
+        recorder = self._open_recorder(track)
+
+        async def capture(frame: rtc.AudioFrame):
+            if recorder:
+                recorder.outbound(frame.data)
+            await source.capture_frame(frame)
+
+        # TTS audio -> exact 20 ms frames (reused, never reallocated) paced into the source
+        outbound = OutboundStage(
+            capture, sample_rate=48000, frame_ms=20,
+            src_rate=self.pipeline.tts_sample_rate,
+            factory=lambda: rtc.AudioFrame.create(48000, 1, 960),
+        )
+
+        # 1. Low-latency Pipeline (VAD + ASR): one long-lived session per track keeps
+        # VAD/ASR state across frames and only fires an LLM turn on end-of-utterance.
+        tenant_id = self.config.get('tenant', {}).get('id', 'default')
+        call_id = f"{self.session_id}:{track.sid}"
+        # Each track meters to its own call; the meter rides on the session down every turn
+        call = self.cost_controller.cost_meter.open_call(call_id, tenant_id)
+        session = StreamingSession(
+            self.pipeline,
+            on_utterance=lambda text: self._handle_turn(text, outbound, session),
+            on_interrupt=lambda: self._on_barge_in(source),
+            sample_rate=48000,
+            usage=call,
+        )
+        # Reorder/pace inbound frames and conceal gaps before VAD/ASR see them
+        jitter = AdaptiveJitterBuffer(sample_rate=48000)
+        frames = jitter.paced(audio_frame.data async for audio_frame in audio_stream)
+        self._calls[session] = outbound
+        try:
+            await session.run(self._tap_inbound(frames, recorder) if recorder else frames)
+        finally:
+            self._calls.pop(session, None)
+            self.cost_controller.cost_meter.close_call(call_id)
+            logger.info(f"Call cost ${call.cost:.4f}: {call.usage}")
+            logger.info(f"Inbound jitter buffer: {jitter.stats()}")
+            if recorder:
+                recorder.close()
+        if session in self._ending:
+            self._ending.discard(session)
+            await self.room.disconnect()
+
+    def _open_recorder(self, track: rtc.RemoteAudioTrack):
+        """Stereo call recording (caller/agent) for compliance tenants or when record_calls is set."""
+        tenant = self.config.get('tenant', {})
+        if not self.config.get('record_calls', tenant.get('compliance') in ('hipaa', 'ng911')):
+            return None
+        from audio_processing.recorder import CallRecorder
+        directory = os.getenv("RECORDINGS_DIR", "recordings")
+        os.makedirs(directory, exist_ok=True)
+        container = self.config.get('recording_container', 'wav')
+        path = os.path.join(directory, f"{tenant.get('id', 'default')}-{track.sid}-{int(time.time())}.{container}")
+        return CallRecorder(path, sample_rate=48000, container=container)
+
+    @staticmethod
+    async def _tap_inbound(frames, recorder):
+        async for pcm in frames:
+            recorder.inbound(pcm)
+            yield pcm
+
+    def _route_model(self, text: str, commit: bool = True) -> str:
+        """Small or large model for this turn from its complexity and the conversation so far.
+
+        Speculation on a partial transcript passes ``commit=False``: only the final transcript
+        counts as a routed turn.
+        """
+        history = self.conversations.get_history(self.session_id)
+        if not commit:
+            return self.cost_controller.peek_model(self.session_id, text, history)
+        self._turn_route = self.cost_controller.router.route(self.session_id, text, history)
+        return self._turn_route.model
+
+    def _cache_context(self, text: str) -> Optional[str]:
+        """Cache key context for a turn whose reply does not depend on the call so far, else None.
+
+        Only the caller's first turn and allowlisted FAQ questions (``semantic_cache_faq``
+        patterns) qualify: a bare "yes" mid-call means something different in every call.
+        """
+        if not self.config.get('semantic_cache', True):
+            return None
+        if self.cache_faq.search(text) is not None:
+            return ""
+        if self.conversations.get_history(self.session_id):
+            return None
+        return ""
+
+    def _on_kill_switch(self, scope: str, reason: Optional[str]) -> None:
+        tenant_id = self.config.get('tenant', {}).get('id', 'default')
+        if reason and self.cost_controller.is_killed(tenant_id):
+            for session, outbound in list(self._calls.items()):
+                asyncio.ensure_future(self._wind_down(session, outbound, reason))
+
+    async def _wind_down(self, session: "StreamingSession", outbound: "OutboundStage", reason: str):
+        """Kill switch mid-call: let the current reply finish (bounded), then say goodbye and hang up."""
+        if session in self._ending:
+            return
+        self._ending.add(session)
+        logger.warning(f"Ending call on kill switch: {reason}")
+        await session.finish_turn(self.config.get('kill_switch_grace_s', 1.0))
+        await self._end_call(session, outbound)
 
-        async for audio_frame in audio_stream:
-            # 1. Low-latency Pipeline (Neural VAD + ASR)
-            # In a real scenario, we'd pass the stream to the pipeline
-            # Here we simulate with the frame data
-            async for response_chunk in self.pipeline.process_stream(audio_frame.data):
-                self.state_machine.transition('speech_detected')
-                
-                # 2. Safety & Policy Checks (Simulated on text)
-                # In real code, this happens between ASR and LLM
-                transcription = "I need medical advice" # Mocked from ASR
-                
-                if not await self.firewall.filter(transcription):
-                    logger.warning("Blocked prompt detected")
-                    self.state_machine.transition('error')
-                    continue
-
-                # 3. LLM Processing with Cost Control
-                if not self.cost_controller.budget_tokens(self.config['tenant_tier'], 100):
-                    self.cost_controller.kill_switch()
-                    break
-
-                self.state_machine.transition('response_ready')
-                
-                # 4. Synthesize & Stream back to Room
-                # chunk is simulated audio from pipeline
-                # await source.capture_frame(rtc.AudioFrame(response_chunk, ...))
-                pass
-
-            self.state_machine.transition('done')
+    async def _end_call(self, session: "StreamingSession", outbound: "OutboundStage"):
+        self._ending.add(session)
+        notice = self.config.get('end_call_notice', END_CALL_NOTICE)
+        await outbound.play(self.pipeline.speak(notice, session.usage))
+        session.stop()
+
+    def _on_barge_in(self, source: rtc.AudioSource):
+        # The turn task is already cancelled; drop audio queued for playout and listen again
+        source.clear_queue()
+        self.state_machine.transition('interrupt')
+        logger.info("Caller barged in; response cancelled")
+
+    async def _handle_turn(self, transcription: str, outbound: "OutboundStage", session: "StreamingSession"):
+        tenant_id = self.config.get('tenant', {}).get('id', 'default')
+        if session in self._ending:
+            return  # goodbye already playing or played
+        reason = self.cost_controller.is_killed(tenant_id)  # local flag, no network
+        if reason:
+            logger.warning(f"Kill switch active ({reason}); ending call")
+            await self._end_call(session, outbound)
+            return
+
+        self.state_machine.transition('speech_detected')
+
+        # 2. Safety & Policy Checks on the final transcript
+        if not await self.firewall.filter(transcription, tenant_id):
+            logger.warning("Blocked prompt detected")
+            self.state_machine.transition('error')
+            return
+
+        # 3. LLM Processing with Cost Control
+        if not await self.cost_controller.budget_tokens(tenant_id, 100, self.config['tenant_tier']):
+            logger.warning(f"Token budget exhausted for {tenant_id}; ending call")
+            self.state_machine.transition('error')
+            await self._end_call(session, outbound)
+            return
+        if not self.cost_controller.within_cap(tenant_id):
+            logger.warning(f"Daily cost cap reached for {tenant_id}; ending call")
+            self.state_machine.transition('error')
+            await self._end_call(session, outbound)
+            return
+
+        self.state_machine.transition('response_ready')
+
+        # 4. Synthesize & Stream back to Room; repeated questions skip the LLM entirely
+        started = time.perf_counter()
+        self._turn_route = None
+        cached = None
+        context = self._cache_context(transcription)
+        if context is not None:
+            cached = await self.cost_controller.semantic_cache_check(transcription, tenant_id, context)
+        if cached is not None:
+            await outbound.play(self.pipeline.speak(cached, session.usage))
+            reply = cached
+        else:
+            await outbound.play(self.pipeline.respond(transcription, session.usage))
+            reply = self.pipeline.last_response
+            # Shortened (degraded) replies are fine once, not for every later caller
+            if context is not None and reply and not self.pipeline.active_degradations:
+                await self.cost_controller.semantic_cache_store(transcription, reply, tenant_id, context)
+
+        self.conversations.add_message(self.session_id, 'user', transcription)
+        if reply:
+            self.conversations.add_message(self.session_id, 'assistant', reply)
+        # Cached and cheaper_model turns never routed: they are logged apart from routed outcomes
+        self.cost_controller.router.record_outcome(
+            self.session_id, self._turn_route, turn_ms=round((time.perf_counter() - started) * 1000, 1),
+            completed=bool(reply), cached=cached is not None,
+            degradations=sorted(self.pipeline.active_degradations) if cached is None else [])
+
+        self.state_machine.transition('done')
 
     async def wait_until_disconnected(self):
         while self.room.is_connected():
             await asyncio.sleep(1)
+        self.cost_controller.router.end_session(self.session_id)
+        self.cost_controller.kill_flags.remove_listener(self._on_kill_switch)
+
+    @staticmethod
+    async def shutdown():
+        """Process exit (after every room has ended): hand back budget leases, flush usage."""
+        await CostController().close()
 
 async def main():
-    agent = ProductionVoiceAgent()
-    await agent.start("test-room")
-    await agent.wait_until_disconnected()
+    rooms = os.getenv("AGENT_ROOMS", "test-room").split(",")
+    workers = int(os.getenv("AGENT_WORKERS", "0")) or None  # default: one per core
+    metrics_port = int(os.getenv("METRICS_PORT", "8000"))
+    if workers == 1:
+        from agent.loop_profiler import start_loop_profiler
+        await serve_prometheus(metrics_port)
+        start_loop_profiler()
+        agent = ProductionVoiceAgent()
+        try:
+            await agent.start(rooms[0])
+            await agent.wait_until_disconnected()
+        finally:
+            await ProductionVoiceAgent.shutdown()
+        return
+
+    from agent.worker_pool import run_supervisor
+    await run_supervisor(rooms, workers, metrics_port)
+
+_IMPORT_MS = round((time.perf_counter() - _IMPORT_START) * 1000, 2)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
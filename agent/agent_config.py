@@ -8,3 +8,11 @@ class AgentConfig:
         self.llm_provider = os.getenv("LLM_PROVIDER", "openai")
         self.tts_provider = os.getenv("TTS_PROVIDER", "elevenlabs")
         self.sample_rate = 48000
+        # Provider connection pools (see agent/providers.py)
+        self.provider_limit_per_host = int(os.getenv("PROVIDER_LIMIT_PER_HOST", "20"))
+        self.provider_keepalive_s = float(os.getenv("PROVIDER_KEEPALIVE_S", "60"))
+        self.provider_warm_connections = int(os.getenv("PROVIDER_WARM_CONNECTIONS", "2"))
+        self.provider_health_interval_s = float(os.getenv("PROVIDER_HEALTH_INTERVAL_S", "30"))
+
+    def provider_selection(self):
+        return {'stt': self.stt_provider, 'llm': self.llm_provider, 'tts': self.tts_provider}
@@ -0,0 +1,107 @@
+"""
+Local fake STT/LLM/TTS provider server (Deepgram/OpenAI/ElevenLabs-shaped) for tests and load runs.
+"""
+import asyncio
+import json
+import random
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from aiohttp import web
+
+LatencyFn = Callable[[], float]  # returns seconds
+
+
+def fixed(seconds: float) -> LatencyFn:
+    return lambda: seconds
+
+
+def lognormal(median_ms: float, sigma: float = 0.5, rng: Optional[random.Random] = None) -> LatencyFn:
+    """Latency with a long right tail, like real provider APIs."""
+    import math
+    rng = rng or random.Random()
+    return lambda: rng.lognormvariate(math.log(median_ms / 1000.0), sigma)
+
+
+class FakeProviderServer:
+    """Speaks just enough of each provider API for the real provider clients to run against it."""
+    def __init__(self, transcript: str = "How do I set up my account?",
+                 reply: str = "Sure. Open settings, then follow the onboarding wizard.",
+                 latency: Optional[Dict[str, LatencyFn]] = None,
+                 token_interval: float = 0.0, audio_bytes: int = 32000, chunk_bytes: int = 3200):
+        self.transcript = transcript
+        self.reply = reply
+        self.latency = latency or {}    # 'stt' | 'llm' | 'tts' -> seconds to first byte
+        self.token_interval = token_interval
+        self.audio_bytes = audio_bytes
+        self.chunk_bytes = chunk_bytes
+        self.connections: Set[Tuple[str, int]] = set()
+        self.requests: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    async def _delay(self, kind: str) -> None:
+        fn = self.latency.get(kind)
+        if fn:
+            await asyncio.sleep(fn())
+
+    def _seen(self, request: web.Request, kind: str) -> None:
+        peer = request.transport.get_extra_info("peername") if request.transport else None
+        if peer:
+            self.connections.add(tuple(peer[:2]))
+        self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    async def health(self, request: web.Request) -> web.Response:
+        self._seen(request, "health")
+        return web.json_response({"ok": True})
+
+    async def listen(self, request: web.Request) -> web.Response:
+        self._seen(request, "stt")
+        await request.read()
+        await self._delay("stt")
+        return web.json_response(
+            {"results": {"channels": [{"alternatives": [{"transcript": self.transcript}]}]}})
+
+    async def chat(self, request: web.Request) -> web.StreamResponse:
+        self._seen(request, "llm")
+        await request.json()
+        await self._delay("llm")
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        for token in self.reply.split(" "):
+            event = {"choices": [{"delta": {"content": token + " "}}]}
+            await resp.write(f"data: {json.dumps(event)}\n\n".encode())
+            if self.token_interval:
+                await asyncio.sleep(self.token_interval)
+        await resp.write(b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+    async def speech(self, request: web.Request) -> web.StreamResponse:
+        self._seen(request, "tts")
+        await request.json()
+        await self._delay("tts")
+        resp = web.StreamResponse(headers={"Content-Type": "audio/pcm"})
+        await resp.prepare(request)
+        for _ in range(0, self.audio_bytes, self.chunk_bytes):
+            await resp.write(b"\x00" * self.chunk_bytes)
+        await resp.write_eof()
+        return resp
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        for path in ("/v1/projects", "/v1/models", "/v1/user"):
+            app.router.add_get(path, self.health)
+        app.router.add_post("/v1/listen", self.listen)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        app.router.add_post("/v1/text-to-speech/{voice_id}/stream", self.speech)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
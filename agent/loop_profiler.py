@@ -0,0 +1,213 @@
+"""
+Loop profiler: continuous event-loop lag plus stack samples of stalls, attributed to the blocking module/function.
+"""
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import signal
+import sys
+import sysconfig
+import threading
+import time
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+logger = logging.getLogger("loop-profiler")
+
+# Frames from these trees are library code; attribution goes to the innermost frame outside them
+_LIBRARY_PATHS = tuple(sorted({os.path.realpath(p) for key in ('stdlib', 'platstdlib', 'purelib', 'platlib')
+                               if (p := sysconfig.get_paths().get(key))}, key=len, reverse=True))
+
+Frame = Tuple[str, str, int]  # (module, function, line)
+
+
+def _is_library(filename: str) -> bool:
+    return filename.startswith('<') or os.path.realpath(filename).startswith(_LIBRARY_PATHS)
+
+
+def _walk(frame) -> List[Tuple[Frame, str]]:
+    """Innermost-first [((module, function, line), filename)] of a thread's stack."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(((frame.f_globals.get('__name__', '?'), code.co_name, frame.f_lineno), code.co_filename))
+        frame = frame.f_back
+    return stack
+
+
+def attribute(frame) -> Dict[str, Any]:
+    """Where a stalled loop thread is: the blocking site, the callback it runs in and the leaf frame.
+
+    ``site`` is the innermost application frame (e.g. ``UsageMeter.record_usage`` rather than the
+    socket read under it); ``callback`` is the first frame the event loop dispatched into.
+    """
+    stack = _walk(frame)
+    leaf = stack[0][0] if stack else ('?', '?', 0)
+    site = next((f for f, filename in stack if not _is_library(filename)), leaf)
+    callback = leaf
+    for i, ((module, function, _), _) in enumerate(stack):
+        if module == 'asyncio.events' and function == '_run':
+            callback = stack[i - 1][0] if i else leaf
+            break
+    app = [f for f, filename in reversed(stack) if not _is_library(filename)]
+    return {'site': f"{site[0]}:{site[1]}", 'callback': f"{callback[0]}:{callback[1]}",
+            'leaf': f"{leaf[0]}:{leaf[1]}:{leaf[2]}",
+            'stack': [f"{m}:{fn}:{line}" for m, fn, line in app[-12:]]}
+
+
+class LoopProfiler:
+    """Measures loop lag continuously and samples the loop thread's stack while it is stalled.
+
+    A heartbeat task on the loop records lag every ``interval_ms``; a watchdog thread sleeps
+    until the heartbeat could be ``threshold_ms`` overdue and, only then, samples the loop
+    thread every ``sample_ms``. A healthy loop therefore costs one short wakeup per interval
+    on each side, which is cheap enough to leave on in production.
+    """
+    def __init__(self, threshold_ms: float = 50.0, interval_ms: float = 25.0, sample_ms: float = 5.0,
+                 max_sites: int = 200, metrics: PipelineMetrics = METRICS):
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.sample_interval = sample_ms / 1000.0
+        self.max_sites = max_sites
+        self.metrics = metrics
+        self.enabled = False
+        self.sites: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'ticks': 0, 'stalls': 0, 'samples': 0, 'max_lag_ms': 0.0}
+        self._beat = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def enable(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start profiling ``loop`` (the running loop by default); call from the loop thread."""
+        if self.enabled:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop = threading.Event()  # fresh per run so a lingering old watchdog still exits
+        self.enabled = True
+        self._heartbeat = self._loop.create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, args=(self._stop,), name="loop-watchdog",
+                                          daemon=True)
+        self._watchdog.start()
+        logger.info(f"Loop profiler on (threshold {self.threshold * 1000:.0f} ms)")
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        logger.info("Loop profiler off")
+
+    def toggle(self) -> bool:
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable(self._loop if self._loop and self._loop.is_running() else None)
+        return self.enabled
+
+    def install_signal_toggle(self, signum: int = getattr(signal, 'SIGUSR2', 0)) -> None:
+        """Flip the profiler on/off with ``kill -USR2 <pid>`` (Unix only)."""
+        if signum:
+            asyncio.get_running_loop().add_signal_handler(signum, self.toggle)
+
+    async def _tick(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag_ms = (now - start - self.interval) * 1000
+            self.stats['ticks'] += 1
+            if lag_ms > self.stats['max_lag_ms']:
+                self.stats['max_lag_ms'] = lag_ms
+            self.metrics.record('loop_lag', max(0.0, lag_ms), tenant='runtime')
+
+    def _watch(self, stop: threading.Event) -> None:
+        budget = self.interval + self.threshold
+        while not stop.is_set():
+            overdue = time.monotonic() - self._beat
+            if overdue < budget:
+                stop.wait(budget - overdue)
+                continue
+            self._sample_stall(self._beat, stop)
+
+    def _sample_stall(self, beat: float, stop: threading.Event) -> None:
+        """Sample the loop thread until the heartbeat moves again, then record the stall."""
+        started = beat + self.interval  # when the heartbeat should have fired
+        samples: List[Dict[str, Any]] = []
+        while self._beat == beat and not stop.is_set():
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                samples.append(attribute(frame))
+            del frame
+            stop.wait(self.sample_interval)
+        if samples:
+            self._record(samples, (time.monotonic() - started) * 1000)
+
+    def _record(self, samples: List[Dict[str, Any]], stall_ms: float) -> None:
+        by_site = Counter(s['site'] for s in samples)
+        site, hits = by_site.most_common(1)[0]
+        example = next(s for s in samples if s['site'] == site)
+        with self._lock:
+            self.stats['stalls'] += 1
+            self.stats['samples'] += len(samples)
+            entry = self.sites.get(site)
+            if entry is None:
+                if len(self.sites) >= self.max_sites:
+                    site = 'other'
+                entry = self.sites.setdefault(site, {'stalls': 0, 'samples': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                                     'callback': example['callback'], 'leaf': example['leaf'],
+                                                     'stack': example['stack']})
+            entry['stalls'] += 1
+            entry['samples'] += hits
+            entry['total_ms'] += stall_ms
+            if stall_ms > entry['max_ms']:
+                entry['max_ms'], entry['callback'], entry['leaf'], entry['stack'] = (
+                    stall_ms, example['callback'], example['leaf'], example['stack'])
+        self.metrics.record('loop_stall', stall_ms, tenant='runtime')
+        self.metrics.inc('voice_loop_stalls_total', site=site)
+        self.metrics.inc('voice_loop_stall_ms_total', stall_ms, site=site)
+        logger.warning(f"Event loop blocked {stall_ms:.0f} ms in {site} "
+                       f"(callback {example['callback']}, at {example['leaf']})")
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Stats plus the ``top`` sites by total blocked time."""
+        with self._lock:
+            sites = sorted(self.sites.items(), key=lambda kv: kv[1]['total_ms'], reverse=True)[:top]
+            return {'enabled': self.enabled, **self.stats,
+                    'sites': [{'site': name, **{k: round(v, 2) if isinstance(v, float) else v
+                                                for k, v in entry.items()}} for name, entry in sites]}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sites.clear()
+            self.stats.update(ticks=0, stalls=0, samples=0, max_lag_ms=0.0)
+
+
+@lru_cache(maxsize=1)
+def get_loop_profiler() -> LoopProfiler:
+    """Process-wide profiler; LOOP_PROFILER_THRESHOLD_MS sets the stall threshold."""
+    return LoopProfiler(threshold_ms=float(os.getenv('LOOP_PROFILER_THRESHOLD_MS', '50')))
+
+
+def start_loop_profiler() -> Optional[LoopProfiler]:
+    """Enable the shared profiler on the running loop unless LOOP_PROFILER=0; SIGUSR2 toggles it."""
+    profiler = get_loop_profiler()
+    if os.getenv('LOOP_PROFILER', '1') != '0':
+        profiler.enable()
+    try:
+        profiler.install_signal_toggle()
+    except (NotImplementedError, RuntimeError, ValueError):
+        pass  # no signal handlers on this platform/thread
+    return profiler
@@ -0,0 +1,207 @@
+"""
+Provider registry: STT/LLM/TTS providers, each owning a pooled, pre-warmed keep-alive connection.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Type
+
+import aiohttp
+
+logger = logging.getLogger("providers")
+
+
+@dataclass
+class PoolConfig:
+    """Connection pool settings shared by every provider session"""
+    limit: int = 100
+    limit_per_host: int = 20
+    keepalive_timeout: float = 60.0
+    connect_timeout: float = 2.0
+    request_timeout: float = 15.0
+    warm_connections: int = 2
+    health_interval: float = 30.0
+
+
+class Provider:
+    """Base provider: one long-lived aiohttp session (TLS + keep-alive pool) per provider host."""
+    kind = ""
+    name = ""
+    default_base_url = ""
+    health_path = "/"
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 pool: Optional[PoolConfig] = None):
+        self.api_key = api_key
+        self.base_url = base_url or self.default_base_url
+        self.pool = pool or PoolConfig()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.healthy = False
+        self.last_health_check = 0.0
+
+    def _headers(self) -> Dict[str, str]:
+        return {}
+
+    async def start(self) -> None:
+        if self.session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.pool.limit,
+            limit_per_host=self.pool.limit_per_host,
+            keepalive_timeout=self.pool.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.pool.request_timeout, connect=self.pool.connect_timeout)
+        self.session = aiohttp.ClientSession(
+            base_url=self.base_url, connector=connector, timeout=timeout, headers=self._headers())
+
+    async def warm(self) -> None:
+        """Open warm_connections sockets now so the first call skips DNS/TCP/TLS setup."""
+        await self.start()
+        results = await asyncio.gather(
+            *(self.health_check() for _ in range(self.pool.warm_connections)), return_exceptions=True)
+        logger.info(f"Warmed {self.kind}:{self.name} ({sum(r is True for r in results)}/{len(results)} ok)")
+
+    async def health_check(self) -> bool:
+        try:
+            async with self.session.get(self.health_path, timeout=aiohttp.ClientTimeout(total=2)) as resp:
+                await resp.read()  # drain so the connection goes back to the pool
+                self.healthy = resp.status < 500
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Health check failed for {self.kind}:{self.name}: {e}")
+            self.healthy = False
+        self.last_health_check = time.monotonic()
+        return self.healthy
+
+    async def ws_connect(self, path: str, **kwargs) -> aiohttp.ClientWebSocketResponse:
+        """Websocket on the pooled session (streaming STT/TTS)."""
+        return await self.session.ws_connect(path, **kwargs)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class DeepgramSTT(Provider):
+    kind, name = "stt", "deepgram"
+    default_base_url = "https://api.deepgram.com"
+    health_path = "/v1/projects"
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Token {self.api_key}"} if self.api_key else {}
+
+    async def transcribe(self, audio: bytes, sample_rate: int = 16000) -> str:
+        params = {"encoding": "linear16", "sample_rate": str(sample_rate), "smart_format": "true"}
+        async with self.session.post("/v1/listen", params=params, data=audio,
+                                     headers={"Content-Type": "audio/raw"}) as resp:
+            resp.raise_for_status()
+            body = await resp.json()
+        return body["results"]["channels"][0]["alternatives"][0]["transcript"]
+
+
+class OpenAILLM(Provider):
+    kind, name = "llm", "openai"
+    default_base_url = "https://api.openai.com"
+    health_path = "/v1/models"
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    async def stream(self, messages: List[Dict[str, str]], model: str = "gpt-4o-mini") -> AsyncIterator[str]:
+        """Yield content deltas from a streamed chat completion (server-sent events)."""
+        payload = {"model": model, "messages": messages, "stream": True}
+        async with self.session.post("/v1/chat/completions", json=payload) as resp:
+            resp.raise_for_status()
+            async for raw in resp.content:
+                line = raw.decode().strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+    async def complete(self, messages: List[Dict[str, str]], model: str = "gpt-4o-mini") -> str:
+        return "".join([token async for token in self.stream(messages, model)])
+
+
+class ElevenLabsTTS(Provider):
+    kind, name = "tts", "elevenlabs"
+    default_base_url = "https://api.elevenlabs.io"
+    health_path = "/v1/user"
+
+    def _headers(self) -> Dict[str, str]:
+        return {"xi-api-key": self.api_key} if self.api_key else {}
+
+    async def synthesize(self, text: str, voice_id: str = "21m00Tcm4TlvDq8ikWAM",
+                         chunk_size: int = 4096) -> AsyncIterator[bytes]:
+        payload = {"text": text, "model_id": "eleven_turbo_v2"}
+        async with self.session.post(f"/v1/text-to-speech/{voice_id}/stream", json=payload,
+                                     params={"output_format": "pcm_16000"}) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                yield chunk
+
+
+class ProviderRegistry:
+    """Registry of provider classes plus the live, warmed instances for this process."""
+    _classes: Dict[Tuple[str, str], Type[Provider]] = {}
+
+    def __init__(self, pool: Optional[PoolConfig] = None,
+                 base_urls: Optional[Dict[str, str]] = None,
+                 api_keys: Optional[Dict[str, str]] = None):
+        self.pool = pool or PoolConfig()
+        self.base_urls = base_urls or {}   # provider name -> base url override
+        self.api_keys = api_keys or {}
+        self.providers: Dict[str, Provider] = {}  # kind -> live provider
+        self._health_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def register(cls, provider_cls: Type[Provider]) -> Type[Provider]:
+        cls._classes[(provider_cls.kind, provider_cls.name)] = provider_cls
+        return provider_cls
+
+    @classmethod
+    def available(cls) -> List[Tuple[str, str]]:
+        return sorted(cls._classes)
+
+    def create(self, kind: str, name: str) -> Provider:
+        try:
+            provider_cls = self._classes[(kind, name)]
+        except KeyError:
+            raise ValueError(f"Unknown {kind} provider: {name}")
+        api_key = self.api_keys.get(name) or os.getenv(f"{name.upper()}_API_KEY")
+        base_url = self.base_urls.get(name) or os.getenv(f"{name.upper()}_BASE_URL")
+        return provider_cls(api_key=api_key, base_url=base_url, pool=self.pool)
+
+    async def start(self, selection: Dict[str, str]) -> None:
+        """Instantiate and pre-warm the selected providers concurrently, then start health checks."""
+        for kind, name in selection.items():
+            self.providers[kind] = self.create(kind, name)
+        await asyncio.gather(*(p.warm() for p in self.providers.values()))
+        if self.pool.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    def get(self, kind: str) -> Provider:
+        return self.providers[kind]
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.pool.health_interval)
+            await asyncio.gather(*(p.health_check() for p in self.providers.values()))
+
+    async def close(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(*(p.close() for p in self.providers.values()))
+        self.providers.clear()
+
+
+for _provider_cls in (DeepgramSTT, OpenAILLM, ElevenLabsTTS):
+    ProviderRegistry.register(_provider_cls)
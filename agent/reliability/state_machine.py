@@ -23,8 +23,10 @@ class AgentStateMachine:
         transitions = {
             AgentState.IDLE: {'start_call': AgentState.LISTENING},
             AgentState.LISTENING: {'speech_detected': AgentState.PROCESSING},
-            AgentState.PROCESSING: {'response_ready': AgentState.RESPONDING, 'error': AgentState.ESCALATING},
-            AgentState.RESPONDING: {'done': AgentState.LISTENING}, # Loop back to listen
+            AgentState.PROCESSING: {'response_ready': AgentState.RESPONDING, 'error': AgentState.ESCALATING,
+                                    'interrupt': AgentState.LISTENING},
+            AgentState.RESPONDING: {'done': AgentState.LISTENING, # Loop back to listen
+                                    'interrupt': AgentState.LISTENING}, # Caller barged in
             AgentState.ESCALATING: {'handled': AgentState.IDLE},
         }
         
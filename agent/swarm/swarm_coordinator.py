@@ -17,6 +17,8 @@ from datetime import datetime
 import hashlib
 import base64
 
+from security.ai_security.pattern_matcher import PatternRegistry, get_pattern_registry
+
 # AutoGen imports for multi-agent orchestration
 # Note: These imports are optional/placeholders depending on install
 try:
@@ -374,6 +376,10 @@ class MultiAgentSwarm:
             self.config.encryption_level
         )
     
+    def _load_adversarial_model(self) -> PatternRegistry:
+        """Pattern sets shared with the prompt firewall (hot-reloaded, per tenant)"""
+        return get_pattern_registry()
+    
     def _generate_watermark_seed(self) -> str:
         """Generate unique watermark seed for AI output traceability"""
         tenant_hash = hashlib.sha256(self.config.tenant_id.encode()).hexdigest()[:16]
@@ -412,26 +418,13 @@ class MultiAgentSwarm:
         if not self.config.enable_adversarial_defense:
             return {"detected": False, "confidence": 0.0}
         
-        # Check for prompt injection patterns
-        injection_patterns = [
-            r"(ignore|disregard).*(previous|instructions)",
-            r"(system|assistant).*(prompt|instructions)",
-            r"(role play|act as|pretend).*(different)",
-            r"(output|response).*(format|structure).*(xml|json|markdown)",
-            r"(forget|reset).*(rules|constraints)"
+        # Check for prompt injection patterns (shared precompiled set, per-tenant additions)
+        patterns = self.adversarial_detector.get('adversarial', self.config.tenant_id)
+        detection_results = [
+            {"pattern": pattern, "severity": "high", "matched": True}
+            for pattern in patterns.matches(input_text)
         ]
         
-        import re
-        detection_results = []
-        
-        for pattern in injection_patterns:
-            if re.search(pattern, input_text, re.IGNORECASE):
-                detection_results.append({
-                    "pattern": pattern,
-                    "severity": "high",
-                    "matched": True
-                })
-        
         # Check for unusual character distributions
         char_dist = {}
         for char in input_text:
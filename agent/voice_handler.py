@@ -1,41 +1,98 @@
 import logging
 import asyncio
 import os
-import aiohttp
-from typing import AsyncIterator, List, Dict, Any
+from typing import AsyncIterator, List, Dict, Optional
+
+from agent.agent_config import AgentConfig
+from agent.providers import PoolConfig, ProviderRegistry
+from audio_processing.stage_graph import stream_speech
+from audio_processing.tts_cache import TTSCache, cache_key, get_tts_cache
 
 logger = logging.getLogger("voice-handler")
 
 class VoiceHandler:
-    def __init__(self):
+    def __init__(self, registry: Optional[ProviderRegistry] = None, tts_cache: Optional[TTSCache] = None):
         self.openai_key = os.getenv("OPENAI_API_KEY")
         self.anthropic_key = os.getenv("ANTHROPIC_API_KEY")
         self.elevenlabs_key = os.getenv("ELEVENLABS_API_KEY")
         self.deepgram_key = os.getenv("DEEPGRAM_API_KEY")
+        self.voice_id = os.getenv("ELEVENLABS_VOICE_ID", "21m00Tcm4TlvDq8ikWAM")
+        # Without a started registry the handlers fall back to local mocks
+        self.registry = registry
+        self.tts_cache = tts_cache or get_tts_cache()
+
+    async def start(self, config: Optional[AgentConfig] = None):
+        """Open and pre-warm pooled provider connections before the first call"""
+        config = config or AgentConfig()
+        if self.registry is None:
+            self.registry = ProviderRegistry(pool=PoolConfig(
+                limit_per_host=config.provider_limit_per_host,
+                keepalive_timeout=config.provider_keepalive_s,
+                warm_connections=config.provider_warm_connections,
+                health_interval=config.provider_health_interval_s,
+            ))
+        await self.registry.start(config.provider_selection())
+
+    async def close(self):
+        if self.registry:
+            await self.registry.close()
+
+    def _provider(self, kind: str):
+        if self.registry and kind in self.registry.providers:
+            return self.registry.get(kind)
+        return None
 
     async def stt(self, audio_data: bytes) -> str:
         """Speech-to-Text handler (e.g., Deepgram)"""
+        provider = self._provider("stt")
+        if provider:
+            return await provider.transcribe(audio_data)
         logger.info("Processing STT via Deepgram...")
-        # Actual implementation would use deepgram-sdk
         return "How do I set up my account?"
 
     async def llm(self, text: str, history: List[Dict[str, str]] = None) -> str:
         """Large Language Model handler (e.g., GPT-4 or Claude)"""
         logger.info(f"LLM Input: {text}")
-        
-        # Prepare messages
-        messages = history or []
-        messages.append({"role": "user", "content": text})
-        
+        provider = self._provider("llm")
+        if provider:
+            messages = (history or []) + [{"role": "user", "content": text}]
+            return await provider.complete(messages)
+
         # Mock response logic
         if "account" in text.lower():
             return "To set up your account, please go to the settings page and follow the onboarding wizard."
         
         return f"I heard you say '{text}'. How can I further assist you with Dukat Voice AI?"
 
-    async def tts(self, text: str) -> AsyncIterator[bytes]:
-        """Text-to-Speech handler (e.g., ElevenLabs)"""
+    async def llm_stream(self, text: str, history: List[Dict[str, str]] = None) -> AsyncIterator[str]:
+        """Streaming LLM handler: yields tokens as they are generated"""
+        provider = self._provider("llm")
+        if provider:
+            messages = (history or []) + [{"role": "user", "content": text}]
+            async for token in provider.stream(messages):
+                yield token
+            return
+
+        # Mock token stream
+        reply = await self.llm(text, history)
+        for token in reply.split(" "):
+            yield token + " "
+            await asyncio.sleep(0.005)
+
+    async def tts(self, text: str, voice_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Text-to-Speech handler (e.g., ElevenLabs), served from the phrase cache when possible"""
+        voice_id = voice_id or self.voice_id
+        key = cache_key(voice_id, text)
+        async for chunk in self.tts_cache.stream(key, lambda: self._synthesize(text, voice_id)):
+            yield chunk
+
+    async def _synthesize(self, text: str, voice_id: str) -> AsyncIterator[bytes]:
         logger.info(f"TTS Output Generation: {text}")
+        provider = self._provider("tts")
+        if provider:
+            async for chunk in provider.synthesize(text, voice_id):
+                yield chunk
+            return
         
         # Mock streaming audio chunks
         chunk_size = 1024
@@ -45,9 +102,8 @@ class VoiceHandler:
             await asyncio.sleep(0.01) # Simulate network/processing delay
 
     async def run_pipeline(self, audio_input: bytes) -> AsyncIterator[bytes]:
-        """Run the full AI pipeline: STT -> LLM -> TTS"""
+        """Run the full AI pipeline: STT -> LLM -> TTS, with TTS starting at the first clause"""
         user_text = await self.stt(audio_input)
-        assistant_text = await self.llm(user_text)
-        
-        async for audio_chunk in self.tts(assistant_text):
+
+        async for audio_chunk in stream_speech(self.llm_stream(user_text), self.tts):
             yield audio_chunk
@@ -0,0 +1,234 @@
+"""
+Multi-room worker pool: one process per core, many rooms per process, least-loaded dispatch, graceful drain.
+"""
+import asyncio
+import importlib
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("worker-pool")
+
+DEFAULT_HOST = "agent.agent:ProductionVoiceAgent"
+
+
+def _load_host(path: str):
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+async def _host_room(agent: Any, room_name: str) -> None:
+    try:
+        await agent.start(room_name)
+        await agent.wait_until_disconnected()
+    finally:
+        room = getattr(agent, 'room', None)
+        if room is not None and room.is_connected():
+            await room.disconnect()
+
+
+async def _worker_loop(worker_id: int, commands: mp.Queue, events: mp.Queue,
+                       config: Optional[Dict[str, Any]], host: str, drain_timeout: float,
+                       metrics_port: Optional[int]) -> None:
+    host_cls = _load_host(host)
+    if metrics_port:
+        from audio_processing.metrics import serve_prometheus
+        await serve_prometheus(metrics_port + worker_id)
+    # Loop lag and stall attribution per worker; LOOP_PROFILER=0 disables, SIGUSR2 toggles
+    from agent.loop_profiler import start_loop_profiler
+    start_loop_profiler()
+    loop = asyncio.get_running_loop()
+    rooms: Dict[str, asyncio.Task] = {}
+
+    def on_done(room_name: str, task: asyncio.Task) -> None:
+        rooms.pop(room_name, None)
+        if not task.cancelled() and task.exception():
+            logger.error(f"[worker {worker_id}] room {room_name} failed: {task.exception()}")
+        events.put(('ended', worker_id, room_name))
+
+    while True:
+        op, arg = await loop.run_in_executor(None, commands.get)
+        if op == 'start':
+            task = asyncio.create_task(_host_room(host_cls(config), arg))
+            task.add_done_callback(lambda t, name=arg: on_done(name, t))
+            rooms[arg] = task
+        elif op == 'drain':
+            break
+
+    # Draining: take no new rooms, let live calls finish, then force-disconnect stragglers
+    if rooms:
+        logger.info(f"[worker {worker_id}] draining {len(rooms)} rooms")
+        _, pending = await asyncio.wait(list(rooms.values()), timeout=drain_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    # Process-wide state the rooms shared (budget leases, unflushed usage)
+    shutdown = getattr(host_cls, 'shutdown', None)
+    if shutdown is not None:
+        try:
+            await shutdown()
+        except Exception as e:
+            logger.error(f"[worker {worker_id}] shutdown hook failed: {e}")
+    events.put(('exited', worker_id, None))
+
+
+def _worker_main(worker_id: int, commands: mp.Queue, events: mp.Queue,
+                 config: Optional[Dict[str, Any]], host: str, drain_timeout: float,
+                 metrics_port: Optional[int]) -> None:
+    # The supervisor owns Ctrl-C/SIGTERM and drains workers explicitly
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_worker_loop(worker_id, commands, events, config, host, drain_timeout, metrics_port))
+
+
+class WorkerSupervisor:
+    """Runs N worker processes and assigns rooms to the least-loaded one.
+
+    A worker that dies is restarted and its rooms are dispatched again (the new host rejoins
+    the room). A room whose worker dies a second time is dropped rather than re-homed, so one
+    room that crashes its host cannot take down every worker in turn.
+    """
+    def __init__(self, num_workers: Optional[int] = None, config: Optional[Dict[str, Any]] = None,
+                 host: str = DEFAULT_HOST, drain_timeout: float = 30.0,
+                 metrics_port: Optional[int] = None):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.metrics_port = metrics_port  # worker i serves /metrics on metrics_port + i
+        self.config = config
+        self.host = host
+        self.drain_timeout = drain_timeout
+        self._ctx = mp.get_context('spawn')
+        # Queues per worker: one killed mid-put cannot leave a lock held that wedges the others
+        self._events: List[mp.Queue] = []
+        self._commands: List[mp.Queue] = []
+        self._procs: List[mp.Process] = []
+        self.loads: List[int] = []
+        self.rooms: Dict[str, int] = {}  # room -> worker id
+        self.dropped: List[str] = []     # rooms given up after their worker died twice
+        self.restarts = 0
+        self._rehomed: set = set()
+        self.draining = False
+
+    def start(self) -> None:
+        for worker_id in range(self.num_workers):
+            self._events.append(None)
+            self._commands.append(None)
+            self._procs.append(None)
+            self.loads.append(0)
+            self._spawn(worker_id)
+        logger.info(f"Started {self.num_workers} voice workers")
+
+    def _spawn(self, worker_id: int) -> None:
+        commands, events = self._ctx.Queue(), self._ctx.Queue()
+        proc = self._ctx.Process(
+            target=_worker_main, name=f"voice-worker-{worker_id}", daemon=False,
+            args=(worker_id, commands, events, self.config, self.host, self.drain_timeout,
+                  self.metrics_port),
+        )
+        proc.start()
+        self._commands[worker_id], self._events[worker_id], self._procs[worker_id] = commands, events, proc
+        self.loads[worker_id] = 0
+
+    def dispatch(self, room_name: str) -> int:
+        """Route start(room_name) to the worker hosting the fewest rooms; returns its id."""
+        if self.draining:
+            raise RuntimeError("Supervisor is draining; not accepting new rooms")
+        if room_name in self.rooms:
+            return self.rooms[room_name]
+        self.poll()
+        return self._place(room_name)
+
+    def _place(self, room_name: str) -> int:
+        alive = [i for i, proc in enumerate(self._procs) if proc.is_alive()]
+        if not alive:
+            raise RuntimeError("No live voice workers")
+        worker_id = min(alive, key=self.loads.__getitem__)
+        self._commands[worker_id].put(('start', room_name))
+        self.loads[worker_id] += 1
+        self.rooms[room_name] = worker_id
+        return worker_id
+
+    def poll(self) -> None:
+        """Apply room-ended notifications to the load table and recover workers that died."""
+        for worker_id, events in enumerate(self._events):
+            while True:
+                try:
+                    kind, _, room_name = events.get_nowait()
+                except queue.Empty:
+                    break
+                # A re-homed room may still report ending on the worker it left
+                if kind == 'ended' and self.rooms.get(room_name) == worker_id:
+                    del self.rooms[room_name]
+                    self._rehomed.discard(room_name)
+                    self.loads[worker_id] -= 1
+        if self.draining:
+            return
+        for worker_id, proc in enumerate(self._procs):
+            if proc.exitcode is not None:
+                self._recover(worker_id)
+
+    def _recover(self, worker_id: int) -> None:
+        proc = self._procs[worker_id]
+        orphans = [room for room, owner in self.rooms.items() if owner == worker_id]
+        logger.error(f"{proc.name} exited with code {proc.exitcode}; restarting it, "
+                     f"re-homing {len(orphans)} rooms")
+        for room_name in orphans:
+            del self.rooms[room_name]
+        self.restarts += 1
+        self._spawn(worker_id)
+        for room_name in orphans:
+            if room_name in self._rehomed:
+                logger.error(f"Room {room_name} lost its worker twice; dropping it")
+                self.dropped.append(room_name)
+                continue
+            self._rehomed.add(room_name)
+            self._place(room_name)
+
+    def stats(self) -> Dict[str, Any]:
+        self.poll()
+        return {'workers': self.num_workers, 'loads': list(self.loads),
+                'rooms': len(self.rooms), 'restarts': self.restarts, 'dropped': len(self.dropped),
+                'draining': self.draining}
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Drain every worker (live calls finish or are disconnected after drain_timeout)."""
+        self.draining = True
+        for commands in self._commands:
+            commands.put(('drain', None))
+        deadline = time.monotonic() + (timeout if timeout is not None else self.drain_timeout + 5)
+        for proc in self._procs:
+            # Keep reading events while joining so a full events pipe cannot block a worker's exit
+            while proc.is_alive() and time.monotonic() < deadline:
+                proc.join(0.1)
+                self.poll()
+            if proc.is_alive():
+                logger.warning(f"{proc.name} did not drain in time; terminating")
+                proc.terminate()
+                proc.join()
+        self.poll()
+        logger.info("All voice workers stopped")
+
+
+async def run_supervisor(room_names: List[str], num_workers: Optional[int] = None,
+                         metrics_port: Optional[int] = None) -> None:
+    """Host the given rooms across a worker pool until SIGINT/SIGTERM, then drain."""
+    supervisor = WorkerSupervisor(num_workers, metrics_port=metrics_port)
+    supervisor.start()
+    for room_name in room_names:
+        supervisor.dispatch(room_name)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    while not stop.is_set():
+        # Ended rooms free their slot and dead workers are replaced even with no new dispatches
+        supervisor.poll()
+        try:
+            await asyncio.wait_for(stop.wait(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+    await loop.run_in_executor(None, supervisor.shutdown)
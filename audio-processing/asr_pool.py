@@ -0,0 +1,386 @@
+"""
+Local ASR pool: decoder processes, dynamic cross-session batching, shared-memory audio transport.
+"""
+from functools import lru_cache
+from multiprocessing import connection, shared_memory
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple, Union
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import signal
+import threading
+import time
+import numpy as np
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+logger = logging.getLogger("asr-pool")
+
+PLACEHOLDER_TEXT = "Hello, I need help with my account."
+
+
+class FasterWhisperBackend:
+    """faster-whisper/CTranslate2 decoder: one padded mel batch, one greedy generate() per batch."""
+    def __init__(self, model: str = "base.en", device: str = "cpu", compute_type: str = "int8",
+                 threads: int = 0, language: str = "en"):
+        import ctranslate2
+        from faster_whisper import WhisperModel
+        from faster_whisper.tokenizer import Tokenizer
+
+        self._ct2 = ctranslate2
+        self.model = WhisperModel(model, device=device, compute_type=compute_type, cpu_threads=threads)
+        self.tokenizer = Tokenizer(self.model.hf_tokenizer, self.model.model.is_multilingual,
+                                   task="transcribe", language=language)
+        self.extractor = self.model.feature_extractor
+        self.prompt = list(self.tokenizer.sot_sequence) + [self.tokenizer.no_timestamps]
+
+    def transcribe_batch(self, segments: List[np.ndarray]) -> List[str]:
+        frames = self.extractor.nb_max_frames
+        features = np.empty((len(segments), self.extractor.feature_size, frames), dtype=np.float32)
+        padded = np.zeros(self.extractor.n_samples, dtype=np.float32)
+        for i, audio in enumerate(segments):
+            # Whisper decodes fixed 30 s windows: zero-pad each segment, then log-mel
+            audio = audio[-padded.size:]
+            padded[:audio.size] = audio
+            padded[audio.size:] = 0.0
+            features[i] = self.extractor(padded)[:, :frames]
+        results = self.model.model.generate(
+            self._ct2.StorageView.from_array(features), [self.prompt] * len(segments),
+            beam_size=1, max_length=224, suppress_blank=True)
+        return [self.tokenizer.decode(r.sequences_ids[0]).strip() for r in results]
+
+
+class PlaceholderBackend:
+    """Stand-in decoder when no model is installed: computes the spectrogram, returns canned text."""
+    def __init__(self, **_options: Any):
+        self.window = np.hanning(400).astype(np.float32)
+
+    def transcribe_batch(self, segments: List[np.ndarray]) -> List[str]:
+        texts = []
+        for audio in segments:
+            if audio.size >= self.window.size:
+                frames = np.lib.stride_tricks.sliding_window_view(audio, self.window.size)[::160]
+                np.log10(np.abs(np.fft.rfft(frames * self.window)) ** 2 + 1e-10)
+            texts.append(PLACEHOLDER_TEXT if audio.size else "")
+        return texts
+
+
+BACKENDS = {'faster_whisper': FasterWhisperBackend, 'placeholder': PlaceholderBackend}
+
+
+def _slot_view(shm: shared_memory.SharedMemory, slot: int, slot_samples: int, length: int) -> np.ndarray:
+    return np.ndarray((length,), dtype=np.int16, buffer=shm.buf, offset=slot * slot_samples * 2)
+
+
+def _worker_main(worker_id: int, shm_name: str, slot_samples: int, requests: mp.Queue,
+                 results: connection.Connection, backend: str, options: Dict[str, Any]) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        try:
+            decoder = BACKENDS[backend](**options)
+        except Exception as e:
+            # e.g. the model package is not installed: tell the parent instead of dying silently
+            results.send(('failed', worker_id, None, repr(e)))
+            return
+        results.send(('ready', worker_id, None, None))
+        while True:
+            batch = requests.get()
+            if batch is None:
+                break
+            ids = [request_id for request_id, _, _ in batch]
+            start = time.perf_counter()
+            try:
+                # Read straight out of shared memory; only the float conversion copies
+                segments = [_slot_view(shm, slot, slot_samples, length).astype(np.float32) / 32768.0
+                            for _, slot, length in batch]
+                texts = decoder.transcribe_batch(segments)
+                results.send(('done', worker_id, ids, (texts, time.perf_counter() - start)))
+            except Exception as e:
+                results.send(('error', worker_id, ids, repr(e)))
+    finally:
+        shm.close()
+
+
+class ASRPool:
+    """Decoder processes fed with dynamically batched segments from every session in this process.
+
+    Segments are copied once into a shared-memory slot and only (slot, length) crosses the
+    process boundary. A batch is sent when it holds ``max_batch`` segments or ``max_wait_ms``
+    after its first one, to the next idle decoder. Each decoder has its own request queue and
+    result pipe, so the parent knows what a decoder was holding and a killed one cannot leave
+    a lock held that wedges the others. A newer partial from
+    the same ``key`` supersedes one still waiting, so a slow pool never decodes stale partials.
+
+    A decoder that crashes fails the batch it was decoding and is restarted; one whose backend
+    cannot be built is not. Once no decoder is left, ``transcribe`` raises instead of waiting,
+    and every call is bounded by ``timeout_s`` regardless.
+    """
+    def __init__(self, backend: str = "faster_whisper", workers: int = 2, max_batch: int = 8,
+                 max_wait_ms: float = 20.0, slots: int = 64, max_seconds: float = 30.0,
+                 sample_rate: int = 16000, timeout_s: float = 10.0, metrics: PipelineMetrics = METRICS,
+                 **backend_options: Any):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown ASR backend: {backend}")
+        self.backend = backend
+        self.backend_options = backend_options
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.slots = slots
+        self.sample_rate = sample_rate
+        self.slot_samples = int(max_seconds * sample_rate)
+        self.timeout_s = timeout_s
+        self.metrics = metrics
+
+        self._ctx = mp.get_context('spawn')
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._queues: List[mp.Queue] = []
+        self._pipes: List[connection.Connection] = []  # result pipe per worker (read end)
+        self._procs: List[mp.Process] = []
+        self._listener: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._free: Optional[asyncio.Queue] = None
+        self._ids = itertools.count()
+        self._inflight: Dict[int, Tuple[int, float, List[asyncio.Future]]] = {}
+        self._pending: Dict[Hashable, Tuple[int, int, int, List[asyncio.Future]]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._ready: set = set()
+        self._closing = False
+        self._idle: Deque[int] = deque()
+        self._backlog: Deque[List[Tuple[int, int, int]]] = deque()  # flushed, waiting for a decoder
+        self._assigned: Dict[int, List[int]] = {}   # worker -> request ids it is decoding
+        self._unusable: Dict[int, str] = {}         # worker -> why its backend could not be built
+        self._broken: Optional[str] = None          # set once no decoder is left
+
+    async def start(self) -> None:
+        if self._shm is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_samples * 2)
+        self._free = asyncio.Queue()
+        for slot in range(self.slots):
+            self._free.put_nowait(slot)
+        for worker_id in range(self.workers):
+            self._queues.append(None)
+            self._pipes.append(None)
+            self._procs.append(self._spawn(worker_id))
+        self._listener = threading.Thread(target=self._listen, name="asr-results", daemon=True)
+        self._listener.start()
+        logger.info(f"Started {self.workers} ASR workers ({self.backend})")
+
+    def _spawn(self, worker_id: int) -> mp.Process:
+        # Fresh channels every time: a worker killed inside get() leaves its queue's lock held
+        self._queues[worker_id] = self._ctx.Queue()
+        reader, writer = self._ctx.Pipe(duplex=False)
+        proc = self._ctx.Process(
+            target=_worker_main, name=f"asr-worker-{worker_id}", daemon=True,
+            args=(worker_id, self._shm.name, self.slot_samples, self._queues[worker_id], writer,
+                  self.backend, self.backend_options))
+        proc.start()
+        writer.close()  # the worker holds the only write end: its exit reads as EOF here
+        self._pipes[worker_id] = reader
+        return proc
+
+    async def transcribe(self, audio: Union[bytes, memoryview, np.ndarray],
+                         key: Optional[Hashable] = None) -> str:
+        """Decode int16 mono PCM at sample_rate; the last max_seconds are kept if longer."""
+        await self.start()
+        if self._broken is not None:
+            raise RuntimeError(f"ASR pool unavailable: {self._broken}")
+        samples = audio if isinstance(audio, np.ndarray) else np.frombuffer(audio, dtype=np.int16)
+        samples = samples[-self.slot_samples:]
+        slot = await self._free.get()
+        _slot_view(self._shm, slot, self.slot_samples, samples.size)[:] = samples
+
+        future = self._loop.create_future()
+        key = key if key is not None else object()
+        waiters = [future]
+        stale = self._pending.pop(key, None)
+        if stale is not None:
+            # Superseded partial: its callers get this newer decode instead
+            self._free.put_nowait(stale[1])
+            waiters.extend(stale[3])
+            self.metrics.inc('voice_asr_superseded_total')
+        self._pending[key] = (next(self._ids), slot, samples.size, waiters)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+        return await asyncio.wait_for(asyncio.shield(future), self.timeout_s)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = list(self._pending.values()), {}
+        for request_id, slot, length, waiters in batch:
+            self._inflight[request_id] = (slot, length / self.sample_rate, waiters)
+        self._backlog.append([(request_id, slot, length) for request_id, slot, length, _ in batch])
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._backlog and self._idle:
+            worker_id = self._idle.popleft()
+            batch = self._backlog.popleft()
+            self._assigned[worker_id] = [request_id for request_id, _, _ in batch]
+            self._queues[worker_id].put(batch)
+
+    def _listen(self) -> None:
+        """Result pipes and process sentinels in one wait: results and worker exits both arrive here."""
+        reported = set()
+        while not self._closing:
+            pipes = {pipe: worker_id for worker_id, pipe in enumerate(self._pipes) if not pipe.closed}
+            sentinels = {proc.sentinel: (worker_id, proc) for worker_id, proc in enumerate(self._procs)}
+            busy = set()
+            for ready in connection.wait(list(pipes) + list(sentinels), timeout=0.5):
+                if ready in pipes:
+                    busy.add(pipes[ready])
+                    try:
+                        message = ready.recv()
+                    except Exception:  # EOF, or a message cut short by a kill
+                        ready.close()
+                        continue
+                    self._post(self._on_result, *message)
+                else:
+                    worker_id, proc = sentinels[ready]
+                    if proc not in reported and worker_id not in busy:
+                        # Pipe drained first, so a worker's last results land before its exit is handled
+                        reported.add(proc)
+                        self._post(self._check_workers)
+
+    def _post(self, callback, *args) -> None:
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # loop closed under us (interpreter or test shutdown)
+
+    def _check_workers(self) -> None:
+        """Notice decoders that exited (crash, OOM kill), fail their batch and restart them."""
+        if self._closing:
+            return
+        for worker_id, proc in enumerate(self._procs):
+            if proc.exitcode is None or worker_id in self._unusable:
+                continue
+            failed = self._assigned.pop(worker_id, [])
+            reason = f"ASR worker {worker_id} exited with code {proc.exitcode}"
+            self._fail(failed, reason)
+            if worker_id not in self._ready:
+                # Died while loading the model: restarting would only crash again
+                self._on_result('failed', worker_id, None, reason)
+                continue
+            logger.error(f"{reason}; restarting it, {len(failed)} segments failed")
+            self.metrics.inc('voice_asr_worker_restarts_total')
+            self._ready.discard(worker_id)
+            if worker_id in self._idle:
+                self._idle.remove(worker_id)
+            self._procs[worker_id] = self._spawn(worker_id)
+
+    def _fail(self, ids: List[int], reason: str) -> None:
+        for request_id in ids:
+            entry = self._inflight.pop(request_id, None)
+            if entry is None:
+                continue
+            slot, _, waiters = entry
+            self._free.put_nowait(slot)
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(RuntimeError(reason))
+
+    def _on_result(self, kind: str, worker_id: int, ids: Optional[List[int]], payload: Any) -> None:
+        if kind == 'ready':
+            self._ready.add(worker_id)
+            self._idle.append(worker_id)
+            self._dispatch()
+            return
+        if kind == 'failed':
+            if worker_id in self._unusable:
+                return
+            self._unusable[worker_id] = payload
+            logger.error(f"ASR worker {worker_id} could not load the {self.backend} backend: {payload}")
+            if len(self._unusable) == self.workers:
+                self._give_up(payload)
+            return
+        self._assigned.pop(worker_id, None)
+        self._idle.append(worker_id)
+        self._dispatch()
+        if kind == 'done':
+            texts, compute_s = payload
+            self.metrics.inc('voice_asr_batches_total')
+            self.metrics.inc('voice_asr_segments_total', len(ids))
+            self.metrics.inc('voice_asr_compute_seconds_total', compute_s)
+        for i, request_id in enumerate(ids):
+            entry = self._inflight.pop(request_id, None)
+            if entry is None:
+                continue  # already failed
+            slot, seconds, waiters = entry
+            self._free.put_nowait(slot)
+            self.metrics.inc('voice_asr_audio_seconds_total', seconds)
+            for future in waiters:
+                if future.done():
+                    continue
+                if kind == 'done':
+                    future.set_result(texts[i])
+                else:
+                    future.set_exception(RuntimeError(f"ASR worker {worker_id} failed: {payload}"))
+
+    def _give_up(self, reason: str) -> None:
+        """No decoder can start: fail everything queued and make later calls fail fast."""
+        self._broken = f"no {self.backend} decoder could start ({reason})"
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for request_id, slot, length, waiters in self._pending.values():
+            self._inflight[request_id] = (slot, length / self.sample_rate, waiters)
+        self._pending = {}
+        self._backlog.clear()
+        self._fail(list(self._inflight), self._broken)
+
+    def stats(self) -> Dict[str, float]:
+        audio = self.metrics.counter('voice_asr_audio_seconds_total')
+        compute = self.metrics.counter('voice_asr_compute_seconds_total')
+        batches = self.metrics.counter('voice_asr_batches_total')
+        return {
+            'workers_ready': len(self._ready),
+            'batches': batches,
+            'mean_batch': self.metrics.counter('voice_asr_segments_total') / batches if batches else 0.0,
+            'superseded': self.metrics.counter('voice_asr_superseded_total'),
+            'audio_seconds': audio,
+            'realtime_factor': compute / audio if audio else 0.0,
+        }
+
+    async def close(self) -> None:
+        if self._shm is None:
+            return
+        self._closing = True
+        for requests in self._queues:
+            requests.put(None)
+        loop = asyncio.get_running_loop()
+        for proc in self._procs:
+            await loop.run_in_executor(None, proc.join, 10)
+            if proc.is_alive():
+                proc.terminate()
+        await loop.run_in_executor(None, self._listener.join, 5)
+        for pipe in self._pipes:
+            pipe.close()
+        self._procs.clear()
+        self._queues.clear()
+        self._pipes.clear()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+@lru_cache(maxsize=4)
+def get_asr_pool(backend: Optional[str] = None, workers: Optional[int] = None) -> ASRPool:
+    """Process-wide pool shared by every pipeline (started lazily on first transcribe)."""
+    return ASRPool(backend or os.getenv("LOCAL_ASR_BACKEND", "faster_whisper"),
+                   workers=workers or int(os.getenv("LOCAL_ASR_WORKERS", "2")),
+                   model=os.getenv("LOCAL_ASR_MODEL", "base.en"))
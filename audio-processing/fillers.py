@@ -0,0 +1,76 @@
+"""
+Fillers: short phrases pre-synthesized per voice, played while a slow turn has no audio yet.
+"""
+from typing import AsyncGenerator, AsyncIterable, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import itertools
+import logging
+
+logger = logging.getLogger("fillers")
+
+DEFAULT_FILLERS = ("One moment.", "Mm-hm.", "Let me check that.")
+
+
+class FillerBank:
+    """Filler audio per (voice_id, phrase), synthesized once at startup and shared by every call."""
+    def __init__(self):
+        self.audio: Dict[Tuple[str, str], bytes] = {}
+        self._turns = itertools.count()
+
+    async def prepare(self, voice_id: str, phrases: Sequence[str],
+                      synthesize: Callable[[str], AsyncIterable[bytes]]) -> None:
+        async def render(phrase: str) -> None:
+            self.audio[(voice_id, phrase)] = b"".join([bytes(c) async for c in synthesize(phrase)])
+
+        missing = [p for p in phrases if (voice_id, p) not in self.audio]
+        results = await asyncio.gather(*(render(p) for p in missing), return_exceptions=True)
+        for phrase, result in zip(missing, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not pre-synthesize filler {phrase!r} for {voice_id}: {result}")
+
+    def pick(self, voice_id: str, phrases: Sequence[str]) -> Optional[bytes]:
+        """Rotate through the prepared phrases so callers do not hear the same one every turn."""
+        ready: List[bytes] = [self.audio[(voice_id, p)] for p in phrases if (voice_id, p) in self.audio]
+        if not ready:
+            return None
+        return ready[next(self._turns) % len(ready)]
+
+
+# Shared by all pipelines in this process
+FILLERS = FillerBank()
+
+
+async def mask_latency(audio: AsyncGenerator[bytes, None], filler: Optional[bytes], delay_ms: float,
+                       chunk_bytes: int = 960, on_filler: Optional[Callable[[bool], None]] = None
+                       ) -> AsyncGenerator[bytes, None]:
+    """Pass ``audio`` through; if it has nothing after ``delay_ms``, play ``filler`` meanwhile.
+
+    The filler is cut at the next chunk boundary once real audio is ready, and
+    ``on_filler(cut)`` reports whether it had to be cut short.
+    """
+    first = asyncio.ensure_future(audio.__anext__())
+    try:
+        done, _ = await asyncio.wait([first], timeout=delay_ms / 1000.0)
+        if not done and filler:
+            view = memoryview(filler)
+            cut = False
+            for i in range(0, len(view), chunk_bytes):
+                if first.done():
+                    cut = True
+                    break
+                yield view[i:i + chunk_bytes]
+                await asyncio.sleep(0)
+            if on_filler:
+                on_filler(cut)
+        try:
+            chunk = await first
+        except StopAsyncIteration:
+            return
+        yield chunk
+        async for chunk in audio:
+            yield chunk
+    finally:
+        if not first.done():
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+        await audio.aclose()
@@ -0,0 +1,167 @@
+"""
+Adaptive jitter buffer: reorders and paces inbound frames, adapts delay to jitter, conceals gaps.
+"""
+from typing import AsyncIterable, AsyncIterator, Dict, Optional, Tuple
+import asyncio
+import time
+import numpy as np
+
+
+class AdaptiveJitterBuffer:
+    """Sequence-numbered frame buffer with RFC 3550 jitter estimate and fade-out concealment.
+
+    ``put`` accepts frames in any order; ``pop`` is called once per frame period and always
+    returns a frame: the next one in sequence, or a concealment frame (attenuated repeat of
+    the last good frame, fading to silence) when it is missing. The target delay tracks
+    ``jitter_multiplier`` x the measured jitter, growing immediately and shrinking slowly by
+    dropping a frame when the buffer runs deeper than needed.
+    """
+    def __init__(self, sample_rate: int = 48000, frame_ms: Optional[float] = None,
+                 min_delay_ms: float = 20.0, max_delay_ms: float = 200.0,
+                 jitter_multiplier: float = 3.0, max_conceal_frames: int = 5):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.jitter_multiplier = jitter_multiplier
+        self.max_conceal_frames = max_conceal_frames
+
+        self.target_delay_ms = min_delay_ms
+        self.jitter_ms = 0.0
+        self._frames: Dict[int, np.ndarray] = {}
+        self._next_seq: Optional[int] = None
+        self._highest_seq = -1
+        self._playing = False
+        self._last: Optional[np.ndarray] = None
+        self._plc: Optional[np.ndarray] = None
+        self._conceal_run = 0
+        self._prev_transit: Optional[float] = None
+        self.counters = {'received': 0, 'played': 0, 'concealed': 0, 'lost': 0,
+                         'late': 0, 'reordered': 0, 'dropped': 0, 'underruns': 0}
+
+    @property
+    def buffered_ms(self) -> float:
+        return len(self._frames) * (self.frame_ms or 0.0)
+
+    def put(self, seq: int, frame, arrival: Optional[float] = None) -> None:
+        samples = frame if isinstance(frame, np.ndarray) else np.frombuffer(frame, dtype=np.int16)
+        if self.frame_ms is None:
+            self.frame_ms = samples.size * 1000.0 / self.sample_rate
+        self.counters['received'] += 1
+
+        if self._next_seq is not None and seq < self._next_seq:
+            self.counters['late'] += 1
+            return
+        if seq < self._highest_seq:
+            self.counters['reordered'] += 1
+        self._highest_seq = max(self._highest_seq, seq)
+        self._frames[seq] = samples
+        self._update_jitter(seq, time.monotonic() if arrival is None else arrival)
+
+    def _update_jitter(self, seq: int, arrival: float) -> None:
+        # Interarrival jitter (RFC 3550 6.4.1) with the media clock derived from seq * frame_ms
+        transit = arrival * 1000.0 - seq * self.frame_ms
+        if self._prev_transit is not None:
+            self.jitter_ms += (abs(transit - self._prev_transit) - self.jitter_ms) / 16.0
+        self._prev_transit = transit
+
+        wanted = min(self.max_delay_ms, max(self.min_delay_ms,
+                                            self.jitter_multiplier * self.jitter_ms + self.frame_ms))
+        # Grow at once, shrink slowly
+        self.target_delay_ms = wanted if wanted > self.target_delay_ms else \
+            self.target_delay_ms + (wanted - self.target_delay_ms) * 0.01
+
+    def pop(self) -> Tuple[Optional[np.ndarray], str]:
+        """Next frame for playout: (frame, 'ok' | 'concealed' | 'buffering')."""
+        if not self._playing:
+            if not self._frames or self.buffered_ms < self.target_delay_ms:
+                return None, 'buffering'
+            self._playing = True
+            self._next_seq = min(self._frames)
+
+        # Buffer deeper than the target needs: drop the oldest frame to cut latency
+        if self.buffered_ms > self.target_delay_ms + 2 * self.frame_ms and self._next_seq in self._frames:
+            del self._frames[self._next_seq]
+            self._next_seq += 1
+            self.counters['dropped'] += 1
+
+        frame = self._frames.pop(self._next_seq, None)
+        if frame is not None:
+            self._next_seq += 1
+            self._last = frame
+            self._conceal_run = 0
+            self.counters['played'] += 1
+            return frame, 'ok'
+
+        if self._frames:
+            # A later frame is here, so this one is lost: conceal it and move on
+            self._next_seq += 1
+            self.counters['lost'] += 1
+        else:
+            # Nothing buffered: conceal without advancing so a delayed frame still plays
+            self.counters['underruns'] += 1
+            if self._conceal_run >= self.max_conceal_frames:
+                self._playing = False  # rebuffer up to the (now larger) target delay
+        return self._conceal(), 'concealed'
+
+    def _conceal(self) -> Optional[np.ndarray]:
+        self.counters['concealed'] += 1
+        self._conceal_run += 1
+        if self._last is None:
+            return None
+        if self._plc is None or self._plc.size != self._last.size:
+            self._plc = np.empty_like(self._last)
+        gain = 0.5 ** self._conceal_run if self._conceal_run <= self.max_conceal_frames else 0.0
+        np.multiply(self._last, gain, out=self._plc, casting='unsafe')
+        return self._plc
+
+    def stats(self) -> Dict[str, float]:
+        received = self.counters['received'] or 1
+        return {
+            'target_delay_ms': round(self.target_delay_ms, 2),
+            'buffered_ms': round(self.buffered_ms, 2),
+            'jitter_ms': round(self.jitter_ms, 2),
+            'loss_rate': round(self.counters['lost'] / received, 4),
+            **self.counters,
+        }
+
+    async def paced(self, frames: AsyncIterable) -> AsyncIterator[np.ndarray]:
+        """Receive frames and release them on a steady frame clock until the source ends.
+
+        Items may be ``(seq, frame)`` pairs carrying the transport's sequence numbers, which
+        is what makes reordering and loss detection possible; bare frames are numbered in
+        arrival order (sources that already reorder, such as LiveKit's decoded stream).
+        """
+        done = asyncio.Event()
+
+        async def receive() -> None:
+            seq = 0
+            try:
+                async for item in frames:
+                    if isinstance(item, tuple):
+                        seq, item = item
+                    self.put(seq, item)
+                    seq += 1
+            finally:
+                done.set()
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while self.frame_ms is None and not done.is_set():
+                await asyncio.sleep(0.005)
+            next_tick = time.monotonic()
+            while self._frames or not done.is_set():
+                if done.is_set() and not self._playing:
+                    # Source ended while (re)buffering: nothing more is coming, play out the rest
+                    seq = min(self._frames)
+                    frame = self._frames.pop(seq)
+                    self.counters['played'] += 1
+                else:
+                    frame, kind = self.pop()
+                if frame is not None:
+                    yield frame
+                next_tick += self.frame_ms / 1000.0
+                await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+        finally:
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
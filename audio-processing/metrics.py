@@ -0,0 +1,148 @@
+"""
+Pipeline metrics: HDR-style latency histograms per (tenant, stage), counters, snapshot & Prometheus text.
+"""
+from typing import Dict, Optional, Tuple
+import threading
+
+_PRECISION_BITS = 5                    # 32 sub-buckets per power of two, <=3% relative error
+_SUB = 1 << _PRECISION_BITS
+_HALF = _SUB >> 1
+_MAX_US = 120_000_000                  # clamp at 2 minutes
+
+
+def _bucket(us: int) -> int:
+    if us < _SUB:
+        return us
+    shift = us.bit_length() - _PRECISION_BITS
+    return _SUB + (shift - 1) * _HALF + ((us >> shift) - _HALF)
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint (in us) of the values that land in ``index``."""
+    if index < _SUB:
+        return float(index)
+    shift, offset = divmod(index - _SUB, _HALF)
+    shift += 1
+    return ((offset + _HALF) << shift) + (1 << shift) / 2.0
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram: O(1) record, no allocation on the hot path."""
+    def __init__(self):
+        self.counts = [0] * (_bucket(_MAX_US) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        us = min(_MAX_US, max(0, int(ms * 1000)))
+        self.counts[_bucket(us)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        """Value in ms at quantile ``q`` (0..1)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(_bucket_value(index) / 1000.0, self.max_ms)
+        return self.max_ms
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in labels)
+
+
+class PipelineMetrics:
+    """Process-wide registry shared by every pipeline in the worker."""
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()  # only taken when a new series is created
+
+    def record(self, stage: str, ms: float, tenant: str = "default") -> None:
+        key = (tenant, stage)
+        hist = self.histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(key, LatencyHistogram())
+        hist.record(ms)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def snapshot(self, tenant: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{tenant: {stage: {count, p50, p95, p99, max, mean}}} in ms."""
+        out: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (t, stage), hist in list(self.histograms.items()):
+            if tenant is not None and t != tenant:
+                continue
+            out.setdefault(t, {})[stage] = {
+                'count': hist.count,
+                'p50': round(hist.percentile(0.5), 3),
+                'p95': round(hist.percentile(0.95), 3),
+                'p99': round(hist.percentile(0.99), 3),
+                'max': round(hist.max_ms, 3),
+                'mean': round(hist.total_ms / hist.count, 3) if hist.count else 0.0,
+            }
+        return out
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition (summaries for latencies, counters for everything else)."""
+        lines = [
+            "# HELP voice_stage_latency_ms Voice pipeline stage latency in milliseconds.",
+            "# TYPE voice_stage_latency_ms summary",
+        ]
+        for (tenant, stage), hist in sorted(self.histograms.items()):
+            labels = _labels((('tenant', tenant), ('stage', stage)))
+            for q in self.QUANTILES:
+                lines.append(f'voice_stage_latency_ms{{{labels},quantile="{q}"}} {hist.percentile(q):.3f}')
+            lines.append(f'voice_stage_latency_ms_sum{{{labels}}} {hist.total_ms:.3f}')
+            lines.append(f'voice_stage_latency_ms_count{{{labels}}} {hist.count}')
+
+        names = sorted({name for name, _ in self.counters})
+        for name in names:
+            lines.append(f"# TYPE {name} counter")
+            for (n, labels), value in sorted(self.counters.items()):
+                if n == name:
+                    lines.append(f"{name}{{{_labels(labels)}}} {value:g}" if labels else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.counters.clear()
+
+
+# Shared by all pipelines in this process; scraped via serve_prometheus()
+METRICS = PipelineMetrics()
+
+
+async def serve_prometheus(port: int = 8000, registry: PipelineMetrics = METRICS):
+    """Expose /metrics (Prometheus text) and /metrics.json (snapshot) over aiohttp."""
+    from aiohttp import web
+
+    async def metrics(_request):
+        return web.Response(text=registry.prometheus_text(), content_type="text/plain")
+
+    async def snapshot(_request):
+        return web.json_response(registry.snapshot())
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/metrics.json", snapshot)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    return runner
@@ -0,0 +1,187 @@
+"""
+Outbound audio: exact 10/20 ms frames from a preallocated pool, batched Opus encode/decode, real-time pacing.
+"""
+from collections import deque
+from typing import Any, AsyncIterable, Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import time
+import numpy as np
+
+from audio_processing.resampler import Resampler
+
+try:
+    import opuslib
+except Exception:
+    opuslib = None
+
+
+class FramePool:
+    """Fixed set of reusable frames; ``factory`` builds transport frames (e.g. rtc.AudioFrame.create)."""
+    def __init__(self, samples: int, size: int = 4, factory: Optional[Callable[[], Any]] = None):
+        self.samples = samples
+        self._free: Deque[Any] = deque()
+        self._views: Dict[int, np.ndarray] = {}
+        for _ in range(size):
+            frame = factory() if factory else np.zeros(samples, dtype=np.int16)
+            view = frame if factory is None else np.frombuffer(frame.data, dtype=np.int16)
+            if view.size != samples:
+                raise ValueError(f"Pool frame holds {view.size} samples, expected {samples}")
+            self._views[id(frame)] = view
+            self._free.append(frame)
+
+    def acquire(self) -> Any:
+        if not self._free:
+            raise RuntimeError("Frame pool exhausted; release frames after the sink consumes them")
+        return self._free.popleft()
+
+    def view(self, frame: Any) -> np.ndarray:
+        """Writable int16 samples of a pooled frame."""
+        return self._views[id(frame)]
+
+    def release(self, frame: Any) -> None:
+        self._free.append(frame)
+
+
+class OpusCodec:
+    """Batched Opus encode/decode, run off the event loop one batch per executor hop."""
+    def __init__(self, sample_rate: int = 48000, frame_ms: int = 20, bitrate: Optional[int] = None):
+        if opuslib is None:
+            raise RuntimeError("opuslib is not installed")
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        if bitrate:
+            self.encoder.bitrate = bitrate
+        self.decoder = opuslib.Decoder(sample_rate, 1)
+
+    def encode_batch(self, frames: np.ndarray) -> List[bytes]:
+        """(n, frame_samples) int16 -> n Opus packets."""
+        return [self.encoder.encode(row.tobytes(), self.frame_samples) for row in frames]
+
+    def decode_batch(self, packets: List[bytes]) -> np.ndarray:
+        pcm = b"".join(self.decoder.decode(p, self.frame_samples) for p in packets)
+        return np.frombuffer(pcm, dtype=np.int16).reshape(len(packets), -1)
+
+
+class RealtimePacer:
+    """Releases one frame per frame period, keeping at most ``lead_ms`` queued ahead of playout.
+
+    If the loop falls behind (CPU pressure) the clock is re-anchored instead of bursting
+    to catch up, so the sink never floods and playout resumes at a steady rate.
+    """
+    def __init__(self, frame_ms: float, lead_ms: float = 60.0, max_late_ms: float = 40.0):
+        self.frame_s = frame_ms / 1000.0
+        self.lead_s = lead_ms / 1000.0
+        self.max_late_s = max_late_ms / 1000.0
+        self.late_resets = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self._start: Optional[float] = None
+        self._frames = 0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        due = self._start + self._frames * self.frame_s - self.lead_s
+        if now - due > self.lead_s + self.max_late_s:
+            # Playout already ran dry: restart the clock from now
+            self.late_resets += 1
+            self._start, self._frames = now, 0
+        elif due > now:
+            await asyncio.sleep(due - now)
+        self._frames += 1
+
+
+class OutboundStage:
+    """Mono TTS bytes -> resampled, exact-size frames -> paced sink (e.g. AudioSource.capture_frame)."""
+    def __init__(self, sink: Callable[[Any], Awaitable[None]], sample_rate: int = 48000,
+                 frame_ms: int = 20, src_rate: Optional[int] = None, pool_size: int = 2, factory: Optional[Callable[[], Any]] = None,
+                 codec: Optional[OpusCodec] = None, encode_batch: int = 50,
+                 on_packets: Optional[Callable[[List[bytes]], None]] = None, lead_ms: float = 60.0):
+        if frame_ms not in (10, 20):
+            raise ValueError("frame_ms must be 10 or 20")
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.pool = FramePool(self.frame_samples, pool_size, factory)
+        self.pacer = RealtimePacer(frame_ms, lead_ms)
+        self._resampler = Resampler(src_rate, sample_rate, 1) if src_rate and src_rate != sample_rate else None
+
+        # Optional Opus tap (recording/transport): frames are encoded in batches off the loop
+        self.codec = codec
+        self.on_packets = on_packets
+        self._batch = np.zeros((encode_batch, self.frame_samples), dtype=np.int16) if codec else None
+        self._batched = 0
+        self._encodes: List[asyncio.Future] = []
+
+        self._carry = b""
+        self.stats = {'frames': 0, 'padded': 0, 'encoded': 0}
+
+    async def play(self, chunks: AsyncIterable[bytes]) -> None:
+        """Frame, pace and send one response; a cancelled play (barge-in) stops at a frame boundary."""
+        frame = self.pool.acquire()
+        filled = 0
+        try:
+            async for chunk in chunks:
+                samples = self._samples(chunk)
+                while samples.size:
+                    view = self.pool.view(frame)
+                    take = min(samples.size, self.frame_samples - filled)
+                    view[filled:filled + take] = samples[:take]
+                    filled += take
+                    samples = samples[take:]
+                    if filled == self.frame_samples:
+                        await self._send(frame)
+                        filled = 0
+            if filled:
+                self.pool.view(frame)[filled:] = 0  # pad the tail to a whole frame
+                self.stats['padded'] += 1
+                await self._send(frame)
+            self._flush_encoder()
+        finally:
+            self.pool.release(frame)
+            self.pacer.reset()
+            self._carry = b""
+            if self._resampler:
+                self._resampler.reset()
+
+    def _samples(self, chunk) -> np.ndarray:
+        data = self._carry + bytes(chunk) if self._carry else chunk
+        usable = len(data) & ~1
+        self._carry = bytes(data[usable:])  # odd byte split across chunks
+        samples = np.frombuffer(data, dtype=np.int16, count=usable // 2)
+        return self._resampler.process(samples) if self._resampler else samples
+
+    async def _send(self, frame: Any) -> None:
+        await self.pacer.wait()
+        await self.sink(frame)  # the sink copies the frame before returning
+        self.stats['frames'] += 1
+        if self.codec is not None:
+            self._batch[self._batched] = self.pool.view(frame)
+            self._batched += 1
+            if self._batched == len(self._batch):
+                self._flush_encoder()
+
+    def _flush_encoder(self) -> None:
+        if not self._batched:
+            return
+        frames = self._batch[:self._batched].copy()
+        self._batched = 0
+        future = asyncio.get_running_loop().run_in_executor(None, self.codec.encode_batch, frames)
+        future.add_done_callback(self._on_encoded)
+        self._encodes.append(future)
+
+    def _on_encoded(self, future: asyncio.Future) -> None:
+        self._encodes.remove(future)
+        if future.cancelled() or future.exception():
+            return
+        packets = future.result()
+        self.stats['encoded'] += len(packets)
+        if self.on_packets:
+            self.on_packets(packets)
+
+    async def drain(self) -> None:
+        """Wait for pending Opus batches."""
+        if self._encodes:
+            await asyncio.gather(*self._encodes, return_exceptions=True)
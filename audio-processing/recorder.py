@@ -0,0 +1,274 @@
+"""
+Call recording: both directions interleaved per call, one background writer thread, mmap'd WAV playback.
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Type, Union
+import itertools
+import logging
+import mmap
+import queue
+import struct
+import threading
+import time
+import numpy as np
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+try:
+    import soundfile
+except Exception:
+    soundfile = None
+
+logger = logging.getLogger("recorder")
+
+CALLER, AGENT = 0, 1  # stereo channels
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+
+def wav_header(sample_rate: int, channels: int, data_bytes: int) -> bytes:
+    return _WAV_HEADER.pack(b'RIFF', 36 + data_bytes, b'WAVE', b'fmt ', 16, 1, channels, sample_rate,
+                            sample_rate * channels * 2, channels * 2, 16, b'data', data_bytes)
+
+
+class _WavFile:
+    def __init__(self, path: str, sample_rate: int, buffering: int):
+        self.sample_rate = sample_rate
+        self.data_bytes = 0
+        self.f = open(path, 'wb', buffering=buffering)
+        self.f.write(wav_header(sample_rate, 2, 0))  # sizes patched on close
+
+    def write(self, data: bytes) -> None:
+        self.f.write(data)
+        self.data_bytes += len(data)
+
+    def close(self) -> None:
+        self.f.seek(0)
+        self.f.write(wav_header(self.sample_rate, 2, self.data_bytes))
+        self.f.close()
+
+
+class _OpusFile:
+    def __init__(self, path: str, sample_rate: int, buffering: int):
+        if soundfile is None:
+            raise RuntimeError("soundfile is not installed; Opus recordings need libsndfile")
+        self.f = soundfile.SoundFile(path, 'w', samplerate=sample_rate, channels=2,
+                                     format='OGG', subtype='OPUS')
+
+    def write(self, data: bytes) -> None:
+        self.f.write(np.frombuffer(data, dtype=np.int16).reshape(-1, 2))
+
+    def close(self) -> None:
+        self.f.close()
+
+
+CONTAINERS: Dict[str, Type[Union[_WavFile, _OpusFile]]] = {'wav': _WavFile, 'opus': _OpusFile}
+
+
+class RecordingWriter:
+    """Single background thread doing all recording I/O for the process.
+
+    Callers only enqueue; if the disk falls behind by more than ``max_pending_bytes`` new
+    chunks are dropped (and counted) rather than ever blocking the audio loop.
+    """
+    def __init__(self, buffering: int = 1 << 20, max_pending_bytes: int = 256 << 20,
+                 metrics: PipelineMetrics = METRICS):
+        self.buffering = buffering
+        self.max_pending_bytes = max_pending_bytes
+        self.metrics = metrics
+        self.pending_bytes = 0
+        self.stats = {'opened': 0, 'closed': 0, 'chunks': 0, 'bytes': 0, 'dropped': 0,
+                      'write_seconds': 0.0, 'errors': 0}
+        self._ids = itertools.count()
+        self._files: Dict[int, Union[_WavFile, _OpusFile]] = {}
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+                    self._thread.start()
+
+    def open(self, path: str, sample_rate: int, container: str = 'wav') -> int:
+        if container not in CONTAINERS:
+            raise ValueError(f"Unknown recording container: {container}")
+        self._ensure_thread()
+        handle = next(self._ids)
+        self._put(('open', handle, (path, sample_rate, container)))
+        return handle
+
+    def write(self, handle: int, data: bytes) -> bool:
+        if self.pending_bytes + len(data) > self.max_pending_bytes:
+            self.stats['dropped'] += 1
+            self.metrics.inc('voice_recording_dropped_chunks_total')
+            return False
+        with self._lock:
+            self.pending_bytes += len(data)
+        self._put(('write', handle, data))
+        return True
+
+    def close(self, handle: int) -> None:
+        self._put(('close', handle, None))
+
+    def _put(self, item) -> None:
+        self._queue.put(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything enqueued so far has been handled (tests, shutdown)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._put(('flush', None, done))
+        return done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            op, handle, arg = self._queue.get()
+            start = time.perf_counter()
+            try:
+                if op == 'flush':
+                    arg.set()
+                    continue
+                if op == 'open':
+                    path, sample_rate, container = arg
+                    self._files[handle] = CONTAINERS[container](path, sample_rate, self.buffering)
+                    self.stats['opened'] += 1
+                elif op == 'write':
+                    with self._lock:
+                        self.pending_bytes -= len(arg)
+                    f = self._files.get(handle)
+                    if f is not None:
+                        f.write(arg)
+                        self.stats['chunks'] += 1
+                        self.stats['bytes'] += len(arg)
+                elif op == 'close':
+                    f = self._files.pop(handle, None)
+                    if f is not None:
+                        f.close()
+                        self.stats['closed'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Recording {op} failed: {e}")
+            self.stats['write_seconds'] += time.perf_counter() - start
+
+
+@lru_cache(maxsize=1)
+def get_recording_writer() -> RecordingWriter:
+    """Writer shared by every recording in this process."""
+    return RecordingWriter()
+
+
+class CallRecorder:
+    """Taps caller and agent audio into one stereo recording (caller left, agent right).
+
+    The caller stream is continuous and drives the timeline; agent audio is placed at the
+    current caller position when it starts and stays contiguous while the agent speaks.
+    Both taps copy into a staging block and hand whole ``chunk_ms`` blocks to the writer.
+    """
+    def __init__(self, path: str, sample_rate: int = 48000, container: str = 'wav',
+                 chunk_ms: int = 1000, writer: Optional[RecordingWriter] = None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.writer = writer or get_recording_writer()
+        self.chunk = sample_rate * chunk_ms // 1000
+        self._stage = np.zeros((self.chunk * 2, 2), dtype=np.int16)
+        self._base = 0                          # absolute sample index of _stage[0]
+        self._cursor = [0, 0]                   # next absolute sample per channel
+        # Stagger block boundaries so hundreds of calls do not all emit in the same tick
+        self._block = self.chunk - (hash(path) % self.chunk) // 2
+        self._handle = self.writer.open(path, sample_rate, container)
+        self.closed = False
+
+    def inbound(self, pcm: Union[bytes, memoryview, np.ndarray]) -> None:
+        self._tap(CALLER, pcm, self._cursor[CALLER])
+
+    def outbound(self, pcm: Union[bytes, memoryview, np.ndarray]) -> None:
+        self._tap(AGENT, pcm, max(self._cursor[AGENT], self._cursor[CALLER]))
+
+    def _tap(self, channel: int, pcm, position: int) -> None:
+        if self.closed:
+            return
+        samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        while samples.size:
+            offset = position - self._base
+            room = len(self._stage) - offset
+            if room <= 0:
+                self._cursor[channel] = position
+                self._emit(self._block)
+                continue
+            take = min(room, samples.size)
+            self._stage[offset:offset + take, channel] = samples[:take]
+            position += take
+            samples = samples[take:]
+        self._cursor[channel] = position
+        if self._cursor[CALLER] - self._base >= self._block:
+            self._emit(self._block)
+
+    def _emit(self, n: int) -> None:
+        # (n, 2) C-order int16 is already interleaved stereo PCM
+        self.writer.write(self._handle, self._stage[:n].tobytes())
+        # Only the few samples written past the block (agent lead) move down
+        used = max(max(self._cursor) - self._base, n)
+        self._stage[:used - n] = self._stage[n:used]
+        self._stage[used - n:used] = 0
+        self._base += n
+        # A channel that fell behind the emitted block (caller audio stalled while the agent ran
+        # ahead) resumes at the block edge: the gap stays silent on that channel
+        self._cursor = [max(c, self._base) for c in self._cursor]
+        self._block = self.chunk
+
+    def close(self) -> None:
+        """Flush the partial block and finalize the file (on the writer thread)."""
+        if self.closed:
+            return
+        end = max(self._cursor) - self._base
+        if end > 0:
+            self.writer.write(self._handle, self._stage[:end].tobytes())
+        self.writer.close(self._handle)
+        self.closed = True
+
+
+class RecordingReader:
+    """Random-access playback of a WAV recording through mmap; reads are zero-copy views."""
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != b'RIFF' or self._map[8:12] != b'WAVE':
+            raise ValueError(f"{path} is not a WAV file")
+        pos = 12
+        fmt = None
+        while pos + 8 <= len(self._map):
+            tag, size = struct.unpack_from('<4sI', self._map, pos)
+            if tag == b'fmt ':
+                fmt = struct.unpack_from('<HHIIHH', self._map, pos + 8)
+            elif tag == b'data':
+                size = min(size, len(self._map) - pos - 8)  # tolerate an unfinalized header
+                break
+            pos += 8 + size + (size & 1)
+        else:
+            raise ValueError(f"{path} has no data chunk")
+        if fmt is None or fmt[0] != 1 or fmt[5] != 16:
+            raise ValueError(f"{path} is not 16-bit PCM")
+        self.channels, self.sample_rate = fmt[1], fmt[2]
+        self.frames = np.frombuffer(self._map, dtype=np.int16, offset=pos + 8,
+                                    count=size // 2).reshape(-1, self.channels)
+
+    @property
+    def duration(self) -> float:
+        return len(self.frames) / self.sample_rate
+
+    def read(self, start_s: float = 0.0, end_s: Optional[float] = None) -> np.ndarray:
+        """(n, channels) view of [start_s, end_s)."""
+        start = int(start_s * self.sample_rate)
+        end = len(self.frames) if end_s is None else int(end_s * self.sample_rate)
+        return self.frames[start:end]
+
+    def close(self) -> None:
+        self.frames = np.empty((0, self.channels), dtype=np.int16)  # drop the view so the map can close
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # views handed out by read() are still alive; the map goes with them
+        self._file.close()
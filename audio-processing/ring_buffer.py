@@ -0,0 +1,66 @@
+"""
+Zero-copy audio ring buffer: preallocated int16 storage, windowed views for VAD/ASR.
+"""
+from typing import Union
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated NumPy ring buffer for inbound PCM frames.
+
+    Storage is mirrored (every sample is written at ``i`` and ``i + capacity``) so any
+    window of up to ``capacity`` samples is a single contiguous view - readers never copy
+    or stitch. Samples are addressed by absolute index (total samples ever written).
+    Views are only valid until the region is overwritten, i.e. ``capacity`` samples later.
+    """
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(capacity * 2, dtype=self.dtype)
+        self.written = 0  # absolute index of the next sample
+
+    @classmethod
+    def for_duration(cls, seconds: float, sample_rate: int = 48000) -> "AudioRingBuffer":
+        return cls(int(seconds * sample_rate))
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.written - self.capacity)
+
+    def write(self, frame: Union[bytes, memoryview, np.ndarray]) -> int:
+        """Copy one frame into place (no allocation); returns the new write index."""
+        samples = frame if isinstance(frame, np.ndarray) else np.frombuffer(frame, dtype=self.dtype)
+        n = samples.size
+        cap = self.capacity
+        if n > cap:
+            self.written += n - cap
+            samples = samples[-cap:]
+            n = cap
+
+        pos = self.written % cap
+        first = min(n, cap - pos)
+        data = self._data
+        data[pos:pos + first] = samples[:first]
+        data[pos + cap:pos + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            data[:rest] = samples[first:]
+            data[cap:cap + rest] = samples[first:]
+
+        self.written += n
+        return self.written
+
+    def window(self, start: int, end: int) -> np.ndarray:
+        """View of samples ``[start, end)`` by absolute index (use ``.data`` for a memoryview)."""
+        if start < self.oldest or end > self.written or start > end:
+            raise IndexError(f"window [{start}, {end}) outside [{self.oldest}, {self.written})")
+        pos = start % self.capacity
+        return self._data[pos:pos + (end - start)]
+
+    def latest(self, n: int) -> np.ndarray:
+        """View of the most recent ``n`` samples."""
+        n = min(n, self.written - self.oldest)
+        return self.window(self.written - n, self.written)
@@ -0,0 +1,130 @@
+"""
+Speculative LLM generation: start on stable partial transcripts, keep the result if the final matches.
+"""
+from difflib import SequenceMatcher
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+import asyncio
+import re
+import time
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_PUNCT.sub("", text.lower()).split())
+
+
+def similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, normalize(a), normalize(b)).ratio()
+
+
+class SpeculativeRun:
+    """One in-flight speculative generation; tokens are buffered so a hit can replay them live."""
+    def __init__(self, text: str, settings: Optional[Tuple[str, Optional[int]]] = None):
+        self.text = text
+        self.settings = settings  # (model, max_parts) it was generated with
+        self.parts: List[str] = []
+        self.done = False
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._updated = asyncio.Event()
+
+    async def produce(self, tokens: AsyncGenerator[str, None]) -> None:
+        try:
+            async for part in tokens:
+                if self.first_token_at is None:
+                    self.first_token_at = time.perf_counter()
+                self.parts.append(part)
+                self._updated.set()
+        finally:
+            self.done = True
+            self._updated.set()
+
+    async def stream(self) -> AsyncGenerator[str, None]:
+        """Replay and follow the generation; a consumer that stops early (barge-in) stops it too."""
+        index = 0
+        try:
+            while True:
+                while index < len(self.parts):
+                    yield self.parts[index]
+                    index += 1
+                if self.done:
+                    return
+                self._updated.clear()
+                await self._updated.wait()
+        finally:
+            if not self.done and self.task is not None:
+                self.task.cancel()
+
+
+class SpeculativeLLM:
+    """Runs the LLM ahead of end-of-utterance and arbitrates hits/misses against the final transcript."""
+    def __init__(self, pipeline: Any, similarity_threshold: float = 0.9, stable_partials: int = 2):
+        self.pipeline = pipeline
+        self.similarity_threshold = similarity_threshold
+        self.stable_partials = stable_partials
+        self.run: Optional[SpeculativeRun] = None
+        self._last_partial = ""
+        self._stable = 0
+
+    def on_partial(self, text: str, usage: Any = None) -> None:
+        """Feed each partial; speculation starts once the same text is seen stable_partials times.
+
+        ``usage`` is the call's CallMeter: speculative tokens are billed even when thrown away.
+        """
+        norm = normalize(text)
+        if not norm:
+            return
+        self._stable = self._stable + 1 if norm == self._last_partial else 1
+        self._last_partial = norm
+        if self._stable < self.stable_partials:
+            return
+        if self.run is not None and normalize(self.run.text) == norm:
+            return
+
+        self.cancel()
+        model, max_parts = self.pipeline.turn_settings(self.pipeline._pending_degradations, text, commit=False)
+        self.run = SpeculativeRun(text, (model, max_parts))
+        self.run.task = asyncio.create_task(self.run.produce(self.pipeline.metered_llm(text, model, max_parts, usage)))
+
+    def take(self, final_text: str, settings: Optional[Tuple[str, Optional[int]]] = None
+             ) -> Optional[SpeculativeRun]:
+        """Return the speculative run if it matches the final transcript (and, when given, the
+        final turn's (model, max_parts)), otherwise cancel it."""
+        run, self.run = self.run, None
+        self._last_partial, self._stable = "", 0
+        if run is None:
+            return None
+
+        metrics, tenant = self.pipeline.metrics, self.pipeline.tenant_id
+        if (similarity(run.text, final_text) >= self.similarity_threshold
+                and (settings is None or settings == run.settings)):
+            # Head start = work already done before the final transcript arrived
+            now = time.perf_counter()
+            saved_ms = ((run.first_token_at or now) - run.started) * 1000
+            metrics.inc('voice_speculation_total', tenant=tenant, outcome='hit')
+            metrics.inc('voice_speculation_saved_ms_total', saved_ms, tenant=tenant)
+            return run
+
+        run.task.cancel()
+        metrics.inc('voice_speculation_total', tenant=tenant, outcome='miss')
+        return None
+
+    def cancel(self) -> None:
+        if self.run is not None:
+            self.run.task.cancel()
+            self.run = None
+
+    def stats(self) -> Dict[str, float]:
+        metrics, tenant = self.pipeline.metrics, self.pipeline.tenant_id
+        hits = metrics.counter('voice_speculation_total', tenant=tenant, outcome='hit')
+        misses = metrics.counter('voice_speculation_total', tenant=tenant, outcome='miss')
+        saved = metrics.counter('voice_speculation_saved_ms_total', tenant=tenant)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'saved_ms_total': saved,
+            'saved_ms_per_hit': saved / hits if hits else 0.0,
+        }
@@ -0,0 +1,96 @@
+"""
+Streaming LLM -> TTS stage graph: clause segmentation, bounded queues, backpressure end to end.
+"""
+from typing import AsyncIterable, AsyncGenerator, Callable, List, Optional
+import asyncio
+import re
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s*$")
+_CLAUSE_END = re.compile(r"[,;:—]\s*$")
+_DONE = object()
+
+
+class SentenceSegmenter:
+    """Accumulates LLM tokens and closes a segment at each sentence or (long enough) clause end."""
+    def __init__(self, min_clause_chars: int = 24, max_chars: int = 200):
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, token: str) -> List[str]:
+        self._buffer += token
+        text = self._buffer.strip()
+        if not text:
+            return []
+        if (_SENTENCE_END.search(self._buffer)
+                or (_CLAUSE_END.search(self._buffer) and len(text) >= self.min_clause_chars)):
+            self._buffer = ""
+            return [text]
+        if len(text) >= self.max_chars:
+            # Runaway clause: cut at the last word boundary so TTS is never starved
+            cut = text.rfind(" ")
+            if cut <= 0:
+                cut = len(text)
+            self._buffer = text[cut:]
+            return [text[:cut].strip()]
+        return []
+
+    def flush(self) -> Optional[str]:
+        text, self._buffer = self._buffer.strip(), ""
+        return text or None
+
+
+async def stream_speech(tokens: AsyncIterable[str],
+                        synthesize: Callable[[str], AsyncIterable[bytes]],
+                        segmenter: Optional[SentenceSegmenter] = None,
+                        segment_queue: int = 4, audio_queue: int = 32) -> AsyncGenerator[bytes, None]:
+    """LLM tokens -> segments -> TTS audio, each stage a task joined by a bounded queue.
+
+    The first segment goes to TTS as soon as it closes, so first audio follows the first
+    clause rather than the full reply. A slow consumer (the AudioSource) fills the audio
+    queue, which pauses TTS, which fills the segment queue, which pauses the LLM.
+    Closing the generator (e.g. on barge-in) cancels every stage.
+    """
+    segmenter = segmenter or SentenceSegmenter()
+    segments: asyncio.Queue = asyncio.Queue(segment_queue)
+    audio: asyncio.Queue = asyncio.Queue(audio_queue)
+    errors: List[BaseException] = []
+
+    async def segment_stage() -> None:
+        try:
+            async for token in tokens:
+                for segment in segmenter.feed(token):
+                    await segments.put(segment)
+            tail = segmenter.flush()
+            if tail:
+                await segments.put(tail)
+        except Exception as exc:
+            errors.append(exc)
+        await segments.put(_DONE)
+
+    async def tts_stage() -> None:
+        try:
+            while True:
+                segment = await segments.get()
+                if segment is _DONE:
+                    break
+                async for chunk in synthesize(segment):
+                    await audio.put(chunk)
+        except Exception as exc:
+            errors.append(exc)
+        await audio.put(_DONE)
+
+    stages = [asyncio.create_task(segment_stage()), asyncio.create_task(tts_stage())]
+    try:
+        while True:
+            chunk = await audio.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+        if errors:
+            # Surface stage failures (e.g. provider errors) to the consumer
+            raise errors[0]
+    finally:
+        for stage in stages:
+            stage.cancel()
+        await asyncio.gather(*stages, return_exceptions=True)
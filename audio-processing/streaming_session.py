@@ -0,0 +1,212 @@
+"""
+Streaming session: long-lived VAD/ASR state per inbound track, one LLM turn per utterance.
+"""
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+import numpy as np
+
+from audio_processing.ring_buffer import AudioRingBuffer
+
+logger = logging.getLogger("streaming-session")
+
+
+class StreamingSession:
+    """Consumes a track as a continuous stream and fires a turn on end-of-utterance."""
+    def __init__(self, pipeline: Any, on_utterance: Callable[[str], Awaitable[None]],
+                 sample_rate: int = 48000, speech_threshold: float = 500.0,
+                 end_of_utterance_ms: int = 600, min_speech_ms: int = 200,
+                 partial_interval_ms: int = 300, max_utterance_s: float = 10.0,
+                 on_interrupt: Optional[Callable[[], None]] = None, barge_in_ms: int = 100,
+                 usage: Any = None):
+        self.pipeline = pipeline
+        self.usage = usage  # this call's CallMeter (cost_optimization.cost_meter), if metered
+        self.on_utterance = on_utterance
+        self.on_interrupt = on_interrupt
+        self.barge_in_ms = barge_in_ms
+        self.sample_rate = sample_rate
+        self.speech_threshold = speech_threshold  # RMS on int16 PCM
+        self._vad = pipeline.vad_stream(sample_rate, speech_threshold)
+        self.end_of_utterance_ms = end_of_utterance_ms
+        self.min_speech_ms = min_speech_ms
+        self.partial_interval_ms = partial_interval_ms
+
+        # VAD/ASR state carried across frames
+        self.in_speech = False
+        self.partial_text = ""
+        self._speech_ms = 0.0
+        self._silence_ms = 0.0
+        self._since_partial_ms = 0.0
+        # Frames are written in place; VAD/ASR read windowed views without copying
+        self._ring = AudioRingBuffer.for_duration(max_utterance_s, sample_rate)
+        self._utterance_start = 0
+        # Utterance audio is converted to the ASR rate incrementally, one batch per partial
+        self._resampler = pipeline.asr_resampler(sample_rate)
+        self._asr_ring = AudioRingBuffer.for_duration(max_utterance_s, pipeline.asr_sample_rate)
+        self._asr_start = 0
+        self._asr_converted = 0
+
+        self._turns: asyncio.Queue = asyncio.Queue()
+        self._turn_task: Optional[asyncio.Task] = None
+        self._partial_task: Optional[asyncio.Task] = None
+        self._utterance = 0  # bumped per utterance so a late partial is discarded
+        self._stopped = False
+        self.stats: Dict[str, int] = {'frames': 0, 'partials': 0, 'utterances': 0, 'barge_ins': 0,
+                                      'turn_errors': 0}
+
+    async def run(self, frames: AsyncIterable) -> None:
+        """Feed every frame of the stream; turns run in a worker so the frame loop never blocks."""
+        worker = asyncio.create_task(self._turn_worker())
+        try:
+            async for pcm in frames:
+                await self.feed(pcm)
+                if self._stopped:
+                    break
+        finally:
+            self._cancel_partial()
+            await self._turns.put(None)
+            await worker
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    async def feed(self, pcm) -> None:
+        """Advance VAD/ASR state by one int16 mono PCM frame (bytes or memoryview)."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        frame_ms = samples.size * 1000.0 / self.sample_rate
+        self.stats['frames'] += 1
+        self._ring.write(samples)
+
+        vad_start = time.perf_counter()
+        is_speech = await self._vad.process(samples)
+        self.pipeline.record_stage('vad', (time.perf_counter() - vad_start) * 1000)
+
+        if is_speech:
+            if not self.in_speech:
+                self._start_utterance(self._ring.written - samples.size)
+            self.in_speech = True
+            self._speech_ms += frame_ms
+            self._silence_ms = 0.0
+        elif self.in_speech:
+            self._silence_ms += frame_ms
+
+        if not self.in_speech:
+            return
+
+        # Caller talks over the agent: cancel the turn within this frame
+        if self._silence_ms == 0.0 and self._speech_ms >= self.barge_in_ms and self.responding:
+            self.barge_in()
+
+        self._since_partial_ms += frame_ms
+
+        if (self._silence_ms >= self.end_of_utterance_ms
+                or self._ring.written - self._utterance_start >= self._ring.capacity):
+            await self._end_utterance()
+        elif self._since_partial_ms >= self.partial_interval_ms and self._partial_task is None:
+            # In the background: a slow ASR call must not stall frame intake (or barge-in)
+            self._since_partial_ms = 0.0
+            self._partial_task = asyncio.create_task(self._partial(self.asr_audio().data, self._utterance))
+
+    async def _partial(self, audio, utterance: int) -> None:
+        try:
+            text = await self.pipeline.transcribe(audio, key=self)
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {e}")
+            return
+        finally:
+            if self._partial_task is asyncio.current_task():
+                self._partial_task = None
+        if utterance != self._utterance:
+            return  # the utterance ended meanwhile; its final transcript is authoritative
+        self.partial_text = text
+        self.stats['partials'] += 1
+        self.pipeline.on_partial(text, self.usage)
+
+    def _cancel_partial(self) -> None:
+        if self._partial_task is not None:
+            self._partial_task.cancel()
+            self._partial_task = None
+
+    @property
+    def responding(self) -> bool:
+        """True while an LLM/TTS turn is in flight."""
+        return self._turn_task is not None and not self._turn_task.done()
+
+    async def finish_turn(self, timeout: float) -> None:
+        """Let the in-flight turn finish for up to ``timeout`` seconds, then cancel it."""
+        task = self._turn_task
+        if task is None or task.done():
+            return
+        await asyncio.wait([task], timeout=timeout)
+        if not task.done() and self._turn_task is task:
+            self.barge_in()
+
+    def barge_in(self) -> None:
+        """Cancel the in-flight turn (LLM and TTS generators with it) and notify the owner."""
+        self.pipeline.interrupt()
+        self._turn_task.cancel()
+        self._turn_task = None
+        self.stats['barge_ins'] += 1
+        if self.on_interrupt:
+            self.on_interrupt()
+
+    def utterance_audio(self) -> np.ndarray:
+        """Zero-copy view of the current utterance in the ring buffer."""
+        start = max(self._utterance_start, self._ring.oldest)
+        return self._ring.window(start, self._ring.written)
+
+    def asr_audio(self) -> np.ndarray:
+        """Current utterance at the ASR rate; only samples new since the last call are resampled."""
+        start = max(self._asr_converted, self._ring.oldest)
+        if start < self._ring.written:
+            self._asr_ring.write(self._resampler.process(self._ring.window(start, self._ring.written)))
+            self._asr_converted = self._ring.written
+        return self._asr_ring.window(max(self._asr_start, self._asr_ring.oldest), self._asr_ring.written)
+
+    def _start_utterance(self, start: int) -> None:
+        self._utterance += 1
+        self._utterance_start = start
+        self._asr_converted = start
+        self._asr_start = self._asr_ring.written
+        self._resampler.reset()
+
+    async def _end_utterance(self) -> None:
+        self._cancel_partial()  # the final decode below supersedes it
+        if self._speech_ms >= self.min_speech_ms:
+            audio = self.asr_audio()
+            text = await self.pipeline.transcribe(audio.data, key=self)
+            self.stats['utterances'] += 1
+            if self.usage is not None:
+                self.usage.stt(audio.size / self.pipeline.asr_sample_rate)
+            await self._turns.put(text)
+        else:
+            self.pipeline.cancel_speculation()  # too short to be a turn
+        self._reset()
+
+    def _reset(self) -> None:
+        self.in_speech = False
+        self.partial_text = ""
+        self._speech_ms = 0.0
+        self._silence_ms = 0.0
+        self._since_partial_ms = 0.0
+
+    async def _turn_worker(self) -> None:
+        while True:
+            text = await self._turns.get()
+            if text is None:
+                break
+            task = self._turn_task = asyncio.create_task(self.on_utterance(text))
+            try:
+                # wait() does not raise when the turn is cancelled by a barge-in
+                await asyncio.wait([task])
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            self._turn_task = None
+            if not task.cancelled() and task.exception() is not None:
+                # One failed turn must not end the call: log it and keep taking turns
+                error = task.exception()
+                self.stats['turn_errors'] += 1
+                self.pipeline.metrics.inc('voice_turn_errors_total', tenant=self.pipeline.tenant_id)
+                logger.error(f"Turn failed: {error!r}", exc_info=error)
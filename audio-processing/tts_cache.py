@@ -0,0 +1,203 @@
+"""
+TTS phrase cache: content-addressed synthesized audio, byte-bounded memory LRU, mmap'd disk tier.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Optional, Union
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+logger = logging.getLogger("tts-cache")
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Case and whitespace do not change the synthesized audio; punctuation does."""
+    return _SPACE.sub(" ", text.strip().lower())
+
+
+def cache_key(voice_id: str, text: str, speed: float = 1.0, prosody: Optional[Dict] = None) -> str:
+    payload = [voice_id, normalize_text(text), round(speed, 3), sorted((prosody or {}).items())]
+    return hashlib.sha256(json.dumps(payload, default=str).encode()).hexdigest()
+
+
+class TTSCache:
+    """Two-tier cache of synthesized phrases; hits stream zero-copy slices of the cached audio."""
+    def __init__(self, max_memory_bytes: int = 64 << 20, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 1 << 30, max_entry_bytes: int = 2 << 20,
+                 chunk_bytes: int = 4096, max_open_maps: int = 256,
+                 metrics: PipelineMetrics = METRICS):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.chunk_bytes = chunk_bytes
+        self.max_open_maps = max_open_maps
+        self.metrics = metrics
+        self.memory_bytes = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._maps: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+
+        self.disk_dir = disk_dir
+        self.disk_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._writing: set = set()  # keys whose file is being written off the loop
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(disk_dir):
+                if name.endswith(".pcm"):
+                    st = os.stat(os.path.join(disk_dir, name))
+                    entries.append((st.st_mtime, name[:-4], st.st_size))
+            for _, key, size in sorted(entries):
+                self._disk[key] = size
+                self.disk_bytes += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pcm")
+
+    def get(self, key: str) -> Optional[Union[bytes, memoryview]]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self._count('hit', 'memory', len(audio))
+            return audio
+        if key in self._disk:
+            view = self._map(key)
+            if view is not None:
+                self._count('hit', 'disk', len(view))
+                return view
+        self.metrics.inc('voice_tts_cache_total', outcome='miss')
+        return None
+
+    def _map(self, key: str) -> Optional[memoryview]:
+        mapped = self._maps.get(key)
+        if mapped is None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                self._drop_disk(key)
+                return None
+            self._maps[key] = mapped
+            while len(self._maps) > self.max_open_maps:
+                # Unreferenced maps are unmapped by GC; live slices keep theirs valid
+                self._maps.popitem(last=False)
+        self._maps.move_to_end(key)
+        self._disk.move_to_end(key)
+        return memoryview(mapped)
+
+    def _count(self, outcome: str, tier: str, size: int) -> None:
+        self.metrics.inc('voice_tts_cache_total', outcome=outcome, tier=tier)
+        self.metrics.inc('voice_tts_cache_bytes_saved_total', size)
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Cache ``audio`` in memory and, with a disk tier, write it through synchronously."""
+        if not self._remember(key, audio):
+            return
+        if self._needs_file(key) and self._write_file(key, audio):
+            self._add_disk(key, len(audio))
+
+    def _remember(self, key: str, audio: bytes) -> bool:
+        if not audio or len(audio) > self.max_entry_bytes:
+            return False
+        if key not in self._memory:
+            self.memory_bytes += len(audio)
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while self.memory_bytes > self.max_memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+        return True
+
+    def _needs_file(self, key: str) -> bool:
+        return bool(self.disk_dir) and key not in self._disk and key not in self._writing
+
+    def _write_file(self, key: str, audio: bytes) -> bool:
+        # File I/O only, no shared state: safe to run on an executor thread
+        tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, self._path(key))  # atomic: readers never see a partial file
+        except OSError as e:
+            logger.warning(f"TTS cache disk write failed: {e}")
+            return False
+        return True
+
+    def _add_disk(self, key: str, size: int) -> None:
+        if key in self._disk:
+            return
+        self._disk[key] = size
+        self.disk_bytes += size
+        while self.disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            self._drop_disk(next(iter(self._disk)), unlink=True)
+
+    def _drop_disk(self, key: str, unlink: bool = False) -> None:
+        self.disk_bytes -= self._disk.pop(key, 0)
+        self._maps.pop(key, None)
+        if unlink:
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    async def stream(self, key: str, synthesize: Callable[[], AsyncIterable[bytes]]) -> AsyncIterator[bytes]:
+        """Serve ``key`` from cache, or synthesize it, stream it live and cache it once complete."""
+        audio = self.get(key)
+        if audio is not None:
+            view = memoryview(audio)
+            for i in range(0, len(view), self.chunk_bytes):
+                yield view[i:i + self.chunk_bytes]
+            return
+
+        parts = []
+        size = 0
+        async for chunk in synthesize():
+            yield chunk
+            size += len(chunk)
+            if size <= self.max_entry_bytes:
+                parts.append(bytes(chunk))
+        # Only phrases synthesized to the end are cached (a barge-in closes the generator first)
+        if size <= self.max_entry_bytes:
+            audio = b"".join(parts)
+            # Index bookkeeping stays on the loop; only the file write goes to a thread
+            if self._remember(key, audio) and self._needs_file(key):
+                self._writing.add(key)
+                try:
+                    written = await asyncio.get_running_loop().run_in_executor(
+                        None, self._write_file, key, audio)
+                finally:
+                    self._writing.discard(key)
+                if written:
+                    self._add_disk(key, len(audio))
+
+    def stats(self) -> Dict[str, float]:
+        hits = sum(self.metrics.counter('voice_tts_cache_total', outcome='hit', tier=tier)
+                   for tier in ('memory', 'disk'))
+        misses = self.metrics.counter('voice_tts_cache_total', outcome='miss')
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'bytes_saved': self.metrics.counter('voice_tts_cache_bytes_saved_total'),
+            'memory_entries': len(self._memory),
+            'memory_bytes': self.memory_bytes,
+            'disk_entries': len(self._disk),
+            'disk_bytes': self.disk_bytes,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_tts_cache() -> TTSCache:
+    """Process-wide phrase cache shared by every call (disk tier when TTS_CACHE_DIR is set)."""
+    return TTSCache(max_memory_bytes=int(os.getenv("TTS_CACHE_MEMORY_MB", "64")) << 20,
+                    disk_dir=os.getenv("TTS_CACHE_DIR") or None,
+                    max_disk_bytes=int(os.getenv("TTS_CACHE_DISK_MB", "1024")) << 20)
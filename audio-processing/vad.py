@@ -0,0 +1,175 @@
+"""
+VAD engine: vectorized energy gate, optional ONNX neural model, one batched inference per tick across calls.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+import asyncio
+import logging
+import os
+import numpy as np
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+from audio_processing.resampler import Resampler
+
+try:
+    import onnxruntime
+except Exception:
+    onnxruntime = None
+
+logger = logging.getLogger("vad")
+
+
+def frame_rms(frames: np.ndarray) -> np.ndarray:
+    """RMS of each row of a (batch, samples) int16/float array, in input units."""
+    frames = np.atleast_2d(frames)
+    if frames.shape[1] == 0:
+        return np.zeros(frames.shape[0])
+    energy = np.einsum('ij,ij->i', frames, frames, dtype=np.float64)
+    return np.sqrt(energy / frames.shape[1])
+
+
+class OnnxVAD:
+    """Silero-style ONNX VAD: (batch, context + window) float32 + recurrent state -> speech probability."""
+    def __init__(self, model_path: str, sample_rate: int = 16000, window: int = 512,
+                 context: int = 64, threads: int = 1):
+        if onnxruntime is None:
+            raise RuntimeError("onnxruntime is not installed")
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.sample_rate = sample_rate
+        self.window = window
+        self.context = context
+        self._sr = np.array(sample_rate, dtype=np.int64)
+
+    def initial_state(self) -> np.ndarray:
+        return np.zeros((2, 1, 128), dtype=np.float32)
+
+    def infer(self, windows: np.ndarray, state: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """windows (B, context + window), state (2, B, 128) -> probabilities (B,), new state."""
+        probs, state = self.session.run(None, {'input': windows, 'state': state, 'sr': self._sr})
+        return probs.reshape(-1), state
+
+
+class VADBatcher:
+    """Collects windows from every call in the process and scores them in one model call per tick.
+
+    A batch is flushed when it reaches ``max_batch`` or ``max_wait_ms`` after its first window,
+    whichever comes first, so one call's added latency is bounded by max_wait_ms (plus inference).
+    Inference runs on a dedicated thread so the event loop keeps pumping audio meanwhile.
+    """
+    def __init__(self, model, max_batch: int = 256, max_wait_ms: float = 5.0,
+                 metrics: PipelineMetrics = METRICS):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.metrics = metrics
+        self._pending: List[Tuple[np.ndarray, np.ndarray, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vad")
+
+    async def infer(self, window: np.ndarray, state: np.ndarray) -> Tuple[float, np.ndarray]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((window, state, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[np.ndarray, np.ndarray, asyncio.Future]]) -> None:
+        windows = np.stack([w for w, _, _ in batch])
+        states = np.concatenate([s for _, s, _ in batch], axis=1)
+        try:
+            probs, states = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.model.infer, windows, states)
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.metrics.inc('voice_vad_batches_total')
+        self.metrics.inc('voice_vad_windows_total', len(batch))
+        for i, (_, _, future) in enumerate(batch):
+            if not future.done():  # the caller may have been cancelled meanwhile
+                future.set_result((float(probs[i]), states[:, i:i + 1]))
+
+
+class VADStream:
+    """Per-call VAD state: energy gate on every frame, neural windows scored through the batcher."""
+    def __init__(self, sample_rate: int = 48000, energy_threshold: float = 500.0,
+                 batcher: Optional[VADBatcher] = None, speech_probability: float = 0.5,
+                 energy_floor: Optional[float] = None):
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold  # RMS on int16 PCM
+        self.batcher = batcher
+        self.speech_probability = speech_probability
+        self.probability = 0.0
+        self.speech = False
+        if batcher is None:
+            return
+
+        model = batcher.model
+        # Quiet frames never reach the model
+        self.energy_floor = energy_threshold / 5 if energy_floor is None else energy_floor
+        self._resampler = Resampler(sample_rate, model.sample_rate)
+        self._span = model.context + model.window
+        self._buffer = np.zeros(self._span + model.window, dtype=np.float32)
+        self._filled = model.context  # context starts as silence
+        self._state = model.initial_state()
+
+    async def process(self, pcm: Union[bytes, memoryview, np.ndarray]) -> bool:
+        """Advance by one int16 mono frame; True if the frame is speech."""
+        samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        rms = float(frame_rms(samples)[0]) if samples.size else 0.0
+        if self.batcher is None:
+            self.speech = rms >= self.energy_threshold
+            return self.speech
+
+        model = self.batcher.model
+        audio = self._resampler.process(samples).astype(np.float32) / 32768.0
+        gated = rms < self.energy_floor
+        while audio.size:
+            take = min(audio.size, self._buffer.size - self._filled)
+            self._buffer[self._filled:self._filled + take] = audio[:take]
+            self._filled += take
+            audio = audio[take:]
+            if self._filled < self._span:
+                continue
+            if gated:
+                self.probability = 0.0
+            else:
+                self.probability, self._state = await self.batcher.infer(
+                    self._buffer[:self._span].copy(), self._state)
+            # Keep the tail of this window as the next window's context
+            rest = self._filled - model.window
+            self._buffer[:rest] = self._buffer[model.window:self._filled]
+            self._filled = rest
+        self.speech = not gated and self.probability >= self.speech_probability
+        return self.speech
+
+
+@lru_cache(maxsize=8)
+def get_vad_batcher(model_path: Optional[str] = None, max_batch: int = 256,
+                    max_wait_ms: float = 5.0) -> Optional[VADBatcher]:
+    """Process-wide batcher for ``model_path`` (shared by every call); None -> energy-only VAD."""
+    model_path = model_path or os.getenv("VAD_MODEL_PATH")
+    if not model_path:
+        return None
+    try:
+        model = OnnxVAD(model_path)
+    except Exception as e:
+        logger.warning(f"Neural VAD unavailable ({e}); falling back to energy VAD")
+        return None
+    return VADBatcher(model, max_batch=max_batch, max_wait_ms=max_wait_ms)
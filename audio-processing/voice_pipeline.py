@@ -1,54 +1,279 @@
 """
 Voice architecture for <500ms: Neural VAD, partial ASR, token TTS, interrupts, budgeting.
 """
-from typing import AsyncGenerator, Dict
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, AsyncGenerator, Callable, Dict, Hashable, Optional, Tuple, Union
+import os
 import time
 import asyncio
 
+from audio_processing.asr_pool import PLACEHOLDER_TEXT, get_asr_pool
+from audio_processing.fillers import DEFAULT_FILLERS, FILLERS, mask_latency
+from audio_processing.metrics import METRICS, PipelineMetrics
+from audio_processing.resampler import Resampler
+from audio_processing.speculation import SpeculativeLLM
+from audio_processing.stage_graph import stream_speech
+from audio_processing.tts_cache import cache_key, get_tts_cache
+from audio_processing.vad import VADStream, get_vad_batcher
+
+# Stage over budget -> degradation applied to the next turn
+DEFAULT_DEGRADATIONS = {'asr': 'shorter_response', 'llm': 'cheaper_model', 'tts': 'shorter_response'}
+
 class VoicePipeline:
     """Voice pipeline with latency controls."""
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, metrics: PipelineMetrics = METRICS):
         self.config = config
         self.budget = { 'vad': 50, 'asr': 100, 'llm': 200, 'tts': 100 }  # ms per stage
+        self.budget.update(config.get('budget', {}))
+        self.asr_sample_rate = config.get('asr_sample_rate', 16000)  # ASR engines want 16 kHz mono
+        self._interrupted = False
+
+        # Latency instrumentation & budget enforcement
+        self.metrics = metrics
+        self.tenant_id = config.get('tenant', {}).get('id', 'default')
+        self.degradations = config.get('degradations', DEFAULT_DEGRADATIONS)
+        self.llm_model = config.get('llm_model', 'gpt-4o')
+        self.fallback_llm_model = config.get('fallback_llm_model', 'gpt-4o-mini')
+        self.short_response_parts = config.get('short_response_parts', 2)
+        # (text, commit) -> model, e.g. complexity routing; commit=False peeks for speculation
+        self.model_router: Optional[Callable[[str, bool], str]] = None
+        self.active_degradations = set()
+        self._pending_degradations = set()
+        self.last_response: Optional[str] = None  # full text of the last completed LLM reply
+
+        # Local batched ASR (process pool shared by every call) instead of the vendor API
+        self.asr_pool = None
+        if config.get('local_asr', os.getenv('LOCAL_ASR', '') == '1'):
+            self.asr_pool = get_asr_pool(config.get('local_asr_backend'), config.get('local_asr_workers'))
+
+        # Repeated phrases (greetings, confirmations) are served from the phrase cache
+        self.voice_id = config.get('voice_id', '21m00Tcm4TlvDq8ikWAM')
+        self.tts_sample_rate = config.get('tts_sample_rate', 16000)  # PCM rate the TTS stage emits
+        self.tts_speed = config.get('tts_speed', 1.0)
+        self.tts_prosody = config.get('tts_prosody')
+        self.tts_cache = get_tts_cache() if config.get('tts_cache', True) else None
+
+        # Fillers mask a slow turn; per tenant: True (defaults), a phrase list, or off
+        fillers = config.get('tenant', {}).get('fillers', config.get('fillers', False))
+        self.filler_phrases = list(DEFAULT_FILLERS) if fillers is True else list(fillers or [])
+
+        # Energy-gated neural VAD; the model batcher is shared by every call in the process
+        self.vad_batcher = get_vad_batcher(config.get('vad_model_path'),
+                                           config.get('vad_max_batch', 256),
+                                           config.get('vad_max_wait_ms', 5.0))
+
+        # Speculative LLM on stable partial transcripts
+        self.speculation = None
+        if config.get('speculative_llm', True):
+            self.speculation = SpeculativeLLM(
+                self, similarity_threshold=config.get('speculation_threshold', 0.9),
+                stable_partials=config.get('speculation_stable_partials', 2))
+
+    def record_stage(self, stage: str, ms: float) -> None:
+        """Record a stage latency; an overrun degrades the next turn per self.degradations."""
+        self.metrics.record(stage, ms, self.tenant_id)
+        budget = self.budget.get(stage)
+        if budget is not None and ms > budget:
+            self.metrics.inc('voice_stage_budget_overruns_total', tenant=self.tenant_id, stage=stage)
+            action = self.degradations.get(stage)
+            if action:
+                self._pending_degradations.add(action)
+
+    @contextmanager
+    def timed(self, stage: str):
+        # Only completed stages are recorded; a cancelled (barged-in) stage is not a latency sample
+        start = time.perf_counter()
+        yield
+        self.record_stage(stage, (time.perf_counter() - start) * 1000)
+
+    def asr_resampler(self, src_rate: int, channels: int = 1) -> Resampler:
+        """Resample/downmix stage in front of ASR (filters are cached per rate/channel tuple)."""
+        return Resampler(src_rate, self.asr_sample_rate, channels)
+
+    def vad_stream(self, sample_rate: int, energy_threshold: float = 500.0) -> VADStream:
+        """Per-call VAD state feeding the shared batcher."""
+        return VADStream(sample_rate, energy_threshold, self.vad_batcher,
+                         self.config.get('vad_speech_probability', 0.5))
 
     async def process_stream(self, audio_data: bytes) -> AsyncGenerator[bytes, None]:
-        start = time.time()
-        
-        # 1. Neural VAD (Simulated)
-        is_intent = await self.detect_intent(audio_data)
+        # 1. Neural VAD
+        with self.timed('vad'):
+            is_intent = await self.detect_intent(audio_data)
         if not is_intent:
             return
 
-        # 2. Partial ASR (Simulated)
-        text = await self.partial_asr(audio_data)
-        
-        # Latency check
-        if (time.time() - start) * 1000 > self.budget['vad'] + self.budget['asr']:
-            print("⚠️ Latency warning in ASR stage")
+        # 2. Partial ASR
+        text = await self.transcribe(audio_data)
+
+        # 3. LLM & Token TTS
+        async for chunk in self.respond(text):
+            yield chunk
+
+    async def transcribe(self, data: Union[bytes, memoryview], key: Optional[Hashable] = None) -> str:
+        """Timed ASR stage; ``key`` identifies the stream so a newer partial supersedes a queued one."""
+        with self.timed('asr'):
+            return await self.partial_asr(data, key)
+
+    def on_partial(self, text: str, usage: Any = None) -> None:
+        """Partial transcript from the session; may start speculative generation."""
+        if self.speculation:
+            self.speculation.on_partial(text, usage)
+
+    def cancel_speculation(self) -> None:
+        if self.speculation:
+            self.speculation.cancel()
+
+    def turn_settings(self, degradations, text: Optional[str] = None,
+                      commit: bool = True) -> Tuple[str, Optional[int]]:
+        """(model, max_parts) for a turn under the given degradations; ``commit=False`` for a
+        speculative run, which must not count as (or change the routing of) a turn."""
+        if 'cheaper_model' in degradations:
+            model = self.fallback_llm_model
+        elif self.model_router is not None and text:
+            model = self.model_router(text, commit)
+        else:
+            model = self.llm_model
+        max_parts = self.short_response_parts if 'shorter_response' in degradations else None
+        return model, max_parts
+
+    def _llm_stream(self, text: str, usage: Any = None) -> AsyncGenerator[str, None]:
+        # Route the final transcript first (this commits the turn); a speculative run made
+        # with other settings is a miss
+        model, max_parts = self.turn_settings(self.active_degradations, text)
+        run = self.speculation.take(text, (model, max_parts)) if self.speculation else None
+        if run is not None:
+            return run.stream()
+        return self.metered_llm(text, model, max_parts, usage)
+
+    async def metered_llm(self, text: str, model: Optional[str] = None, max_parts: Optional[int] = None,
+                          usage: Any = None) -> AsyncGenerator[str, None]:
+        """LLM call with its tokens metered to ``usage`` (the call's CallMeter), including
+        generations cut short or thrown away."""
+        model = model or self.llm_model
+        completion = 0
+        try:
+            async for part in self.mock_llm(text, model, max_parts):
+                completion += len(part)
+                yield part
+        finally:
+            if usage is not None:
+                usage.llm_chars(model, len(text), completion)
+
+    async def respond(self, text: str, usage: Any = None) -> AsyncGenerator[bytes, None]:
+        """LLM & token TTS for one finished utterance (see StreamingSession).
 
-        # 3. LLM & Token TTS (Simulated streaming)
+        ``usage`` is the call's CallMeter (cost_optimization.cost_meter); LLM tokens and TTS
+        characters of this turn are metered to it.
+
+        Tokens are segmented into clauses and each clause is synthesized as soon as it
+        closes (see stage_graph.stream_speech), so first audio follows the first clause.
+        """
         # In reality, this would use OpenAI/Anthropic streaming + ElevenLabs/Cartesia
-        async for chunk in self.mock_llm_and_tts(text):
+        self._interrupted = False
+        self.last_response = None
+        self.active_degradations, self._pending_degradations = self._pending_degradations, set()
+
+        audio = stream_speech(self._timed_llm(text, usage), partial(self._timed_tts, usage=usage),
+                              segment_queue=self.config.get('segment_queue', 4),
+                              audio_queue=self.config.get('audio_queue', 32))
+        if self.filler_phrases:
+            # Nothing to say within the LLM budget: play a filler until real audio is ready
+            audio = mask_latency(audio, FILLERS.pick(self.voice_id, self.filler_phrases),
+                                 self.budget['llm'], on_filler=self._on_filler)
+        async for chunk in audio:
             yield chunk
-            
-            # 4. Interrupt Arbitration (Simulated)
+
+            # 4. Interrupt Arbitration (barge-in also cancels the consuming task outright)
             if await self.check_interrupt():
-                break
+                return
 
-    async def detect_intent(self, data: bytes) -> bool:
-        # Real implementation would use Silero VAD or similar
-        return True
+    async def speak(self, text: str, usage: Any = None) -> AsyncGenerator[bytes, None]:
+        """TTS for a ready reply (e.g. a cached response), segmented like a streamed one."""
+        async def reply() -> AsyncGenerator[str, None]:
+            yield text
 
-    async def partial_asr(self, data: bytes) -> str:
-        # Real implementation would use Faster-Whisper or Deepgram
-        return "Hello, I need help with my account."
+        self._interrupted = False
+        self.cancel_speculation()
+        async for chunk in stream_speech(reply(), partial(self._timed_tts, usage=usage)):
+            yield chunk
+            if await self.check_interrupt():
+                return
 
-    async def mock_llm_and_tts(self, text: str) -> AsyncGenerator[bytes, None]:
+    async def prepare_fillers(self) -> None:
+        """Pre-synthesize this tenant's fillers in the agent's voice (call once at startup)."""
+        if self.filler_phrases:
+            await FILLERS.prepare(self.voice_id, self.filler_phrases, self.synthesize)
+
+    def _on_filler(self, cut: bool) -> None:
+        self.metrics.inc('voice_fillers_total', tenant=self.tenant_id, outcome='cut' if cut else 'played')
+
+    async def _timed_llm(self, text: str, usage: Any = None) -> AsyncGenerator[str, None]:
+        # llm = time to first token
+        start = time.perf_counter()
+        first = True
+        parts = []
+        async for token in self._llm_stream(text, usage):
+            if first:
+                self.record_stage('llm', (time.perf_counter() - start) * 1000)
+                first = False
+            parts.append(token)
+            yield token
+        self.last_response = "".join(parts)
+
+    async def _timed_tts(self, segment: str, usage: Any = None) -> AsyncGenerator[bytes, None]:
+        # tts = time from closed segment to its first audio
+        start = time.perf_counter()
+        first = True
+        async for chunk in self.synthesize(segment, usage):
+            if first:
+                self.record_stage('tts', (time.perf_counter() - start) * 1000)
+                first = False
+            yield chunk
+
+    async def detect_intent(self, data: Union[bytes, memoryview], sample_rate: int = 48000) -> bool:
+        return await self.vad_stream(sample_rate).process(data)
+
+    async def partial_asr(self, data: Union[bytes, memoryview], key: Optional[Hashable] = None) -> str:
+        if self.asr_pool is None:
+            return PLACEHOLDER_TEXT
+        return await self.asr_pool.transcribe(data, key)
+
+    async def mock_llm(self, text: str, model: Optional[str] = None,
+                       max_parts: Optional[int] = None) -> AsyncGenerator[str, None]:
         # Simulating token-by-token response
         response_parts = ["I can help", " with that.", " What seems to", " be the issue?"]
-        for part in response_parts:
+        for part in response_parts[:max_parts]:
             await asyncio.sleep(0.05) # Simulate processing
-            yield f"audio_chunk_{hash(part)}".encode()
+            yield part
+
+    async def mock_tts(self, text: str) -> AsyncGenerator[bytes, None]:
+        yield f"audio_chunk_{hash(text)}".encode()
+
+    async def synthesize(self, text: str, usage: Any = None) -> AsyncGenerator[bytes, None]:
+        """TTS through the phrase cache (keyed by voice, normalized text and prosody)."""
+        if self.tts_cache is None:
+            async for chunk in self._vendor_tts(text, usage):
+                yield chunk
+            return
+        key = cache_key(self.voice_id, text, self.tts_speed, self.tts_prosody)
+        async for chunk in self.tts_cache.stream(key, lambda: self._vendor_tts(text, usage)):
+            yield chunk
+
+    def _vendor_tts(self, text: str, usage: Any = None) -> AsyncGenerator[bytes, None]:
+        # Billed per character; phrase-cache hits never get here
+        if usage is not None:
+            usage.tts(len(text))
+        return self.mock_tts(text)
+
+    async def mock_llm_and_tts(self, text: str) -> AsyncGenerator[bytes, None]:
+        async for part in self.mock_llm(text):
+            async for chunk in self.synthesize(part):
+                yield chunk
+
+    def interrupt(self) -> None:
+        """Caller barged in: stop the current response at the next chunk boundary."""
+        self._interrupted = True
 
     async def check_interrupt(self) -> bool:
-        return False
+        return self._interrupted
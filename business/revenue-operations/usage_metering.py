@@ -63,20 +63,35 @@ class UsageMeter:
         self.db_dsn = db_dsn
         self.producer = KafkaProducer() if KafkaProducer else None
 
-    async def record_usage(self, metric: UsageMetric):
-        # Store usage point in time-series (Redis or Postgres)
-        key = f"usage:{metric.tenant_id}:{metric.metric_name}"
-        point = {
+    @staticmethod
+    def _point(metric: UsageMetric) -> Dict[str, str]:
+        return {
             "value": str(metric.value),
             "unit": metric.unit,
             "timestamp": metric.timestamp.isoformat(),
-            "resource_id": metric.resource_id
+            "resource_id": metric.resource_id,
+            "tags": metric.tags
         }
+
+    async def record_usage(self, metric: UsageMetric):
+        # Store usage point in time-series (Redis or Postgres)
+        key = f"usage:{metric.tenant_id}:{metric.metric_name}"
+        point = self._point(metric)
         self.redis_conn.rpush(key, json.dumps(point))
         # Optionally produce to Kafka
         if self.producer:
             self.producer.send('usage-metrics', json.dumps(point).encode())
 
+    def record_usage_batch(self, metrics: List[UsageMetric]):
+        """Store many points in one pipelined round trip (blocking: call it off the event loop)."""
+        pipe = self.redis_conn.pipeline(transaction=False)
+        for metric in metrics:
+            point = json.dumps(self._point(metric))
+            pipe.rpush(f"usage:{metric.tenant_id}:{metric.metric_name}", point)
+            if self.producer:
+                self.producer.send('usage-metrics', point.encode())
+        pipe.execute()
+
     def calculate_bill(self, usage_points: List[UsageMetric], plan: PricingPlan) -> Decimal:
         # Aggregate by metric
         totals = {}
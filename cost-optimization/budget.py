@@ -0,0 +1,272 @@
+"""
+Token budgets: per-tenant daily budgets and per-second token buckets in Redis (Lua), with local leases on the hot path.
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import math
+import os
+import time
+
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    aioredis = None
+
+logger = logging.getLogger("token-budget")
+
+# tier -> (tokens per day, tokens per second)
+TIER_LIMITS: Dict[str, Tuple[int, float]] = {
+    'starter': (1000, 50.0),
+    'business': (10000, 200.0),
+    'enterprise': (100000, 1000.0),
+}
+
+# Grants between `need` and `want` tokens from both the daily budget and the rate bucket, or none.
+# The clock is Redis TIME, so every worker refills the bucket against the same clock.
+_ACQUIRE = """
+local want, need = tonumber(ARGV[1]), tonumber(ARGV[2])
+local limit, rate, burst = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1e6
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local b = redis.call('HMGET', KEYS[2], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or burst
+local ts = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local grant = math.floor(math.min(want, limit - used, tokens))
+if grant < need then grant = 0 end
+if grant > 0 then
+  redis.call('INCRBY', KEYS[1], grant)
+  redis.call('EXPIRE', KEYS[1], tonumber(ARGV[6]))
+  tokens = tokens - grant
+end
+redis.call('HSET', KEYS[2], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[2], 3600)
+return {grant, limit - used - grant}
+"""
+
+# Unused leased tokens go back to the daily budget (never below zero)
+_RELEASE = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local back = math.min(used, tonumber(ARGV[1]))
+if back > 0 then redis.call('DECRBY', KEYS[1], back) end
+return back
+"""
+
+
+def _day() -> str:
+    return time.strftime("%Y%m%d", time.gmtime())
+
+
+class RedisBudgetStore:
+    """Budget state shared by every worker; each acquire/release is one atomic script call."""
+    def __init__(self, client=None, url: Optional[str] = None, prefix: str = "budget"):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("redis is not installed")
+            client = aioredis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.client = client
+        self.prefix = prefix
+        self._acquire = client.register_script(_ACQUIRE)  # EVALSHA, reloaded on NOSCRIPT
+        self._release = client.register_script(_RELEASE)
+
+    def _keys(self, tenant_id: str, day: str):
+        # Hash tag keeps a tenant's keys in one cluster slot
+        return [f"{self.prefix}:{{{tenant_id}}}:used:{day}", f"{self.prefix}:{{{tenant_id}}}:rate"]
+
+    async def acquire(self, tenant_id: str, day: str, want: int, need: int, daily_limit: int,
+                      rate: float, burst: float) -> Tuple[int, int]:
+        grant, remaining = await self._acquire(keys=self._keys(tenant_id, day),
+                                               args=[want, need, daily_limit, rate, burst, 2 * 86400])
+        return int(grant), int(remaining)
+
+    async def release(self, tenant_id: str, day: str, tokens: int) -> None:
+        await self._release(keys=self._keys(tenant_id, day)[:1], args=[tokens])
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+class InMemoryBudgetStore:
+    """Same semantics as the Redis scripts for a single process (local dev, tests)."""
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.used: Dict[Tuple[str, str], int] = {}
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+        self.calls = 0
+
+    async def acquire(self, tenant_id: str, day: str, want: int, need: int, daily_limit: int,
+                      rate: float, burst: float) -> Tuple[int, int]:
+        self.calls += 1
+        now = self.clock()
+        used = self.used.get((tenant_id, day), 0)
+        tokens, ts = self.buckets.get(tenant_id, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+        grant = math.floor(min(want, daily_limit - used, tokens))
+        if grant < need:
+            grant = 0
+        if grant > 0:
+            self.used[(tenant_id, day)] = used + grant
+            tokens -= grant
+        self.buckets[tenant_id] = (tokens, now)
+        return grant, daily_limit - used - grant
+
+    async def release(self, tenant_id: str, day: str, tokens: int) -> None:
+        self.calls += 1
+        used = self.used.get((tenant_id, day), 0)
+        self.used[(tenant_id, day)] = used - min(used, tokens)
+
+    async def close(self) -> None:
+        pass
+
+
+class _Lease:
+    __slots__ = ('remaining', 'expires', 'day', 'refill')
+
+    def __init__(self, remaining: int, expires: float, day: str):
+        self.remaining = remaining
+        self.expires = expires
+        self.day = day
+        self.refill: Optional[asyncio.Task] = None
+
+
+class TokenBudget:
+    """Per-tenant budget checks that usually never leave the process.
+
+    Each worker takes a lease of ``lease_tokens`` from the shared store and spends it locally;
+    when a lease runs low it is topped up in the background, and unused tokens are returned
+    when it expires: by the tenant's next check, or by the sweep any check runs at most once
+    per ``lease_ttl_s`` (so an idle tenant's lease comes back too). A tenant can overshoot its
+    daily budget by at most one lease per worker.
+    """
+    def __init__(self, store=None, limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 lease_tokens: int = 500, lease_ttl_s: float = 5.0, burst_s: float = 10.0,
+                 clock=time.monotonic):
+        self.store = store or InMemoryBudgetStore()
+        self.limits = dict(limits or TIER_LIMITS)
+        self.overrides: Dict[str, Tuple[Optional[int], Optional[float]]] = {}
+        self.lease_tokens = lease_tokens
+        self.lease_ttl_s = lease_ttl_s
+        self.burst_s = burst_s
+        self.clock = clock
+        self.stats = {'local': 0, 'remote': 0, 'denied': 0, 'refills': 0, 'errors': 0}
+        self._leases: Dict[str, _Lease] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_sweep = clock() + lease_ttl_s
+
+    def set_limits(self, tenant_id: str, daily: Optional[int] = None, rate: Optional[float] = None) -> None:
+        """Per-tenant override of the tier's daily budget and/or tokens-per-second rate."""
+        self.overrides[tenant_id] = (daily, rate)
+
+    def limits_for(self, tenant_id: str, tier: str) -> Tuple[int, float]:
+        daily, rate = self.limits.get(tier, self.limits['starter'])
+        o_daily, o_rate = self.overrides.get(tenant_id, (None, None))
+        return (daily if o_daily is None else o_daily), (rate if o_rate is None else o_rate)
+
+    async def consume(self, tenant_id: str, tier: str, tokens: int) -> bool:
+        """Debit ``tokens``; False if the tenant is over its daily budget or rate."""
+        now = self.clock()
+        if now >= self._next_sweep:
+            self.sweep()
+        lease = self._leases.get(tenant_id)
+        if lease is not None and lease.expires > now and lease.remaining >= tokens:
+            # Hot path: no I/O, no await
+            lease.remaining -= tokens
+            self.stats['local'] += 1
+            if lease.remaining < self.lease_tokens // 4 and lease.refill is None:
+                lease.refill = asyncio.ensure_future(self._refill(tenant_id, tier, lease))
+            return True
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            lease = self._leases.get(tenant_id)
+            day = _day()
+            if lease is not None and (lease.expires <= self.clock() or lease.day != day):
+                self._retire(tenant_id, lease)
+                lease = None
+            if lease is not None and lease.remaining >= tokens:
+                lease.remaining -= tokens
+                self.stats['local'] += 1
+                return True
+            have = lease.remaining if lease else 0
+            granted = await self._acquire(tenant_id, tier, day, max(tokens - have, self.lease_tokens),
+                                          tokens - have)
+            if not granted:
+                self.stats['denied'] += 1
+                return False
+            self.stats['remote'] += 1
+            if lease is None:
+                lease = self._leases[tenant_id] = _Lease(0, 0.0, day)
+            lease.remaining += granted - tokens
+            lease.expires = self.clock() + self.lease_ttl_s
+            return True
+
+    async def _acquire(self, tenant_id: str, tier: str, day: str, want: int, need: int) -> int:
+        daily, rate = self.limits_for(tenant_id, tier)
+        try:
+            granted, _ = await self.store.acquire(tenant_id, day, want, max(need, 1), daily, rate,
+                                                  rate * self.burst_s)
+            return granted
+        except Exception as e:
+            # Fail open: a budget store outage must not drop live calls
+            self.stats['errors'] += 1
+            logger.error(f"Budget store unavailable for {tenant_id}, allowing turn: {e}")
+            return need
+
+    async def _refill(self, tenant_id: str, tier: str, lease: _Lease) -> None:
+        try:
+            granted = await self._acquire(tenant_id, tier, lease.day, self.lease_tokens, 1)
+            if granted and self._leases.get(tenant_id) is not lease:
+                await self._release(tenant_id, lease.day, granted)  # lease retired meanwhile
+            elif granted:
+                lease.remaining += granted
+                lease.expires = self.clock() + self.lease_ttl_s
+                self.stats['refills'] += 1
+        finally:
+            lease.refill = None
+
+    def sweep(self) -> int:
+        """Retire every expired lease, returning its unused tokens to the store; the count retired."""
+        now = self.clock()
+        self._next_sweep = now + self.lease_ttl_s
+        expired = [(tenant_id, lease) for tenant_id, lease in self._leases.items()
+                   if lease.expires <= now and not self._locks[tenant_id].locked()]  # locked: mid-acquire
+        for tenant_id, lease in expired:
+            self._retire(tenant_id, lease)
+        return len(expired)
+
+    def _retire(self, tenant_id: str, lease: _Lease) -> None:
+        if self._leases.get(tenant_id) is lease:
+            del self._leases[tenant_id]
+        if lease.remaining > 0:
+            remaining, lease.remaining = lease.remaining, 0
+            asyncio.ensure_future(self._release(tenant_id, lease.day, remaining))
+
+    async def _release(self, tenant_id: str, day: str, tokens: int) -> None:
+        try:
+            await self.store.release(tenant_id, day, tokens)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Could not return {tokens} leased tokens for {tenant_id}: {e}")
+
+    async def close(self) -> None:
+        """Return every outstanding lease (worker shutdown/drain)."""
+        leases = list(self._leases.items())
+        self._leases.clear()
+        await asyncio.gather(*(self._release(t, lease.day, lease.remaining)
+                               for t, lease in leases if lease.remaining > 0))
+
+
+@lru_cache(maxsize=1)
+def get_token_budget() -> TokenBudget:
+    """Process-wide budget; shared across workers through Redis when REDIS_URL is set."""
+    store = None
+    if os.getenv("REDIS_URL"):
+        try:
+            store = RedisBudgetStore()
+        except Exception as e:
+            logger.error(f"Token budgets are process-local (no Redis): {e}")
+    return TokenBudget(store, lease_tokens=int(os.getenv("BUDGET_LEASE_TOKENS", "500")),
+                       lease_ttl_s=float(os.getenv("BUDGET_LEASE_TTL_S", "5")))
@@ -0,0 +1,215 @@
+"""
+Complexity routing: cheap per-turn complexity score, small/large model choice, per-session decisions, JSONL routing log.
+"""
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import time
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+logger = logging.getLogger("complexity-router")
+
+_SPACE = re.compile(r"\s+")
+_SIMPLE = re.compile(
+    r"\b(hi|hello|hey|thanks?|thank you|yes|yeah|yep|no|nope|ok(ay)?|bye|goodbye|hours|open|address|"
+    r"balance|status|repeat that|reset (my )?password|(talk|speak) to (an? )?(agent|human|person))\b")
+_COMPLEX = re.compile(
+    r"\b(why|explain\w*|compar\w*|difference|troubleshoot\w*|diagnos\w*|calculat\w*|estimat\w*|"
+    r"recommend\w*|should i|pros and cons|integrat\w*|configur\w*|migrat\w*|api|error|not working|"
+    r"broken|refund|dispute|contract|polic(y|ies)|legal|complian\w*|plans?|upgrad\w*|downgrad\w*)\b")
+_CONNECTOR = re.compile(r"\b(and also|also|as well as|and then|then|plus|but|otherwise|unless)\b")
+_QUESTION = re.compile(r"\?|\b(what|how|when|where|which|who|can you|could you)\b")
+_NUMBER = re.compile(r"\d")
+
+
+class ComplexityEstimator:
+    """0-100 score from a handful of regex/arithmetic features (tens of microseconds, no model call).
+
+    Features: transcript length, number of questions, multi-part connectors, simple vs complex
+    intent keywords, conversation depth and (when known) retrieval confidence. ``weights``
+    overrides the per-feature points, e.g. after tuning against the routing log.
+    """
+    WEIGHTS = {'base': 10.0, 'length': 30.0, 'questions': 10.0, 'connectors': 8.0, 'complex': 15.0,
+               'simple': -15.0, 'numbers': 5.0, 'depth': 15.0, 'low_retrieval': 20.0}
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, max_depth: int = 20):
+        self.weights = {**self.WEIGHTS, **(weights or {})}
+        self.max_depth = max_depth
+
+    def features(self, text: str, depth: int = 0, retrieval_confidence: Optional[float] = None
+                 ) -> Dict[str, float]:
+        lowered = text.lower()
+        words = len(lowered.split())
+        return {
+            'length': min(1.0, math.log2(1 + words) / math.log2(61)),   # saturates at ~60 words
+            'questions': min(2, max(0, len(_QUESTION.findall(lowered)) - 1)),
+            'connectors': min(2, len(_CONNECTOR.findall(lowered))),
+            'complex': min(3, len(_COMPLEX.findall(lowered))),
+            'simple': min(2, len(_SIMPLE.findall(lowered))) if words <= 12 else 0,
+            'numbers': 1.0 if _NUMBER.search(lowered) else 0.0,
+            'depth': min(depth, self.max_depth) / self.max_depth,
+            'low_retrieval': 0.0 if retrieval_confidence is None else 1.0 - max(0.0, min(1.0, retrieval_confidence)),
+        }
+
+    def score(self, features: Dict[str, float]) -> int:
+        total = self.weights['base'] + sum(self.weights[k] * v for k, v in features.items())
+        return int(max(0, min(100, round(total))))
+
+    def estimate(self, text: str, depth: int = 0, retrieval_confidence: Optional[float] = None) -> int:
+        return self.score(self.features(text, depth, retrieval_confidence))
+
+
+@dataclass
+class RoutingDecision:
+    session_id: str
+    turn: int
+    model: str
+    complexity: int
+    reason: str                 # 'score' | 'sticky' | 'cached'
+    features: Dict[str, float] = field(default_factory=dict)
+
+
+class RoutingLog:
+    """Decisions and outcomes as JSON lines for offline tuning; written in batches off the loop."""
+    def __init__(self, path: Optional[str] = None, batch: int = 200, keep: int = 1000):
+        self.path = path
+        self.batch = batch
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._pending: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]) -> None:
+        record.setdefault('ts', round(time.time(), 3))
+        self.recent.append(record)
+        if self.path is None:
+            return
+        self._pending.append(record)
+        if len(self._pending) >= self.batch:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending or self.path is None:
+            return
+        records, self._pending = self._pending, []
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self._append, records)
+        except RuntimeError:
+            self._append(records)  # no loop (shutdown, scripts)
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        try:
+            with open(self.path, 'a') as f:
+                f.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+        except OSError as e:
+            logger.warning(f"Could not write routing log {self.path}: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_routing_log() -> RoutingLog:
+    """Process-wide routing log (ROUTING_LOG_PATH enables the JSONL file)."""
+    return RoutingLog(os.getenv("ROUTING_LOG_PATH") or None)
+
+
+class _Session:
+    __slots__ = ('turns', 'sticky', 'text', 'decision')
+
+    def __init__(self):
+        self.turns = 0
+        self.sticky = 0
+        self.text = ""
+        self.decision: Optional[RoutingDecision] = None
+
+
+class ComplexityRouter:
+    """Routes each turn to the small or large model and remembers the choice per session.
+
+    ``route`` commits a turn (counts it, spends a sticky follow-up, logs it); ``peek`` gives
+    the decision ``route`` would make without changing anything, for speculative runs on
+    partial transcripts. The same (normalized) text in a session reuses its decision. After
+    a complex turn the session stays on the large model for ``sticky_turns`` follow-ups
+    ("and what about...") unless a follow-up is clearly trivial.
+    """
+    def __init__(self, select_model: Callable[[int], str], estimator: Optional[ComplexityEstimator] = None,
+                 log: Optional[RoutingLog] = None, sticky_turns: int = 2,
+                 trivial_below: int = 15, max_sessions: int = 10000, metrics: PipelineMetrics = METRICS):
+        self.select_model = select_model
+        self.estimator = estimator or ComplexityEstimator()
+        self.log = log or get_routing_log()
+        self.sticky_turns = sticky_turns
+        self.trivial_below = trivial_below
+        self.max_sessions = max_sessions
+        self.metrics = metrics
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+
+    def _session(self, session_id: str) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _decide(self, session_id: str, session: _Session, text: str,
+                history: Optional[List[Dict[str, str]]], retrieval_confidence: Optional[float]
+                ) -> Tuple[RoutingDecision, int]:
+        """The next turn's decision and the sticky count after it; reads ``session`` only."""
+        depth = sum(1 for m in history or [] if m.get('role') == 'user')
+        features = self.estimator.features(text, depth, retrieval_confidence)
+        complexity = self.estimator.score(features)
+        large = self.select_model(100)
+        model, reason, sticky = self.select_model(complexity), 'score', 0
+        if model == large:
+            sticky = self.sticky_turns
+        elif session.sticky > 0 and complexity >= self.trivial_below:
+            model, reason, sticky = large, 'sticky', session.sticky - 1
+        return RoutingDecision(session_id, session.turns + 1, model, complexity, reason, features), sticky
+
+    def peek(self, session_id: str, text: str, history: Optional[List[Dict[str, str]]] = None,
+             retrieval_confidence: Optional[float] = None) -> RoutingDecision:
+        """What ``route`` would decide for ``text`` now, without committing the turn."""
+        session = self._sessions.get(session_id) or _Session()
+        if session.decision is not None and _SPACE.sub(" ", text.strip().lower()) == session.text:
+            return session.decision
+        return self._decide(session_id, session, text, history, retrieval_confidence)[0]
+
+    def route(self, session_id: str, text: str, history: Optional[List[Dict[str, str]]] = None,
+              retrieval_confidence: Optional[float] = None) -> RoutingDecision:
+        session = self._session(session_id)
+        norm = _SPACE.sub(" ", text.strip().lower())
+        if session.decision is not None and norm == session.text:
+            return session.decision
+
+        decision, session.sticky = self._decide(session_id, session, text, history, retrieval_confidence)
+        session.turns += 1
+        session.text = norm
+        self.metrics.inc('voice_model_routes_total', model=decision.model, reason=decision.reason)
+        self.log.write({'type': 'route', 'session': session_id, 'turn': session.turns, 'model': decision.model,
+                        'complexity': decision.complexity, 'reason': decision.reason,
+                        'features': decision.features})
+        session.decision = replace(decision, reason='cached')  # later calls for the same text
+        return decision
+
+    def record_outcome(self, session_id: str, decision: Optional[RoutingDecision], **outcome: Any) -> None:
+        """Attach what happened (latency, completed...) to the decision ``route`` made for the turn.
+
+        A turn that never routed (a cached reply, a forced cheaper model) passes None and is
+        logged as ``unrouted`` so it cannot be mistaken for the outcome of an earlier decision.
+        """
+        if decision is None:
+            self.log.write({'type': 'unrouted', 'session': session_id, **outcome})
+            return
+        self.log.write({'type': 'outcome', 'session': session_id, 'turn': decision.turn,
+                        'model': decision.model, 'complexity': decision.complexity, **outcome})
+
+    def end_session(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        self.log.flush()
@@ -1,37 +1,72 @@
 """
 Cost controls: Semantic caching, budgeting, tiering, caps, kill-switches.
 """
-from typing import Dict
+from typing import Dict, List, Optional
+
+from cost_optimization.budget import TokenBudget, get_token_budget
+from cost_optimization.complexity import ComplexityRouter
+from cost_optimization.cost_meter import CostMeter, get_cost_meter
+from cost_optimization.kill_switch import KillSwitch, get_kill_switch
+from cost_optimization.semantic_cache import SemanticCache, get_semantic_cache
 
 class CostController:
     """Controls costs/scaling."""
-    def __init__(self):
-        self.budgets = {'starter': 1000, 'business': 10000, 'enterprise': 100000}  # Tokens/day
+    def __init__(self, semantic_cache: Optional[SemanticCache] = None, budget: Optional[TokenBudget] = None,
+                 kill_flags: Optional[KillSwitch] = None, cost_meter: Optional[CostMeter] = None):
+        self.budget = budget or get_token_budget()  # Per-tenant tokens/day and tokens/s, shared via Redis
+        self.budgets = {tier: daily for tier, (daily, _) in self.budget.limits.items()}  # Tokens/day
         self.models = {'simple': 'gpt-4o-mini', 'complex': 'gpt-4o'}  # Tiering
-        self.tenant_usage = {}  # Per-tenant tracking (in-memory mock)
+        self.semantic_cache = semantic_cache or get_semantic_cache()
+        self.router = ComplexityRouter(self.select_model)
+        self.kill_flags = kill_flags or get_kill_switch()  # Fleet-wide, cached locally
+        self.cost_meter = cost_meter or get_cost_meter()  # Live per-call cost, batched to billing
 
-    async def semantic_cache_check(self, prompt: str) -> str:
-        # Real implementation would use GPTCache or similar
-        return None # Cache miss
+    async def semantic_cache_check(self, prompt: str, tenant_id: str = "default", context: str = "") -> Optional[str]:
+        """Cached LLM response for this prompt in this context within the tenant, else None."""
+        return await self.semantic_cache.lookup(tenant_id, prompt, context)
 
-    def budget_tokens(self, tenant_tier: str, tokens_used: int) -> bool:
-        limit = self.budgets.get(tenant_tier, 1000)
-        current = self.tenant_usage.get(tenant_tier, 0)
-        
-        if current + tokens_used > limit:
-            return False
-            
-        self.tenant_usage[tenant_tier] = current + tokens_used
-        return True
+    async def semantic_cache_store(self, prompt: str, response: str, tenant_id: str = "default",
+                                   context: str = "") -> None:
+        await self.semantic_cache.store_response(tenant_id, prompt, response, context)
+
+    async def budget_tokens(self, tenant_id: str, tokens_used: int, tenant_tier: str = 'starter') -> bool:
+        """Debit the tenant's daily budget and rate bucket; False once either is exhausted."""
+        return await self.budget.consume(tenant_id, tenant_tier, tokens_used)
 
     def select_model(self, complexity: int) -> str:
         return self.models['simple'] if complexity < 50 else self.models['complex']
 
+    def route_model(self, session_id: str, text: str, history: Optional[List[Dict[str, str]]] = None,
+                    retrieval_confidence: Optional[float] = None) -> str:
+        """Model for this turn from its estimated complexity (decisions cached per session)."""
+        return self.router.route(session_id, text, history, retrieval_confidence).model
+
+    def peek_model(self, session_id: str, text: str, history: Optional[List[Dict[str, str]]] = None,
+                   retrieval_confidence: Optional[float] = None) -> str:
+        """``route_model`` without committing the turn (speculation on partial transcripts)."""
+        return self.router.peek(session_id, text, history, retrieval_confidence).model
+
     def per_tenant_cap(self, tenant_id: str, estimated_cost: float) -> bool:
         if estimated_cost > 100.0:  # Daily $100 cap
             return False
         return True
 
-    def kill_switch(self) -> None:
-        print("🚨 KILL-SWITCH ACTIVATED: Disabling agent due to cost overrun")
-        # In real scenario, this would set a flag in Redis or DB
+    def within_cap(self, tenant_id: str) -> bool:
+        """``per_tenant_cap`` against today's metered spend, including calls still running (no I/O)."""
+        return self.per_tenant_cap(tenant_id, self.cost_meter.tenant_cost(tenant_id))
+
+    async def kill_switch(self, tenant_id: Optional[str] = None, reason: str = "cost overrun") -> None:
+        """Stop calls for one tenant (or all of them) on every worker."""
+        await self.kill_flags.activate(tenant_id, reason)
+
+    def is_killed(self, tenant_id: str) -> Optional[str]:
+        """Reason new and in-flight calls for this tenant must end, else None (no I/O)."""
+        return self.kill_flags.killed(tenant_id)
+
+    async def close(self) -> None:
+        """Worker shutdown: return leased budget tokens and flush metered usage to billing.
+
+        The budget and meter are process-wide, so call this once per process, not per call.
+        """
+        await self.budget.close()
+        await self.cost_meter.close()
@@ -0,0 +1,227 @@
+"""
+Cost metering: per-call STT seconds, LLM tokens by model and TTS characters, live cost and batched usage flushes.
+"""
+from collections import deque
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+logger = logging.getLogger("cost-meter")
+
+# USD list prices; tenants with negotiated rates pass their own table
+RATES: Dict[str, Any] = {
+    'stt_second': 0.0043 / 60,                  # streaming ASR, per audio second
+    'tts_char': 0.18 / 1000,                    # per synthesized character
+    'llm': {                                    # model -> (prompt, completion) per 1k tokens
+        'gpt-4o': (0.0025, 0.01),
+        'gpt-4o-mini': (0.00015, 0.0006),
+    },
+}
+
+UNITS = {'stt_seconds': 'second', 'llm_prompt_tokens': 'token', 'llm_completion_tokens': 'token',
+         'tts_characters': 'character'}
+
+# (call_id, tenant_id, metric, model, amount, cost); appended on the hot path, drained by flush()
+Event = Tuple[str, str, str, str, float, float]
+Sink = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+def estimate_tokens(characters: int) -> int:
+    """~4 characters per token for English text; close enough for live cost when no usage is reported."""
+    return (characters + 3) // 4
+
+
+class CallMeter:
+    """Usage of one call. Each method is a few float adds and one deque append (no lock, no await)."""
+    __slots__ = ('call_id', 'tenant_id', 'meter', 'cost', 'usage', 'started')
+
+    def __init__(self, call_id: str, tenant_id: str, meter: "CostMeter"):
+        self.call_id = call_id
+        self.tenant_id = tenant_id
+        self.meter = meter
+        self.cost = 0.0
+        self.usage: Dict[str, float] = dict.fromkeys(UNITS, 0.0)
+        self.started = time.time()
+
+    def stt(self, seconds: float) -> None:
+        self._add('stt_seconds', '', seconds, seconds * self.meter.rates['stt_second'])
+
+    def llm(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        prompt_rate, completion_rate = self.meter.llm_rates(model)
+        self._add('llm_prompt_tokens', model, prompt_tokens, prompt_tokens * prompt_rate / 1000)
+        self._add('llm_completion_tokens', model, completion_tokens, completion_tokens * completion_rate / 1000)
+
+    def llm_chars(self, model: str, prompt_chars: int, completion_chars: int) -> None:
+        self.llm(model, estimate_tokens(prompt_chars), estimate_tokens(completion_chars))
+
+    def tts(self, characters: int) -> None:
+        self._add('tts_characters', '', characters, characters * self.meter.rates['tts_char'])
+
+    def _add(self, metric: str, model: str, amount: float, cost: float) -> None:
+        if not amount:
+            return
+        self.usage[metric] += amount
+        self.cost += cost
+        self.meter._charge(self.tenant_id, cost)
+        self.meter.events.append((self.call_id, self.tenant_id, metric, model, amount, cost))
+
+
+class CostMeter:
+    """Live cost for running calls and per-tenant spend today, flushed to billing in batches.
+
+    The hot path only appends to ``events`` (a deque: appends are atomic, so ASR/TTS worker
+    threads may meter too) and bumps the call's running total. ``flush()`` drains the deque,
+    sums it per (call, metric, model) and hands the rows to ``sink`` off the turn path; a
+    failed flush is retried with the next batch. While billing stays down the retry backlog
+    is capped at ``max_retry_rows``; the oldest rows beyond it are dropped and counted.
+
+    Spend is per process and starts at zero: after a restart, or across several agent
+    processes, ``tenant_cost`` only sees what this process metered since it started. The
+    daily cap is therefore a per-process guard; billing holds the authoritative totals.
+    """
+    def __init__(self, sink: Optional[Sink] = None, rates: Optional[Dict[str, Any]] = None,
+                 flush_interval_s: float = 5.0, max_batch: int = 5000, max_retry_rows: int = 50000,
+                 metrics: PipelineMetrics = METRICS):
+        self.sink = sink
+        self.rates = {**RATES, **(rates or {})}
+        self.flush_interval_s = flush_interval_s
+        self.max_batch = max_batch
+        self.max_retry_rows = max_retry_rows
+        self.metrics = metrics
+        self.events: Deque[Event] = deque()
+        self.calls: Dict[str, CallMeter] = {}
+        self.stats = {'events': 0, 'flushes': 0, 'rows': 0, 'errors': 0, 'dropped': 0}
+        self._spend: Dict[str, float] = {}
+        self._day = _day()
+        self._retry: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def llm_rates(self, model: str) -> Tuple[float, float]:
+        table = self.rates['llm']
+        return table.get(model) or table['gpt-4o']  # unknown model: price it as the large one
+
+    def open_call(self, call_id: str, tenant_id: str) -> CallMeter:
+        call = self.calls[call_id] = CallMeter(call_id, tenant_id, self)
+        return call
+
+    def close_call(self, call_id: str) -> Optional[CallMeter]:
+        return self.calls.pop(call_id, None)
+
+    def live_cost(self, call_id: str) -> float:
+        call = self.calls.get(call_id)
+        return call.cost if call else 0.0
+
+    def tenant_cost(self, tenant_id: str) -> float:
+        """Spend today (UTC) metered by this process, including calls still running; what
+        ``per_tenant_cap`` is checked against (see the class docstring for its limits)."""
+        if self._day != _day():
+            self._day, self._spend = _day(), {}
+        return self._spend.get(tenant_id, 0.0)
+
+    def _charge(self, tenant_id: str, cost: float) -> None:
+        if self._day != _day():
+            self._day, self._spend = _day(), {}
+        self._spend[tenant_id] = self._spend.get(tenant_id, 0.0) + cost
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            while await self.flush() and len(self.events) >= self.max_batch:
+                pass  # catch up on a backlog one batch at a time
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Pop the queued events and aggregate them into usage rows."""
+        totals: Dict[Tuple[str, str, str, str], List[float]] = {}
+        events = self.events
+        for _ in range(min(len(events), self.max_batch)):
+            call_id, tenant_id, metric, model, amount, cost = events.popleft()
+            row = totals.get((call_id, tenant_id, metric, model))
+            if row is None:
+                totals[(call_id, tenant_id, metric, model)] = [amount, cost, 1]
+            else:
+                row[0] += amount
+                row[1] += cost
+                row[2] += 1
+        rows = []
+        for (call_id, tenant_id, metric, model), (amount, cost, count) in totals.items():
+            self.stats['events'] += int(count)
+            self.metrics.inc('voice_cost_usd_total', cost, tenant=tenant_id, metric=metric)
+            rows.append({'call_id': call_id, 'tenant_id': tenant_id, 'metric': metric, 'model': model,
+                         'value': amount, 'unit': UNITS[metric], 'cost': cost})
+        return rows
+
+    async def flush(self) -> int:
+        """Send the next batch (plus any failed one) to the sink; returns the number of rows written."""
+        rows, self._retry = self._retry + self.drain(), []
+        if not rows or self.sink is None:
+            return 0
+        try:
+            await self.sink(rows)
+        except Exception as e:
+            self.stats['errors'] += 1
+            dropped = max(0, len(rows) - self.max_retry_rows)
+            self._retry = rows[dropped:]
+            logger.error(f"Usage flush of {len(rows)} rows failed, retrying next batch: {e}")
+            if dropped:
+                self.stats['dropped'] += dropped
+                self.metrics.inc('voice_cost_rows_dropped_total', dropped)
+                logger.error(f"Usage retry backlog full: dropped the {dropped} oldest rows")
+            return 0
+        self.stats['flushes'] += 1
+        self.stats['rows'] += len(rows)
+        return len(rows)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+
+def _day() -> str:
+    return time.strftime("%Y%m%d", time.gmtime())
+
+
+class UsageMeterSink:
+    """Writes flushed rows to billing as ``UsageMetric`` points, the whole batch in one pipelined
+    ``UsageMeter.record_usage_batch`` call on a worker thread (its redis client is blocking)."""
+    def __init__(self, usage_meter):
+        from business.revenue_operations.usage_metering import UsageMetric
+        self.usage_meter = usage_meter
+        self.metric_type = UsageMetric
+
+    async def __call__(self, rows: List[Dict[str, Any]]) -> None:
+        from datetime import datetime
+        from decimal import Decimal
+        now = datetime.utcnow()
+        points = []
+        for row in rows:
+            tags = {'model': row['model']} if row['model'] else {}
+            points.append(self.metric_type(
+                metric_name=row['metric'], value=Decimal(str(row['value'])), unit=row['unit'],
+                timestamp=now, resource_id=row['call_id'], tenant_id=row['tenant_id'],
+                tags={**tags, 'cost_usd': f"{row['cost']:.6f}"}))
+        await asyncio.to_thread(self.usage_meter.record_usage_batch, points)
+
+
+@lru_cache(maxsize=1)
+def get_cost_meter() -> CostMeter:
+    """Process-wide meter; flushes to UsageMeter when REDIS_URL and DATABASE_URL are set."""
+    sink = None
+    if os.getenv("REDIS_URL") and os.getenv("DATABASE_URL"):
+        try:
+            from business.revenue_operations.usage_metering import UsageMeter
+            sink = UsageMeterSink(UsageMeter(os.environ["REDIS_URL"], os.environ["DATABASE_URL"]))
+        except Exception as e:
+            logger.error(f"Usage is metered live only (no billing sink): {e}")
+    return CostMeter(sink, flush_interval_s=float(os.getenv("COST_FLUSH_INTERVAL_S", "5")))
@@ -0,0 +1,269 @@
+"""
+Kill switch: per-tenant or global stop flags, propagated to every worker over Redis pub/sub, checked from a local cache.
+
+    python -m cost_optimization.kill_switch set --tenant tenant_123 --reason "runaway spend"
+    python -m cost_optimization.kill_switch clear --tenant tenant_123
+    python -m cost_optimization.kill_switch status
+"""
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set
+import asyncio
+import json
+import logging
+import os
+import time
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    aioredis = None
+
+logger = logging.getLogger("kill-switch")
+
+GLOBAL = "*"  # scope that stops every tenant
+
+Listener = Callable[[str, Optional[str]], None]  # (scope, reason or None when cleared)
+
+
+class _LocalSubscription:
+    def __init__(self, bus: "LocalBus"):
+        self.bus = bus
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        # Not wait_for: it can swallow a cancellation that races with a queued message
+        waiter = asyncio.ensure_future(self.queue.get())
+        try:
+            done, _ = await asyncio.wait([waiter], timeout=timeout)
+            return waiter.result() if done else None
+        finally:
+            waiter.cancel()
+
+    async def close(self) -> None:
+        self.bus.subscriptions.discard(self)
+
+
+class LocalBus:
+    """In-process stand-in for the Redis bus (single worker, tests); all switches on it see each change."""
+    def __init__(self):
+        self.state: Dict[str, str] = {}
+        self.subscriptions: Set[_LocalSubscription] = set()
+
+    async def load(self) -> Dict[str, str]:
+        return dict(self.state)
+
+    async def publish(self, message: Dict) -> None:
+        if message['reason'] is None:
+            self.state.pop(message['scope'], None)
+        else:
+            self.state[message['scope']] = message['reason']
+        for subscription in list(self.subscriptions):
+            subscription.queue.put_nowait(message)
+
+    async def subscribe(self) -> _LocalSubscription:
+        subscription = _LocalSubscription(self)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    async def close(self) -> None:
+        pass
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub, channel: str):
+        self.pubsub = pubsub
+        self.channel = channel
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        item = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return json.loads(item['data']) if item else None
+
+    async def close(self) -> None:
+        await self.pubsub.unsubscribe(self.channel)
+        await self.pubsub.close()
+
+
+class RedisBus:
+    """Flags live in a Redis hash (so new workers start with them) and every change is published."""
+    def __init__(self, client=None, url: Optional[str] = None, channel: str = "dukat:kill-switch"):
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("redis is not installed")
+            client = aioredis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.client = client
+        self.channel = channel
+        self.state_key = f"{channel}:state"
+
+    async def load(self) -> Dict[str, str]:
+        state = await self.client.hgetall(self.state_key)
+        return {_text(k): _text(v) for k, v in state.items()}
+
+    async def publish(self, message: Dict) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            if message['reason'] is None:
+                pipe.hdel(self.state_key, message['scope'])
+            else:
+                pipe.hset(self.state_key, message['scope'], message['reason'])
+            pipe.publish(self.channel, json.dumps(message))
+            await pipe.execute()
+
+    async def subscribe(self) -> _RedisSubscription:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+        return _RedisSubscription(pubsub, self.channel)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class KillSwitch:
+    """Cluster-wide stop flags with a local cached copy for the hot path.
+
+    ``killed(tenant_id)`` is two dict lookups. Changes arrive over the bus subscription
+    (milliseconds with Redis pub/sub); the full state is also reloaded every ``resync_s``
+    and after a reconnect, so a missed message cannot leave a worker running.
+    """
+    def __init__(self, bus=None, resync_s: float = 30.0, metrics: PipelineMetrics = METRICS):
+        self.bus = bus or LocalBus()
+        self.resync_s = resync_s
+        self.metrics = metrics
+        self.flags: Dict[str, str] = {}
+        self._listeners: List[Listener] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def killed(self, tenant_id: Optional[str] = None) -> Optional[str]:
+        """Reason if calls for ``tenant_id`` (or every tenant) must stop, else None."""
+        return self.flags.get(GLOBAL) or (self.flags.get(tenant_id) if tenant_id else None)
+
+    def on_change(self, listener: Listener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def start(self, timeout: float = 5.0) -> None:
+        """Subscribe, load current flags and follow changes (idempotent)."""
+        if self._task is not None:
+            return
+        ready = asyncio.Event()
+        self._task = asyncio.create_task(self._follow(ready))
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Kill switch bus not reachable yet; flags will load when it is")
+
+    async def activate(self, tenant_id: Optional[str] = None, reason: str = "cost incident") -> None:
+        await self._publish(tenant_id or GLOBAL, reason)
+
+    async def clear(self, tenant_id: Optional[str] = None) -> None:
+        await self._publish(tenant_id or GLOBAL, None)
+
+    async def _publish(self, scope: str, reason: Optional[str]) -> None:
+        message = {'scope': scope, 'reason': reason, 'at': time.time()}
+        self._apply(message)  # this worker reacts without waiting for the round trip
+        await self.bus.publish(message)
+
+    def _apply(self, message: Dict) -> None:
+        scope, reason = message['scope'], message.get('reason')
+        if self.flags.get(scope) == reason:
+            return
+        if reason is None:
+            self.flags.pop(scope, None)
+            logger.warning(f"Kill switch cleared for {scope}")
+        else:
+            self.flags[scope] = reason
+            self.metrics.inc('voice_kill_switch_total', scope=scope)
+            logger.warning(f"Kill switch set for {scope}: {reason}")
+        for listener in list(self._listeners):
+            try:
+                listener(scope, reason)
+            except Exception as e:
+                logger.error(f"Kill switch listener failed: {e}")
+
+    async def _sync(self) -> None:
+        state = await self.bus.load()
+        for scope in set(self.flags) - set(state):
+            self._apply({'scope': scope, 'reason': None})
+        for scope, reason in state.items():
+            self._apply({'scope': scope, 'reason': reason})
+
+    async def _follow(self, ready: asyncio.Event) -> None:
+        backoff = 0.5
+        while True:
+            subscription = None
+            try:
+                subscription = await self.bus.subscribe()
+                await self._sync()  # after subscribing, so no change can fall in between
+                ready.set()
+                backoff = 0.5
+                synced = time.monotonic()
+                while True:
+                    message = await subscription.get(timeout=min(1.0, self.resync_s))
+                    if message:
+                        self._apply(message)
+                    if time.monotonic() - synced >= self.resync_s:
+                        await self._sync()
+                        synced = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Kill switch subscription lost, retrying in {backoff:.1f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+            finally:
+                if subscription is not None:
+                    try:
+                        await subscription.close()
+                    except Exception:
+                        pass
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+@lru_cache(maxsize=1)
+def get_kill_switch() -> KillSwitch:
+    """Process-wide switch; fleet-wide through Redis when REDIS_URL is set."""
+    bus = None
+    if os.getenv("REDIS_URL"):
+        try:
+            bus = RedisBus()
+        except Exception as e:
+            logger.error(f"Kill switch is process-local (no Redis): {e}")
+    return KillSwitch(bus)
+
+
+async def _cli(args) -> None:
+    bus = RedisBus()
+    try:
+        if args.command == 'status':
+            print(json.dumps(await bus.load(), indent=2))
+            return
+        switch = KillSwitch(bus)
+        if args.command == 'set':
+            await switch.activate(args.tenant, args.reason)
+        else:
+            await switch.clear(args.tenant)
+    finally:
+        await bus.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Set, clear or show the fleet kill switch (needs REDIS_URL)")
+    parser.add_argument('command', choices=['set', 'clear', 'status'])
+    parser.add_argument('--tenant', default=None, help="tenant id; omit for every tenant")
+    parser.add_argument('--reason', default="cost incident")
+    asyncio.run(_cli(parser.parse_args()))
@@ -0,0 +1,341 @@
+"""
+Semantic response cache: embedded prompts, per-tenant in-process vector index, optional Qdrant tier, TTL & LRU/LFU.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+import zlib
+import numpy as np
+
+from audio_processing.metrics import METRICS, PipelineMetrics
+
+try:
+    from qdrant_client import QdrantClient
+    from qdrant_client.http import models
+except Exception:
+    QdrantClient = None
+    models = None
+
+logger = logging.getLogger("semantic-cache")
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercased words only: 'How do I reset my password?' == 'how do i reset my password'."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+class HashingEmbedder:
+    """Local, dependency-free embedder: signed feature hashing of words, word pairs and char trigrams.
+
+    Deterministic across processes (crc32, not hash()), so vectors written to Qdrant by one
+    worker match lookups from another. Word overlap cannot tell a negation, a changed digit or
+    a different weekday from a paraphrase ("I (don't) want to cancel" scores ~0.9), so the
+    default threshold only admits near-identical wording such as typos.
+    """
+    default_threshold = 0.97
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = normalize_prompt(text).split()
+        grams = [f"w:{w}" for w in words] + [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f" {w} "
+            grams.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return grams
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for gram in self._features(text):
+            h = zlib.crc32(gram.encode())
+            vec[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return np.stack([self.embed_one(t) for t in texts])
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API (text-embedding-3-small, 1536 dims like dukat_knowledge)."""
+    default_threshold = 0.92
+
+    def __init__(self, client: Any, model: str = "text-embedding-3-small", dim: int = 1536):
+        self.client = client  # AsyncOpenAI
+        self.model = model
+        self.dim = dim
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = await self.client.embeddings.create(model=self.model, input=list(texts))
+        vecs = np.asarray([d.embedding for d in response.data], dtype=np.float32)
+        return vecs / np.maximum(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12)
+
+
+class VectorIndex:
+    """One tenant's entries: a unit-vector matrix searched with a single matmul.
+
+    Expired rows are masked out of the search and reused first; when full, the least recently
+    used (``lru``) or least hit (``lfu``, ties broken by recency) row is overwritten.
+    """
+    def __init__(self, dim: int, capacity: int, ttl_s: float, policy: str = 'lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.capacity = capacity
+        self.ttl_s = ttl_s
+        self.policy = policy
+        self.exact: Dict[str, int] = {}        # normalized prompt -> row
+        self.size = 0                          # rows ever filled (high-water mark)
+        self.evictions = 0
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.created = np.zeros(0)
+        self.used = np.zeros(0)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.responses: List[Optional[str]] = []
+        self.prompts: List[Optional[str]] = []
+        self._grow(min(capacity, 64))
+
+    def _grow(self, rows: int) -> None:
+        # Storage doubles up to capacity, so a quiet tenant does not hold a full matrix
+        extra = rows - len(self.vectors)
+        self.vectors = np.concatenate([self.vectors, np.zeros((extra, self.vectors.shape[1]), np.float32)])
+        self.created = np.concatenate([self.created, np.full(extra, -np.inf)])
+        self.used = np.concatenate([self.used, np.full(extra, -np.inf)])
+        self.hits = np.concatenate([self.hits, np.zeros(extra, dtype=np.int64)])
+        self.responses.extend([None] * extra)
+        self.prompts.extend([None] * extra)
+
+    def _live(self, now: float) -> np.ndarray:
+        return self.created[:self.size] > now - self.ttl_s
+
+    def search(self, vector: np.ndarray, threshold: float, now: float) -> Optional[int]:
+        if not self.size:
+            return None
+        scores = self.vectors[:self.size] @ vector
+        scores[~self._live(now)] = -np.inf
+        row = int(np.argmax(scores))
+        return row if scores[row] >= threshold else None
+
+    def lookup_exact(self, normalized: str, now: float) -> Optional[int]:
+        row = self.exact.get(normalized)
+        if row is not None and self.created[row] <= now - self.ttl_s:
+            return None
+        return row
+
+    def touch(self, row: int, now: float) -> str:
+        self.used[row] = now
+        self.hits[row] += 1
+        return self.responses[row]
+
+    def insert(self, normalized: str, vector: np.ndarray, response: str, now: float) -> int:
+        row = self.exact.get(normalized)
+        if row is None:
+            row = self._free_row(now)
+        old = self.prompts[row]
+        if old is not None and self.exact.get(old) == row:
+            del self.exact[old]
+        self.vectors[row] = vector
+        self.responses[row] = response
+        self.prompts[row] = normalized
+        self.exact[normalized] = row
+        self.created[row] = self.used[row] = now
+        self.hits[row] = 0
+        return row
+
+    def _free_row(self, now: float) -> int:
+        if self.size < self.capacity:
+            if self.size == len(self.vectors):
+                self._grow(min(self.capacity, 2 * self.size))
+            self.size += 1
+            return self.size - 1
+        expired = np.flatnonzero(~self._live(now))
+        if expired.size:
+            return int(expired[0])
+        self.evictions += 1
+        if self.policy == 'lfu':
+            return int(np.lexsort((self.used, self.hits))[0])
+        return int(np.argmin(self.used))
+
+
+class QdrantStore:
+    """Shared tier in Qdrant (same client setup as RAGHandler); calls run off the event loop."""
+    def __init__(self, dim: int, url: Optional[str] = None, collection: str = "dukat_semantic_cache"):
+        if QdrantClient is None:
+            raise RuntimeError("qdrant-client is not installed")
+        self.client = QdrantClient(url=url or os.getenv("QDRANT_URL", "http://localhost:6333"))
+        self.collection_name = collection
+        self._ensure_collection(dim)
+
+    def _ensure_collection(self, dim: int) -> None:
+        try:
+            collections = self.client.get_collections().collections
+            if not any(c.name == self.collection_name for c in collections):
+                self.client.create_collection(
+                    collection_name=self.collection_name,
+                    vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE),
+                )
+                self.client.create_payload_index(self.collection_name, "tenant_id",
+                                                 models.PayloadSchemaType.KEYWORD)
+                logger.info(f"Created collection: {self.collection_name}")
+        except Exception as e:
+            logger.error(f"Failed to ensure Qdrant collection: {e}")
+
+    def _search(self, tenant_id: str, vector: np.ndarray, threshold: float, not_before: float):
+        hits = self.client.search(
+            collection_name=self.collection_name,
+            query_vector=vector.tolist(),
+            query_filter=models.Filter(must=[
+                models.FieldCondition(key="tenant_id", match=models.MatchValue(value=tenant_id)),
+                models.FieldCondition(key="created_at", range=models.Range(gte=not_before)),
+            ]),
+            score_threshold=threshold,
+            limit=1,
+        )
+        return hits[0].payload if hits else None
+
+    async def search(self, tenant_id: str, vector: np.ndarray, threshold: float,
+                     not_before: float) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._search, tenant_id, vector, threshold, not_before)
+
+    def _upsert(self, tenant_id: str, normalized: str, vector: np.ndarray, response: str, now: float) -> None:
+        point_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{tenant_id}/{normalized}"))
+        self.client.upsert(collection_name=self.collection_name, points=[models.PointStruct(
+            id=point_id, vector=vector.tolist(),
+            payload={"tenant_id": tenant_id, "prompt": normalized, "response": response, "created_at": now})])
+
+    async def upsert(self, tenant_id: str, normalized: str, vector: np.ndarray, response: str,
+                     now: float) -> None:
+        await asyncio.to_thread(self._upsert, tenant_id, normalized, vector, response, now)
+
+
+def cache_key(prompt: str, context: str = "") -> str:
+    """Normalized prompt, prefixed by the normalized conversation context it was asked in."""
+    normalized = normalize_prompt(prompt)
+    return f"{normalize_prompt(context)} || {normalized}" if context and normalized else normalized
+
+
+class SemanticCache:
+    """Prompt -> LLM response cache, isolated per tenant.
+
+    Keys are the normalized prompt plus its conversation ``context``, so the same words after
+    a different question are a different entry. Without an ``embedder`` only exact matches
+    are served. With one, lookups try the exact match (no embedding), then the tenant's
+    in-process index, then Qdrant if configured; a Qdrant hit is pulled into the local index.
+    """
+    def __init__(self, embedder: Any = None, threshold: Optional[float] = None, ttl_s: float = 24 * 3600,
+                 max_entries: int = 10000, policy: str = 'lru', store: Optional[QdrantStore] = None,
+                 max_prompt_chars: int = 500, metrics: PipelineMetrics = METRICS):
+        self.embedder = embedder
+        if threshold is None and embedder is not None:
+            threshold = embedder.default_threshold
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.policy = policy
+        self.store = store
+        self.max_prompt_chars = max_prompt_chars
+        self.metrics = metrics
+        self.indexes: Dict[str, VectorIndex] = {}
+        self.stats = {'exact': 0, 'semantic': 0, 'remote': 0, 'miss': 0, 'stores': 0, 'errors': 0}
+
+    def _index(self, tenant_id: str) -> VectorIndex:
+        index = self.indexes.get(tenant_id)
+        if index is None:
+            dim = self.embedder.dim if self.embedder is not None else 1
+            index = self.indexes[tenant_id] = VectorIndex(dim, self.max_entries, self.ttl_s, self.policy)
+        return index
+
+    def _count(self, tenant_id: str, outcome: str) -> None:
+        self.stats[outcome] += 1
+        self.metrics.inc('voice_semantic_cache_total', tenant=tenant_id, outcome=outcome)
+
+    async def lookup(self, tenant_id: str, prompt: str, context: str = "") -> Optional[str]:
+        normalized = cache_key(prompt, context)
+        if not normalized or len(normalized) > self.max_prompt_chars:
+            return None
+        now = time.time()
+        index = self._index(tenant_id)
+        row = index.lookup_exact(normalized, now)
+        if row is not None:
+            self._count(tenant_id, 'exact')
+            return index.touch(row, now)
+        if self.embedder is None:
+            self._count(tenant_id, 'miss')
+            return None
+
+        try:
+            vector = (await self.embedder.embed([normalized]))[0]
+            row = index.search(vector, self.threshold, now)
+            if row is not None:
+                self._count(tenant_id, 'semantic')
+                return index.touch(row, now)
+            if self.store is not None:
+                payload = await self.store.search(tenant_id, vector, self.threshold, now - self.ttl_s)
+                if payload:
+                    index.insert(payload['prompt'], vector, payload['response'], payload['created_at'])
+                    self._count(tenant_id, 'remote')
+                    return payload['response']
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Semantic cache lookup failed for {tenant_id}: {e}")
+        self._count(tenant_id, 'miss')
+        return None
+
+    async def store_response(self, tenant_id: str, prompt: str, response: str, context: str = "") -> None:
+        normalized = cache_key(prompt, context)
+        if not normalized or not response or len(normalized) > self.max_prompt_chars:
+            return
+        now = time.time()
+        if self.embedder is None:
+            self._index(tenant_id).insert(normalized, np.zeros(1, dtype=np.float32), response, now)
+            self.stats['stores'] += 1
+            return
+        try:
+            vector = (await self.embedder.embed([normalized]))[0]
+            self._index(tenant_id).insert(normalized, vector, response, now)
+            self.stats['stores'] += 1
+            if self.store is not None:
+                await self.store.upsert(tenant_id, normalized, vector, response, now)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Semantic cache store failed for {tenant_id}: {e}")
+
+    def clear(self, tenant_id: Optional[str] = None) -> None:
+        if tenant_id is None:
+            self.indexes.clear()
+        else:
+            self.indexes.pop(tenant_id, None)
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide cache: exact matches only unless SEMANTIC_CACHE_EMBEDDER is ``openai`` (or
+    ``hashing``); SEMANTIC_CACHE_QDRANT=1 then adds the shared Qdrant tier."""
+    embedder = None
+    kind = os.getenv("SEMANTIC_CACHE_EMBEDDER", "")
+    if kind == "openai":
+        try:
+            from openai import AsyncOpenAI
+            embedder = OpenAIEmbedder(AsyncOpenAI())
+        except Exception as e:
+            logger.error(f"Semantic cache falling back to exact matches (no OpenAI embedder): {e}")
+    elif kind == "hashing":
+        embedder = HashingEmbedder()
+    store = None
+    if embedder is not None and os.getenv("SEMANTIC_CACHE_QDRANT", "") == "1":
+        try:
+            store = QdrantStore(embedder.dim)
+        except Exception as e:
+            logger.error(f"Semantic cache running without Qdrant: {e}")
+    threshold = os.getenv("SEMANTIC_CACHE_THRESHOLD")
+    return SemanticCache(embedder, threshold=float(threshold) if threshold else None,
+                         ttl_s=float(os.getenv("SEMANTIC_CACHE_TTL_S", str(24 * 3600))),
+                         max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000")),
+                         policy=os.getenv("SEMANTIC_CACHE_POLICY", "lru"), store=store)
@@ -0,0 +1,87 @@
+"""
+Benchmark: local ASR pool throughput (real-time factor) and latency as concurrent sessions grow.
+
+    python scripts/bench_asr_pool.py --concurrency 1,8,32,128 --workers 4 --backend faster_whisper
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from audio_processing.asr_pool import ASRPool  # noqa: E402
+from audio_processing.metrics import PipelineMetrics  # noqa: E402
+
+
+def synthetic_utterance(seconds: float, rate: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    voiced = 6000 * np.sin(2 * np.pi * (140 + 40 * np.sin(2 * np.pi * 3 * t)) * t)
+    return (voiced + rng.normal(0, 400, t.size)).astype(np.int16)
+
+
+async def session(pool: ASRPool, key: int, utterance: np.ndarray, partial_ms: int,
+                  latencies: list) -> None:
+    """One caller: a partial every partial_ms over the growing utterance, then the final."""
+    step = pool.sample_rate * partial_ms // 1000
+    for end in list(range(step, utterance.size, step)) + [utterance.size]:
+        start = time.perf_counter()
+        await pool.transcribe(utterance[:end], key=key)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(partial_ms / 1000)
+
+
+async def run_level(args, concurrency: int) -> dict:
+    metrics = PipelineMetrics()
+    pool = ASRPool(args.backend, workers=args.workers, max_batch=args.max_batch,
+                   max_wait_ms=args.max_wait_ms, slots=max(64, concurrency * 2),
+                   max_seconds=args.utterance_s, metrics=metrics, model=args.model)
+    await pool.start()
+    await pool.transcribe(synthetic_utterance(1.0, pool.sample_rate, 0))  # load models first
+    metrics.reset()
+    try:
+        latencies: list = []
+        utterances = [synthetic_utterance(args.utterance_s, pool.sample_rate, i) for i in range(concurrency)]
+        start = time.perf_counter()
+        await asyncio.gather(*(session(pool, i, u, args.partial_ms, latencies)
+                               for i, u in enumerate(utterances)))
+        wall = time.perf_counter() - start
+        stats = pool.stats()
+    finally:
+        await pool.close()
+    lat = np.array(latencies)
+    return {
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 3),
+        'requests': int(lat.size),
+        'decoded_audio_seconds': round(stats['audio_seconds'], 1),
+        'realtime_factor': round(stats['realtime_factor'], 4),
+        'mean_batch': round(stats['mean_batch'], 2),
+        'superseded': stats['superseded'],
+        'latency_ms': {'p50': round(float(np.percentile(lat, 50)), 1),
+                       'p95': round(float(np.percentile(lat, 95)), 1),
+                       'max': round(float(lat.max()), 1)},
+    }
+
+
+async def main(args) -> dict:
+    levels = [await run_level(args, int(c)) for c in args.concurrency.split(',')]
+    return {'backend': args.backend, 'model': args.model, 'workers': args.workers,
+            'max_batch': args.max_batch, 'max_wait_ms': args.max_wait_ms, 'levels': levels}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--backend', default='faster_whisper', choices=['faster_whisper', 'placeholder'])
+    parser.add_argument('--model', default='base.en')
+    parser.add_argument('--max-batch', type=int, default=8)
+    parser.add_argument('--max-wait-ms', type=float, default=20.0)
+    parser.add_argument('--utterance-s', type=float, default=4.0)
+    parser.add_argument('--partial-ms', type=int, default=300)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
@@ -0,0 +1,101 @@
+"""
+Benchmark: per-prompt scan time of a PatternSet vs the per-pattern re.search loop as the set grows.
+
+    python scripts/bench_pattern_matcher.py --patterns 25,100,250 --prompts 2000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from security.ai_security.pattern_matcher import DEFAULT_PATTERNS, PatternSet  # noqa: E402
+
+WORDS = ("account balance order shipping refund invoice password reset appointment schedule "
+         "cancel upgrade plan billing address phone support agent payment card delivery status "
+         "tomorrow morning please thanks could you help me with my the a to for and").split()
+VERBS = "ignore disregard forget reveal print show leak dump override bypass disable".split()
+TARGETS = ("previous instructions|system prompt|hidden rules|api key|secret key|admin access|"
+           "developer mode|safety filter|internal notes|training data|other customers").split("|")
+
+
+def patterns(count: int, seed: int):
+    """The shipped sets plus generated injection phrases, written the way tenants write them."""
+    rng = random.Random(seed)
+    out = [f"(?i){p}" for p in DEFAULT_PATTERNS['injection']] + list(DEFAULT_PATTERNS['adversarial'])
+    while len(out) < count:
+        out.append(rf"(?i){rng.choice(VERBS)} (the |your |all )?{rng.choice(TARGETS)}( {rng.choice(WORDS)})?")
+        out = list(dict.fromkeys(out))
+    return out
+
+
+def prompts(count: int, seed: int, attack_rate: float):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 60)))
+        if rng.random() < attack_rate:
+            text += f" now {rng.choice(VERBS)} the {rng.choice(TARGETS)}"
+        out.append(text)
+    return out
+
+
+def per_prompt_us(scan, corpus, rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in corpus:
+            scan(text)
+        best = min(best, (time.perf_counter() - start) / len(corpus))
+    return round(best * 1e6, 2)
+
+
+def run(args, count: int) -> dict:
+    pattern_list = patterns(count, args.seed)
+    corpus = prompts(args.prompts, args.seed, args.attack_rate)
+    matcher = PatternSet(pattern_list)
+    compiled = [re.compile(p, re.IGNORECASE) for p in pattern_list]
+
+    def loop_search(text):  # what PromptFirewall.filter used to do
+        for p in pattern_list:
+            if re.search(p, text, re.IGNORECASE):
+                return p
+        return None
+
+    def loop_compiled(text):
+        for p in compiled:
+            if p.search(text):
+                return p
+        return None
+
+    blocked = sum(matcher.search(t) is not None for t in corpus)
+    assert blocked == sum(loop_compiled(t) is not None for t in corpus)
+    result = {
+        'patterns': count,
+        'prompts': len(corpus),
+        'blocked': blocked,
+        'pattern_set_us': per_prompt_us(matcher.search, corpus, args.rounds),
+        'loop_re_search_us': per_prompt_us(loop_search, corpus, args.rounds),
+        'loop_compiled_us': per_prompt_us(loop_compiled, corpus, args.rounds),
+        'pattern_set_all_matches_us': per_prompt_us(matcher.matches, corpus, args.rounds),
+    }
+    result['speedup_vs_re_search'] = round(result['loop_re_search_us'] / result['pattern_set_us'], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--patterns', default="25,100,250", help="comma-separated pattern counts")
+    parser.add_argument('--prompts', type=int, default=2000)
+    parser.add_argument('--attack-rate', type=float, default=0.05)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps([run(args, int(n)) for n in args.patterns.split(",")], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: N concurrent call recordings fed in real time; disk throughput and event-loop stalls.
+
+    python scripts/bench_recorder.py --calls 500 --seconds 20 --dir /tmp/recordings
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from audio_processing.metrics import PipelineMetrics  # noqa: E402
+from audio_processing.recorder import CallRecorder, RecordingReader, RecordingWriter  # noqa: E402
+
+
+async def call(recorder: CallRecorder, seconds: float, frame_ms: int, sample_rate: int, seed: int) -> None:
+    """Caller audio every frame, agent audio in alternating 2 s turns, both paced in real time."""
+    n = sample_rate * frame_ms // 1000
+    rng = np.random.default_rng(seed)
+    caller = rng.normal(0, 2000, n).astype(np.int16)
+    agent = rng.normal(0, 3000, n).astype(np.int16)
+    start = time.monotonic()
+    await asyncio.sleep(rng.uniform(0, frame_ms / 1000))  # calls are not phase-aligned
+    for i in range(int(seconds * 1000 / frame_ms)):
+        recorder.inbound(caller)
+        if (i * frame_ms // 2000) % 2:
+            recorder.outbound(agent)
+        delay = start + (i + 1) * frame_ms / 1000 - time.monotonic()
+        await asyncio.sleep(max(0.0, delay))
+    recorder.close()
+
+
+async def loop_lag(stop: asyncio.Event, interval: float, samples: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def main(args) -> dict:
+    directory = args.dir or tempfile.mkdtemp(prefix="recordings-")
+    os.makedirs(directory, exist_ok=True)
+    writer = RecordingWriter(buffering=args.buffer_kb << 10, metrics=PipelineMetrics())
+    recorders = [CallRecorder(os.path.join(directory, f"call-{i}.{args.container}"), args.sample_rate,
+                              args.container, args.chunk_ms, writer)
+                 for i in range(args.calls)]
+
+    stop, lags = asyncio.Event(), []
+    monitor = asyncio.create_task(loop_lag(stop, 0.01, lags))
+    cpu_start, start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(call(r, args.seconds, args.frame_ms, args.sample_rate, i)
+                           for i, r in enumerate(recorders)))
+    fed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    flush_start = time.perf_counter()
+    await asyncio.get_running_loop().run_in_executor(None, writer.flush)
+    flush = time.perf_counter() - flush_start
+    cpu = time.process_time() - cpu_start
+
+    result = {
+        'calls': args.calls, 'audio_seconds_per_call': args.seconds, 'container': args.container,
+        'wall_seconds': round(fed, 3),
+        'final_flush_seconds': round(flush, 3),
+        'written_mb': round(writer.stats['bytes'] / 1e6, 1),
+        'disk_mb_per_s': round(writer.stats['bytes'] / 1e6 / (fed + flush), 2),
+        'writer_busy_fraction': round(writer.stats['write_seconds'] / (fed + flush), 3),
+        'dropped_chunks': writer.stats['dropped'],
+        'errors': writer.stats['errors'],
+        'cpu_seconds_per_call_minute': round(cpu / args.calls / (args.seconds / 60), 4),
+        'loop_lag_ms': {'p50': round(float(np.percentile(lags, 50)), 2),
+                        'p99': round(float(np.percentile(lags, 99)), 2),
+                        'max': round(float(max(lags)), 2)},
+    }
+    if args.container == 'wav':
+        # Random access through mmap: read 100 ms from the middle of every recording
+        t0 = time.perf_counter()
+        for r in recorders:
+            reader = RecordingReader(r.path)
+            float(reader.read(args.seconds / 2, args.seconds / 2 + 0.1).sum())
+            reader.close()
+        result['mmap_seek_ms_per_file'] = round((time.perf_counter() - t0) * 1000 / args.calls, 3)
+    if not args.dir and not args.keep:
+        shutil.rmtree(directory)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--sample-rate', type=int, default=48000)
+    parser.add_argument('--frame-ms', type=int, default=20)
+    parser.add_argument('--chunk-ms', type=int, default=1000)
+    parser.add_argument('--buffer-kb', type=int, default=1024)
+    parser.add_argument('--container', default='wav', choices=['wav', 'opus'])
+    parser.add_argument('--dir', default=None)
+    parser.add_argument('--keep', action='store_true')
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
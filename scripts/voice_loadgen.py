@@ -0,0 +1,296 @@
+"""
+Load generator: N concurrent simulated rooms against the voice stack with stand-in providers.
+
+    python scripts/voice_loadgen.py --target pipeline --rooms 100 --turns 5 --llm 350:0.5 --out run.json
+    python scripts/voice_loadgen.py --target handler --rooms 50 --baseline run.json
+
+Targets:
+  pipeline  StreamingSession + VoicePipeline fed real-time PCM (synthetic or --wav); TTFA is
+            measured from the end of caller speech, so it includes endpointing.
+  handler   VoiceHandler.run_pipeline against a local fake Deepgram/OpenAI/ElevenLabs server.
+  agent     ProductionVoiceAgent._handle_turn (firewall, cost control, state machine, paced
+            outbound) with the stand-in pipeline; needs livekit installed.
+
+Latency specs: "MEDIAN_MS:SIGMA" (lognormal) or "fixed:MS".
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import wave
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent.fake_provider_server import FakeProviderServer, fixed, lognormal  # noqa: E402
+from audio_processing.asr_pool import PLACEHOLDER_TEXT  # noqa: E402
+from audio_processing.metrics import METRICS  # noqa: E402
+from audio_processing.resampler import Resampler  # noqa: E402
+from audio_processing.streaming_session import StreamingSession  # noqa: E402
+from audio_processing.voice_pipeline import VoicePipeline  # noqa: E402
+
+SAMPLE_RATE = 48000
+FRAME_MS = 20
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    if spec.startswith("fixed:"):
+        return fixed(float(spec[6:]) / 1000.0)
+    median, _, sigma = spec.partition(":")
+    return lognormal(float(median), float(sigma or 0.5))
+
+
+def load_utterance(path: Optional[str], seconds: float) -> np.ndarray:
+    """Caller speech at 48 kHz mono: a recorded WAV, or a synthetic voiced sweep."""
+    if path:
+        with wave.open(path) as w:
+            if w.getsampwidth() != 2:
+                raise SystemExit(f"{path}: only 16-bit PCM WAV is supported")
+            pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+            channels, rate = w.getnchannels(), w.getframerate()
+        return Resampler(rate, SAMPLE_RATE, channels).process(pcm) if (rate, channels) != (SAMPLE_RATE, 1) else pcm
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = np.sin(2 * np.pi * (150 + 30 * np.sin(2 * np.pi * 4 * t)) * t) * 7000
+    return voiced.astype(np.int16)
+
+
+class StandInPipeline(VoicePipeline):
+    """VoicePipeline whose ASR/LLM/TTS wait on the configured latency distributions."""
+    def __init__(self, config: Dict, latency: Dict[str, Callable[[], float]], token_interval: float,
+                 audio_ms: int):
+        super().__init__(config)
+        self.latency = latency
+        self.token_interval = token_interval
+        self.audio = np.zeros(self.tts_sample_rate * audio_ms // 1000, dtype=np.int16).tobytes()
+
+    async def partial_asr(self, data, key=None) -> str:
+        await asyncio.sleep(self.latency['stt']())
+        return PLACEHOLDER_TEXT
+
+    async def mock_llm(self, text: str, model: Optional[str] = None, max_parts: Optional[int] = None):
+        await asyncio.sleep(self.latency['llm']())
+        parts = ["Sure,", " I can help", " with that.", " Open settings", " and follow", " the wizard."]
+        for part in parts[:max_parts]:
+            yield part
+            await asyncio.sleep(self.token_interval)
+
+    async def mock_tts(self, text: str):
+        await asyncio.sleep(self.latency['tts']())
+        for i in range(0, len(self.audio), 3200):
+            yield self.audio[i:i + 3200]
+
+
+class Results:
+    def __init__(self):
+        self.ttfa_ms: List[float] = []
+        self.turn_ms: List[float] = []
+        self.errors: List[str] = []
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    arr = np.asarray(values)
+    out = {f"p{q}": round(float(np.percentile(arr, q)), 2) for q in (50, 90, 95, 99)}
+    out.update(mean=round(float(arr.mean()), 2), max=round(float(arr.max()), 2), count=int(arr.size))
+    return out
+
+
+async def measure_turn(audio, started: float, results: Results) -> None:
+    first = None
+    async for _ in audio:
+        if first is None:
+            first = time.perf_counter()
+    end = time.perf_counter()
+    if first is not None:
+        results.ttfa_ms.append((first - started) * 1000)
+    results.turn_ms.append((end - started) * 1000)
+
+
+def stand_in_pipeline(args, latency) -> StandInPipeline:
+    return StandInPipeline({'tenant': {'id': 'loadgen'}, 'tts_cache': args.tts_cache}, latency,
+                           args.token_interval_ms / 1000.0, args.tts_audio_ms)
+
+
+async def pipeline_room(args, utterance: np.ndarray, latency, results: Results) -> None:
+    pipeline = stand_in_pipeline(args, latency)
+    speech_end = [0.0]
+
+    async def on_utterance(text: str) -> None:
+        await measure_turn(pipeline.respond(text), speech_end[0], results)
+
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    silence = np.zeros(frame, dtype=np.int16)
+    pause_frames = int(args.think_s * 1000 / FRAME_MS)
+
+    async def frames():
+        start = time.monotonic()
+        sent = 0
+        for _ in range(args.turns):
+            for i in range(0, utterance.size - frame + 1, frame):
+                yield utterance[i:i + frame]
+                sent += 1
+                await asyncio.sleep(max(0.0, start + sent * FRAME_MS / 1000 - time.monotonic()))
+            speech_end[0] = time.perf_counter()
+            for _ in range(pause_frames):
+                yield silence
+                sent += 1
+                await asyncio.sleep(max(0.0, start + sent * FRAME_MS / 1000 - time.monotonic()))
+
+    session = StreamingSession(pipeline, on_utterance, sample_rate=SAMPLE_RATE)
+    await session.run(frames())
+
+
+async def handler_room(args, handler, utterance: bytes, results: Results) -> None:
+    for _ in range(args.turns):
+        start = time.perf_counter()
+        await measure_turn(handler.run_pipeline(utterance), start, results)
+        await asyncio.sleep(args.think_s)
+
+
+async def agent_room(args, latency, results: Results) -> None:
+    from agent.agent import ProductionVoiceAgent
+    from audio_processing.outbound import OutboundStage
+
+    agent = ProductionVoiceAgent()
+    agent.__dict__['pipeline'] = stand_in_pipeline(args, latency)  # replaces the lazy component
+    agent.state_machine.transition('start_call')
+    first: List[float] = []
+
+    async def sink(frame) -> None:
+        if not first:
+            first.append(time.perf_counter())
+
+    outbound = OutboundStage(sink, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS,
+                             src_rate=agent.pipeline.tts_sample_rate)
+    for _ in range(args.turns):
+        first.clear()
+        start = time.perf_counter()
+        await agent._handle_turn(PLACEHOLDER_TEXT, outbound, session=None)
+        if first:
+            results.ttfa_ms.append((first[0] - start) * 1000)
+        results.turn_ms.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(args.think_s)
+
+
+async def loop_lag(stop: asyncio.Event, samples: List[float], interval: float = 0.01) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run(args) -> dict:
+    latency = {kind: parse_latency(getattr(args, kind)) for kind in ('stt', 'llm', 'tts')}
+    utterance = load_utterance(args.wav, args.utterance_s)
+    results = Results()
+    server = handler = None
+
+    if args.target == 'handler':
+        from agent.providers import PoolConfig, ProviderRegistry
+        from agent.voice_handler import VoiceHandler
+        from audio_processing.tts_cache import TTSCache
+
+        server = FakeProviderServer(latency=latency, token_interval=args.token_interval_ms / 1000.0)
+        base_url = await server.start()
+        registry = ProviderRegistry(pool=PoolConfig(health_interval=0),
+                                    base_urls={"deepgram": base_url, "openai": base_url, "elevenlabs": base_url})
+        handler = VoiceHandler(registry, tts_cache=None if args.tts_cache else TTSCache(max_memory_bytes=0))
+        await registry.start({"stt": "deepgram", "llm": "openai", "tts": "elevenlabs"})
+
+    async def room(index: int) -> None:
+        await asyncio.sleep(args.ramp_s * index / max(1, args.rooms))
+        try:
+            if args.target == 'pipeline':
+                await pipeline_room(args, utterance, latency, results)
+            elif args.target == 'handler':
+                await handler_room(args, handler, utterance[::3].tobytes(), results)
+            else:
+                await agent_room(args, latency, results)
+        except Exception as e:
+            results.errors.append(repr(e))
+
+    METRICS.reset()
+    stop, lags = asyncio.Event(), []
+    monitor = asyncio.create_task(loop_lag(stop, lags))
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(room(i) for i in range(args.rooms)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    stop.set()
+    await monitor
+    if handler:
+        await handler.close()
+    if server:
+        await server.stop()
+
+    turns = len(results.turn_ms)
+    return {
+        'target': args.target,
+        'config': {k: v for k, v in vars(args).items() if k not in ('out', 'baseline')},
+        'rooms': args.rooms,
+        'turns': turns,
+        'errors': len(results.errors),
+        'error_samples': results.errors[:5],
+        'wall_seconds': round(wall, 3),
+        'ttfa_ms': percentiles(results.ttfa_ms),
+        'turn_ms': percentiles(results.turn_ms),
+        'cpu_seconds': round(cpu, 3),
+        'cpu_ms_per_call': round(cpu * 1000 / max(1, args.rooms), 2),
+        'cpu_ms_per_turn': round(cpu * 1000 / max(1, turns), 2),
+        'cpu_utilization': round(cpu / wall, 3) if wall else 0.0,
+        'loop_lag_ms': percentiles(lags),
+        'stages': METRICS.snapshot().get('loadgen', {}),
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> dict:
+    """Relative change vs a previous run for the headline numbers; flags regressions."""
+    report = {}
+    for section, key in (('ttfa_ms', 'p50'), ('ttfa_ms', 'p95'), ('turn_ms', 'p95'),
+                         ('loop_lag_ms', 'p99'), ('cpu_ms_per_turn', None)):
+        now = result[section] if key is None else result[section].get(key)
+        before = baseline.get(section) if key is None else baseline.get(section, {}).get(key)
+        if not now or not before:
+            continue
+        change = (now - before) / before
+        report[f"{section}.{key}" if key else section] = {
+            'baseline': before, 'current': now, 'change': round(change, 3),
+            'regression': change > tolerance}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--target', choices=['pipeline', 'handler', 'agent'], default='pipeline')
+    parser.add_argument('--rooms', type=int, default=50)
+    parser.add_argument('--turns', type=int, default=3)
+    parser.add_argument('--ramp-s', type=float, default=2.0, help="spread room starts over this long")
+    parser.add_argument('--think-s', type=float, default=1.0, help="caller silence after each utterance")
+    parser.add_argument('--wav', default=None, help="replay this 16-bit WAV as caller speech")
+    parser.add_argument('--utterance-s', type=float, default=1.5, help="synthetic utterance length")
+    parser.add_argument('--stt', default='80:0.4')
+    parser.add_argument('--llm', default='300:0.5')
+    parser.add_argument('--tts', default='120:0.4')
+    parser.add_argument('--token-interval-ms', type=float, default=15.0)
+    parser.add_argument('--tts-audio-ms', type=int, default=800, help="audio per synthesized segment")
+    parser.add_argument('--tts-cache', action='store_true', help="leave the TTS phrase cache on")
+    parser.add_argument('--out', default=None, help="also write the JSON report here")
+    parser.add_argument('--baseline', default=None, help="previous JSON report to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="relative change flagged as regression")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.baseline:
+        with open(args.baseline) as f:
+            result['comparison'] = compare(result, json.load(f), args.tolerance)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + "\n")
+    print(text)
+    if any(v['regression'] for v in result.get('comparison', {}).values()):
+        sys.exit(1)
@@ -0,0 +1,251 @@
+"""
+Pattern matcher: precompiled pattern sets behind a literal-prefix prefilter, per-tenant sets, hot reload from a JSON file.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger("pattern-matcher")
+
+DEFAULT_PATTERNS: Dict[str, List[str]] = {
+    # PromptFirewall: any hit blocks the prompt
+    'injection': [
+        r"ignore (all )?previous instructions",
+        r"system prompt",
+        r"you are now",
+        r"bypass",
+        r"secret key",
+        r"admin access",
+    ],
+    # MultiAgentSwarm.detect_adversarial_input: each hit adds to the confidence
+    'adversarial': [
+        r"(ignore|disregard).*(previous|instructions)",
+        r"(system|assistant).*(prompt|instructions)",
+        r"(role play|act as|pretend).*(different)",
+        r"(output|response).*(format|structure).*(xml|json|markdown)",
+        r"(forget|reset).*(rules|constraints)",
+    ],
+}
+
+try:
+    from re import _constants as _sre, _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
+MIN_PREFIX = 3     # shorter leading literals hit too many prompts to be worth indexing
+MAX_PREFIXES = 32  # per pattern, before alternations stop being expanded
+
+
+def literal_prefixes(items) -> Tuple[Set[str], bool]:
+    """Literal strings every match of a parsed pattern starts with, and whether it is all literal."""
+    acc = {""}
+    for op, av in items:
+        if op == _sre.AT:
+            continue  # \b, ^: zero width
+        if op == _sre.LITERAL:
+            acc = {a + chr(av) for a in acc}
+            continue
+        if op == _sre.SUBPATTERN:
+            sub, complete = literal_prefixes(av[-1])
+        elif op == _sre.BRANCH:
+            alternatives = [literal_prefixes(alt) for alt in av[1]]
+            sub = set().union(*(s for s, _ in alternatives))
+            complete = all(c for _, c in alternatives)
+        else:
+            return acc, False
+        expanded = {a + s for a in acc for s in sub}
+        if len(expanded) > MAX_PREFIXES:
+            return acc, False
+        acc = expanded
+        if not complete:
+            return acc, False
+    return acc, True
+
+
+def _trie(words: Iterable[str]) -> str:
+    """Regex for a set of literals with shared prefixes factored out (longest alternative first)."""
+    root: Dict = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(root)
+
+
+class PatternSet:
+    """Patterns behind one literal prefilter, so a clean prompt costs a single regex pass.
+
+    Most patterns start with a literal or a small alternation of literals (``ignore``,
+    ``(system|assistant)``). Those prefixes go into one trie-shaped regex that finds every
+    prefix occurrence in the prompt; only patterns whose prefix occurs, plus the few with no
+    usable prefix, are then run. A single alternation of the full patterns is not used:
+    ``re`` tries each branch at every position and gets slower than the plain loop as the
+    set grows.
+    """
+    def __init__(self, patterns: Iterable[str], flags: int = re.IGNORECASE):
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self.flags = flags
+        self._compiled = [re.compile(p, flags) for p in self.patterns]  # raises re.error on a bad pattern
+        self._always: List[int] = []
+        prefixes: Dict[str, Set[int]] = {}
+        for i, pattern in enumerate(self.patterns):
+            found, _ = literal_prefixes(_sre_parse.parse(pattern, flags))
+            if min(map(len, found)) < MIN_PREFIX:
+                self._always.append(i)
+            else:
+                for prefix in found:
+                    prefixes.setdefault(prefix.lower(), set()).add(i)
+        # A hit on "ignore all" must also wake the patterns indexed under "ignore"
+        self._by_prefix = {p: frozenset().union(*(ix for q, ix in prefixes.items() if p.startswith(q)))
+                           for p in prefixes}
+        trie = _trie(prefixes)
+        self._prefilter = re.compile(trie) if prefixes else None
+        # re.IGNORECASE folds more than str.lower() (ſ matches s, ı matches i), so text or
+        # prefixes outside ASCII go through a prefilter that folds exactly like the patterns do
+        self._folding = re.compile(trie, flags | re.IGNORECASE) if prefixes else None
+        self._ascii = all(p.isascii() for p in prefixes)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def candidates(self, text: str) -> List[int]:
+        """Indices of the patterns that can match ``text``, in set order."""
+        if self._prefilter is None:
+            return self._always
+        # ASCII: lowercase once and match case-sensitively, much faster than re.IGNORECASE on
+        # the trie. Restarting one character after each hit finds prefixes that overlap a longer one.
+        if self._ascii and text.isascii():
+            hits = set(self._scan(self._prefilter, text.lower()))
+        else:
+            hits = {prefix for hit in set(self._scan(self._folding, text))
+                    for prefix in self._by_prefix
+                    if len(prefix) == len(hit) and re.fullmatch(re.escape(prefix), hit, self._folding.flags)}
+        if not hits:
+            return self._always
+        found = set(self._always).union(*(self._by_prefix[h] for h in hits))
+        return sorted(found)
+
+    @staticmethod
+    def _scan(prefilter: "re.Pattern[str]", text: str) -> Iterator[str]:
+        match = prefilter.search(text)
+        while match:
+            yield match.group()
+            match = prefilter.search(text, match.start() + 1)
+
+    def search(self, text: str) -> Optional[str]:
+        """The first pattern (in set order) found in ``text``, or None."""
+        for i in self.candidates(text):
+            if self._compiled[i].search(text):
+                return self.patterns[i]
+        return None
+
+    def matches(self, text: str) -> List[str]:
+        return [self.patterns[i] for i in self.candidates(text) if self._compiled[i].search(text)]
+
+
+class PatternRegistry:
+    """Named pattern sets, optionally extended per tenant, reloaded when their file changes.
+
+    The file (``PROMPT_PATTERNS_PATH``) is JSON: ``{"injection": [...], "tenants": {"acme":
+    {"injection": [...]}}}``. Top-level sets replace the defaults; tenant sets are added to
+    them. The file's mtime is checked at most every ``check_interval_s`` from ``get``; a
+    reload that fails to parse or compile keeps the previous sets.
+    """
+    def __init__(self, path: Optional[str] = None, defaults: Optional[Dict[str, List[str]]] = None,
+                 check_interval_s: float = 2.0, clock=time.monotonic):
+        self.path = path
+        self.defaults = {name: list(p) for name, p in (defaults or DEFAULT_PATTERNS).items()}
+        self.check_interval_s = check_interval_s
+        self.clock = clock
+        self.version = 0
+        self._base: Dict[str, List[str]] = dict(self.defaults)
+        self._tenants: Dict[str, Dict[str, List[str]]] = {}
+        self._compiled: Dict[Tuple[str, Optional[str]], PatternSet] = {}
+        self._mtime: Optional[float] = None
+        self._checked = float('-inf')
+        self._lock = threading.Lock()  # reloads only; lookups read the current dicts
+        if path:
+            self.reload()
+
+    def get(self, name: str, tenant_id: Optional[str] = None) -> PatternSet:
+        """Compiled set ``name`` for ``tenant_id`` (the shared set when it has no additions)."""
+        if self.path and self.clock() - self._checked >= self.check_interval_s:
+            self._maybe_reload()
+        key = (name, tenant_id if tenant_id in self._tenants and name in self._tenants[tenant_id] else None)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            patterns = self._base.get(name, []) + (self._tenants[key[1]][name] if key[1] else [])
+            compiled = self._compiled[key] = PatternSet(patterns)
+        return compiled
+
+    def set_patterns(self, name: str, patterns: List[str], tenant_id: Optional[str] = None) -> None:
+        """Replace a set (or a tenant's additions to it) at runtime; compiled before it is swapped in."""
+        PatternSet(patterns)
+        with self._lock:
+            if tenant_id is None:
+                self._base = {**self._base, name: list(patterns)}
+            else:
+                self._tenants = {**self._tenants, tenant_id: {**self._tenants.get(tenant_id, {}),
+                                                              name: list(patterns)}}
+            self._invalidate()
+
+    def reload(self) -> bool:
+        """Load the pattern file now; True if the sets changed."""
+        with self._lock:
+            self._checked = self.clock()
+            try:
+                mtime = os.stat(self.path).st_mtime
+                with open(self.path) as f:
+                    config = json.load(f)
+                tenants = {t: {n: list(p) for n, p in sets.items()}
+                           for t, sets in config.pop('tenants', {}).items()}
+                base = {**self.defaults, **{n: list(p) for n, p in config.items()}}
+                for name, patterns in base.items():
+                    PatternSet(patterns)
+                for sets in tenants.values():
+                    for name, patterns in sets.items():
+                        PatternSet(base.get(name, []) + patterns)
+            except (OSError, ValueError, AttributeError, re.error) as e:
+                logger.error(f"Keeping current patterns; could not load {self.path}: {e}")
+                return False
+            self._mtime = mtime
+            if base == self._base and tenants == self._tenants:
+                return False
+            self._base, self._tenants = base, tenants
+            self._invalidate()
+        logger.info(f"Loaded pattern sets from {self.path} (version {self.version})")
+        return True
+
+    def _maybe_reload(self) -> None:
+        self._checked = self.clock()
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def _invalidate(self) -> None:
+        self._compiled = {}
+        self.version += 1
+
+
+@lru_cache(maxsize=1)
+def get_pattern_registry() -> PatternRegistry:
+    """Process-wide registry shared by the firewall and the swarm (PROMPT_PATTERNS_PATH for the file)."""
+    return PatternRegistry(os.getenv("PROMPT_PATTERNS_PATH") or None)
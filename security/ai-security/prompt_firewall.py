@@ -1,33 +1,28 @@
 """
 Prompt firewall: Blocks injections/jailbreaks pre-LLM.
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
 
+from security.ai_security.pattern_matcher import PatternRegistry, get_pattern_registry
+
 class PromptFirewall:
     """Firewall for prompts: Detects/blocks injections."""
-    def __init__(self):
-        self.injection_patterns = [
-            r"(?i)ignore (all )?previous instructions",
-            r"(?i)system prompt",
-            r"(?i)you are now",
-            r"(?i)bypass",
-            r"(?i)secret key",
-            r"(?i)admin access"
-        ]
+    def __init__(self, patterns: Optional[PatternRegistry] = None):
+        self.patterns = patterns or get_pattern_registry()  # Per-tenant, hot-reloaded
 
-    async def filter(self, prompt: str) -> bool:
+    async def filter(self, prompt: str, tenant_id: Optional[str] = None) -> bool:
         """
         Returns True if the prompt is safe, False if it should be blocked.
         In a real scenario, this would use a specialized model or library like guardrails.
         """
         if len(prompt) > 2048:
             return False
-            
-        for pattern in self.injection_patterns:
-            if re.search(pattern, prompt):
-                print(f"🚫 Blocked potentially malicious prompt: {prompt[:50]}...")
-                return False
+
+        # One pass over the prompt for the whole set (tenant additions included)
+        if self.patterns.get('injection', tenant_id).search(prompt) is not None:
+            print(f"🚫 Blocked potentially malicious prompt: {prompt[:50]}...")
+            return False
         return True
 
 class ToolCallAllowlists:
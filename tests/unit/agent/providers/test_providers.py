@@ -0,0 +1,56 @@
+import pytest
+
+from agent import fake_provider_server as fake
+from agent import providers
+from agent.voice_handler import VoiceHandler
+from audio_processing.tts_cache import TTSCache
+
+
+@pytest.mark.asyncio
+async def test_registry_warms_and_reuses_pooled_connections():
+    server = fake.FakeProviderServer()
+    base_url = await server.start()
+    registry = providers.ProviderRegistry(
+        pool=providers.PoolConfig(warm_connections=2, health_interval=0),
+        base_urls={"deepgram": base_url, "openai": base_url, "elevenlabs": base_url},
+    )
+    try:
+        await registry.start({"stt": "deepgram", "llm": "openai", "tts": "elevenlabs"})
+        assert all(p.healthy for p in registry.providers.values())
+        warmed = len(server.connections)
+
+        for _ in range(5):
+            assert await registry.get("stt").transcribe(b"\x00" * 320) == server.transcript
+            reply = await registry.get("llm").complete([{"role": "user", "content": "hi"}])
+            audio = b"".join([c async for c in registry.get("tts").synthesize(reply)])
+            assert reply.strip() == server.reply and len(audio) == server.audio_bytes
+
+        # Sequential turns ride the pre-warmed keep-alive sockets: no new handshakes
+        assert len(server.connections) == warmed
+    finally:
+        await registry.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_voice_handler_llm_uses_the_pool():
+    server = fake.FakeProviderServer()
+    base_url = await server.start()
+    registry = providers.ProviderRegistry(
+        pool=providers.PoolConfig(warm_connections=1, health_interval=0),
+        base_urls={"openai": base_url},
+    )
+    handler = VoiceHandler(registry=registry, tts_cache=TTSCache())
+    try:
+        await registry.start({"llm": "openai"})
+        history = [{"role": "system", "content": "Be brief."}]
+        assert (await handler.llm("hi", history)).strip() == server.reply
+        assert len(history) == 1  # the caller's history is not mutated
+    finally:
+        await registry.close()
+        await server.stop()
+
+
+def test_unknown_provider_is_rejected():
+    with pytest.raises(ValueError):
+        providers.ProviderRegistry().create("tts", "nope")
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from agent.loop_profiler import LoopProfiler
+from audio_processing.metrics import PipelineMetrics
+
+
+def blocking_lookup(seconds):
+    time.sleep(seconds)  # stands in for a synchronous Redis/Qdrant call
+
+
+async def handle_turn():
+    blocking_lookup(0.15)
+
+
+@pytest.mark.asyncio
+async def test_stall_is_attributed_to_blocking_function():
+    metrics = PipelineMetrics()
+    profiler = LoopProfiler(threshold_ms=30, interval_ms=10, sample_ms=5, metrics=metrics)
+    profiler.enable()
+    try:
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(handle_turn())
+        await asyncio.sleep(0.05)
+    finally:
+        profiler.disable()
+
+    report = profiler.report()
+    assert report['stalls'] == 1
+    top = report['sites'][0]
+    assert top['site'].endswith(':blocking_lookup')
+    assert top['callback'].endswith(':handle_turn')
+    assert 100 < top['max_ms'] < 300
+    assert metrics.counter('voice_loop_stalls_total', site=top['site']) == 1
+    assert metrics.snapshot('runtime')['runtime']['loop_lag']['max'] > 100
+
+
+@pytest.mark.asyncio
+async def test_toggle_stops_sampling():
+    profiler = LoopProfiler(threshold_ms=20, interval_ms=10, sample_ms=5, metrics=PipelineMetrics())
+    profiler.enable()
+    assert profiler.toggle() is False
+    blocking_lookup(0.08)
+    await asyncio.sleep(0.02)
+    assert profiler.report()['stalls'] == 0
+
+    assert profiler.toggle() is True
+    await asyncio.sleep(0.03)
+    blocking_lookup(0.08)
+    await asyncio.sleep(0.03)
+    profiler.disable()
+    assert profiler.report()['stalls'] == 1
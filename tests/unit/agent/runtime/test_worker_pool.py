@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from agent.worker_pool import WorkerSupervisor
+
+HOST = "test_worker_pool:FakeHost"  # imported by the spawned workers (this directory is on sys.path)
+
+
+class FakeHost:
+    """Stands in for ProductionVoiceAgent: marks the room as joined, holds it until told to leave.
+
+    Rooms named ``crash-*`` kill their worker the first time they start, ``poison-*`` every time.
+    """
+    last_dir = None  # per worker process, for the shutdown hook
+
+    def __init__(self, config):
+        self.dir = FakeHost.last_dir = config['dir']
+        self.room = None
+        self.name = None
+
+    async def start(self, room_name):
+        self.name = room_name
+        marker = os.path.join(self.dir, f"crashed-{room_name}")
+        if room_name.startswith("poison") or (room_name.startswith("crash") and not os.path.exists(marker)):
+            open(marker, "w").close()
+            os._exit(1)
+        open(os.path.join(self.dir, f"{room_name}.joined"), "w").close()
+
+    async def wait_until_disconnected(self):
+        while not os.path.exists(os.path.join(self.dir, f"{self.name}.leave")):
+            await asyncio.sleep(0.02)
+
+    @staticmethod
+    async def shutdown():
+        if FakeHost.last_dir:
+            open(os.path.join(FakeHost.last_dir, f"shutdown-{os.getpid()}"), "w").close()
+
+
+def wait_until(supervisor, condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        supervisor.poll()
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def joined(tmp_path, *rooms):
+    return all((tmp_path / f"{room}.joined").exists() for room in rooms)
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    pool = WorkerSupervisor(2, config={'dir': str(tmp_path)}, host=HOST, drain_timeout=0.5)
+    pool.start()
+    yield pool
+    if not pool.draining:
+        pool.shutdown(10)
+
+
+def test_rooms_go_to_the_least_loaded_worker(supervisor, tmp_path):
+    placed = [supervisor.dispatch(f"room-{i}") for i in range(4)]
+    assert sorted(placed) == [0, 0, 1, 1] and supervisor.loads == [2, 2]
+    assert supervisor.dispatch("room-0") == placed[0] and supervisor.loads == [2, 2]  # already hosted
+    assert wait_until(supervisor, lambda: joined(tmp_path, "room-0", "room-2"))
+
+    (tmp_path / "room-0.leave").touch()
+    assert wait_until(supervisor, lambda: "room-0" not in supervisor.rooms)
+    assert supervisor.dispatch("room-4") == placed[0]
+    assert supervisor.stats()['rooms'] == 4
+
+
+def test_drain_disconnects_stragglers_and_refuses_new_rooms(supervisor, tmp_path):
+    supervisor.dispatch("room-a")
+    supervisor.dispatch("room-b")
+    assert wait_until(supervisor, lambda: joined(tmp_path, "room-a", "room-b"))
+    supervisor.shutdown(10)  # rooms never leave on their own: cut off after drain_timeout
+    assert all(proc.exitcode == 0 for proc in supervisor._procs)
+    assert all((tmp_path / f"shutdown-{proc.pid}").exists() for proc in supervisor._procs)
+    assert not supervisor.rooms and supervisor.loads == [0, 0]
+    with pytest.raises(RuntimeError):
+        supervisor.dispatch("room-c")
+
+
+def test_dead_worker_is_restarted_and_its_rooms_rehomed(supervisor, tmp_path):
+    supervisor.dispatch("room-a")
+    crashed = supervisor.dispatch("crash-b")
+    assert wait_until(supervisor, lambda: supervisor.restarts == 1)
+    assert wait_until(supervisor, lambda: joined(tmp_path, "room-a", "crash-b"))
+    assert supervisor.rooms["crash-b"] == crashed  # restarted worker was the least loaded
+    assert sum(supervisor.loads) == 2 and not supervisor.dropped
+
+    supervisor.dispatch("poison-c")  # kills every worker that takes it
+    assert wait_until(supervisor, lambda: "poison-c" in supervisor.dropped)
+    assert "poison-c" not in supervisor.rooms and supervisor.restarts == 3
+    assert wait_until(supervisor, lambda: all(proc.is_alive() for proc in supervisor._procs))
+    assert sum(supervisor.loads) == len(supervisor.rooms)
@@ -0,0 +1,74 @@
+import asyncio
+import numpy as np
+import pytest
+from audio_processing.asr_pool import PLACEHOLDER_TEXT, ASRPool
+from audio_processing.metrics import PipelineMetrics
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_batched_through_shared_memory():
+    pool = ASRPool('placeholder', workers=1, max_batch=8, max_wait_ms=50, slots=16,
+                   max_seconds=2.0, metrics=PipelineMetrics())
+    try:
+        audio = (np.random.default_rng(0).normal(0, 3000, 16000)).astype(np.int16)
+        texts = await asyncio.wait_for(
+            asyncio.gather(*(pool.transcribe(audio, key=i) for i in range(16))), 60)
+        assert texts == [PLACEHOLDER_TEXT] * 16
+        stats = pool.stats()
+        assert stats['batches'] == 2 and stats['mean_batch'] == 8
+        assert stats['audio_seconds'] == pytest.approx(16.0)
+        assert pool._free.qsize() == 16  # every slot returned
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_newer_partial_supersedes_queued_one():
+    pool = ASRPool('placeholder', workers=1, max_batch=8, max_wait_ms=50, slots=4,
+                   max_seconds=1.0, metrics=PipelineMetrics())
+    try:
+        audio = np.zeros(8000, dtype=np.int16) + 100
+        old = asyncio.ensure_future(pool.transcribe(audio, key='call-1'))
+        await asyncio.sleep(0)
+        new = await asyncio.wait_for(pool.transcribe(np.concatenate([audio, audio]), key='call-1'), 60)
+        assert await old == new == PLACEHOLDER_TEXT
+        stats = pool.stats()
+        assert stats['superseded'] == 1 and stats['batches'] == 1
+        assert stats['audio_seconds'] == pytest.approx(1.0)
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_backend_that_cannot_load_fails_calls_instead_of_hanging():
+    # Not installed here; if it is, the bogus model path fails to load all the same
+    pool = ASRPool('faster_whisper', workers=2, max_wait_ms=10, slots=4, max_seconds=1.0,
+                   timeout_s=60, metrics=PipelineMetrics(), model="/nonexistent/asr-model")
+    try:
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(pool.transcribe(np.zeros(1600, dtype=np.int16)), 60)
+        with pytest.raises(RuntimeError, match="unavailable"):
+            await pool.transcribe(np.zeros(1600, dtype=np.int16))
+        assert pool._free.qsize() == 4
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_dead_worker_is_restarted():
+    metrics = PipelineMetrics()
+    pool = ASRPool('placeholder', workers=1, max_wait_ms=10, slots=4, max_seconds=1.0, metrics=metrics)
+    try:
+        audio = np.zeros(1600, dtype=np.int16) + 100
+        assert await asyncio.wait_for(pool.transcribe(audio), 60) == PLACEHOLDER_TEXT
+        pool._procs[0].kill()
+        pool._procs[0].join()
+        try:  # may be handed to the dead worker before it is noticed: then it fails, not hangs
+            await asyncio.wait_for(pool.transcribe(audio), 60)
+        except RuntimeError as e:
+            assert "exited" in str(e)
+        assert await asyncio.wait_for(pool.transcribe(audio), 60) == PLACEHOLDER_TEXT
+        assert metrics.counter('voice_asr_worker_restarts_total') == 1
+        assert pool.stats()['workers_ready'] == 1
+    finally:
+        await pool.close()
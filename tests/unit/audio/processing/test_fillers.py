@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from audio_processing.fillers import FillerBank, mask_latency
+from audio_processing.metrics import PipelineMetrics
+from audio_processing.voice_pipeline import VoicePipeline
+
+
+async def slow_audio(delay, chunks=(b"real-1", b"real-2")):
+    await asyncio.sleep(delay)
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_filler_plays_only_when_audio_is_late():
+    fast = [bytes(c) async for c in mask_latency(slow_audio(0), b"f" * 100, delay_ms=50, chunk_bytes=10)]
+    assert fast == [b"real-1", b"real-2"]
+
+    cuts = []
+    slow = [bytes(c) async for c in mask_latency(slow_audio(0.1), b"f" * 100, delay_ms=20,
+                                                 chunk_bytes=10, on_filler=cuts.append)]
+    assert slow[:10] == [b"f" * 10] * 10
+    assert slow[10:] == [b"real-1", b"real-2"]
+    assert cuts == [False]
+
+
+@pytest.mark.asyncio
+async def test_filler_is_cut_once_real_audio_is_ready():
+    async def consumer():
+        out = []
+        async for chunk in mask_latency(slow_audio(0.05), b"f" * 1000, delay_ms=10, chunk_bytes=10,
+                                        on_filler=cuts.append):
+            out.append(bytes(chunk))
+            if chunk[:1] == b"f":
+                await asyncio.sleep(0.01)  # real-time playout of each filler chunk
+        return out
+
+    cuts = []
+    out = await consumer()
+    assert 1 < out.count(b"f" * 10) < 100
+    assert out[-2:] == [b"real-1", b"real-2"]
+    assert cuts == [True]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_fillers_are_selected_per_tenant():
+    bank = FillerBank()
+
+    async def synth(text):
+        yield text.encode()
+
+    await bank.prepare("voice-a", ["One moment.", "Mm-hm."], synth)
+    assert bank.pick("voice-a", ["Mm-hm."]) == b"Mm-hm."
+    assert bank.pick("voice-b", ["Mm-hm."]) is None
+
+    on = VoicePipeline({'tenant': {'id': 't1', 'fillers': ["Hold on."]}}, metrics=PipelineMetrics())
+    off = VoicePipeline({'tenant': {'id': 't2'}}, metrics=PipelineMetrics())
+    assert on.filler_phrases == ["Hold on."] and off.filler_phrases == []
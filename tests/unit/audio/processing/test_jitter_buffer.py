@@ -0,0 +1,79 @@
+import asyncio
+import numpy as np
+import pytest
+from audio_processing.jitter_buffer import AdaptiveJitterBuffer
+
+
+def frame(value, n=480):
+    return np.full(n, value, dtype=np.int16)
+
+
+def test_reorders_and_conceals_lost_frame():
+    jb = AdaptiveJitterBuffer(sample_rate=48000, min_delay_ms=30)
+    for seq, t in ((0, 0.00), (2, 0.02), (1, 0.021), (4, 0.04), (5, 0.05)):
+        jb.put(seq, frame(1000 * (seq + 1)), arrival=t)
+
+    out = [jb.pop() for _ in range(6)]
+    kinds = [kind for _, kind in out]
+    assert kinds == ['ok', 'ok', 'ok', 'concealed', 'ok', 'ok']
+    assert [int(f[0]) for f, k in out if k == 'ok'] == [1000, 2000, 3000, 5000, 6000]
+    assert int(out[3][0][0]) == 1500  # repeat of seq 2 faded by half
+
+    stats = jb.stats()
+    assert stats['reordered'] == 1
+    assert stats['lost'] == 1
+    jb.put(3, frame(0), arrival=0.06)
+    assert jb.stats()['late'] == 1
+
+
+def test_target_delay_grows_with_jitter():
+    jb = AdaptiveJitterBuffer(sample_rate=48000, min_delay_ms=20, max_delay_ms=200)
+    rng = np.random.default_rng(0)
+    for seq in range(200):
+        jb.put(seq, frame(1), arrival=seq * 0.01 + rng.uniform(0, 0.06))
+        jb.pop()
+    assert jb.jitter_ms > 5
+    assert jb.target_delay_ms > 3 * 5
+
+
+@pytest.mark.asyncio
+async def test_paced_fills_gaps_in_a_bursty_stream():
+    async def bursty():
+        for seq in range(10):
+            if seq == 5:
+                await asyncio.sleep(0.06)  # network stall
+            yield frame(1000 * (seq + 1)).tobytes()
+            await asyncio.sleep(0.005)
+
+    jb = AdaptiveJitterBuffer(sample_rate=48000, min_delay_ms=20, max_conceal_frames=10)
+    out = [f.copy() async for f in jb.paced(bursty())]
+    assert jb.stats()['concealed'] >= 1
+    real = [int(f[0]) // 1000 for f in out if f[0] > 0 and f[0] % 1000 == 0]
+    assert real == list(range(1, 11))
+
+
+@pytest.mark.asyncio
+async def test_paced_ends_when_source_ends_while_buffering():
+    async def one_frame():
+        yield frame(1000).tobytes()  # one 10 ms frame, below the 20 ms target delay
+
+    jb = AdaptiveJitterBuffer(sample_rate=48000, min_delay_ms=20)
+    out = await asyncio.wait_for(_collect(jb.paced(one_frame())), 1.0)
+    assert [int(f[0]) for f in out] == [1000]
+
+
+@pytest.mark.asyncio
+async def test_paced_uses_transport_sequence_numbers():
+    async def reordered():
+        for seq in (0, 1, 2, 4, 3, 5, 7):
+            yield seq, frame(1000 * (seq + 1)).tobytes()
+
+    jb = AdaptiveJitterBuffer(sample_rate=48000, min_delay_ms=100)
+    out = await asyncio.wait_for(_collect(jb.paced(reordered())), 1.0)
+    real = [int(f[0]) // 1000 for f in out if f[0] > 0 and f[0] % 1000 == 0]
+    assert real == [1, 2, 3, 4, 5, 6, 8]
+    assert jb.counters['reordered'] == 1
+
+
+async def _collect(frames):
+    return [f.copy() async for f in frames]
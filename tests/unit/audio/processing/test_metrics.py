@@ -0,0 +1,27 @@
+import pytest
+from audio_processing.metrics import LatencyHistogram, PipelineMetrics
+from audio_processing.voice_pipeline import VoicePipeline
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    hist = LatencyHistogram()
+    for ms in range(1, 1001):
+        hist.record(float(ms))
+    assert hist.percentile(0.5) == pytest.approx(500, rel=0.04)
+    assert hist.percentile(0.99) == pytest.approx(990, rel=0.04)
+    assert hist.max_ms == 1000.0
+
+
+@pytest.mark.asyncio
+async def test_budget_overrun_degrades_next_turn():
+    metrics = PipelineMetrics()
+    pipeline = VoicePipeline({'tenant': {'id': 't1'}, 'budget': {'llm': 1}}, metrics=metrics)
+
+    first = [chunk async for chunk in pipeline.respond("hi")]
+    second = [chunk async for chunk in pipeline.respond("hi")]
+
+    assert pipeline.active_degradations == {'cheaper_model'}
+    assert len(second) == len(first)
+    assert metrics.counter('voice_stage_budget_overruns_total', tenant='t1', stage='llm') == 2
+    assert metrics.snapshot('t1')['t1']['llm']['count'] == 2
+    assert 'voice_stage_latency_ms{tenant="t1",stage="llm",quantile="0.95"}' in metrics.prometheus_text()
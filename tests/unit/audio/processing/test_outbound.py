@@ -0,0 +1,80 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from audio_processing.outbound import OpusCodec, OutboundStage, RealtimePacer
+
+
+async def chunks(pcm: bytes, sizes):
+    i = 0
+    for size in sizes:
+        yield pcm[i:i + size]
+        i += size
+    yield pcm[i:]
+
+
+@pytest.mark.asyncio
+async def test_frames_are_exact_and_reused_from_the_pool():
+    sent, ids = [], set()
+
+    async def sink(frame):
+        sent.append(frame.copy())
+        ids.add(id(frame))
+
+    stage = OutboundStage(sink, sample_rate=16000, frame_ms=10, lead_ms=1000)
+    pcm = np.arange(1000, dtype=np.int16).tobytes()
+    await stage.play(chunks(pcm, [3, 501, 7, 900]))  # odd splits, including mid-sample
+
+    assert [f.size for f in sent] == [160] * 7
+    assert np.concatenate(sent)[:1000].tolist() == list(range(1000))
+    assert not np.concatenate(sent)[1000:].any()  # zero-padded tail
+    assert stage.stats == {'frames': 7, 'padded': 1, 'encoded': 0}
+    assert len(ids) == 1
+
+
+@pytest.mark.asyncio
+async def test_resamples_tts_rate_to_source_rate():
+    sent = []
+
+    async def sink(frame):
+        sent.append(frame.size)
+
+    stage = OutboundStage(sink, sample_rate=48000, frame_ms=20, src_rate=16000, lead_ms=1000)
+    await stage.play(chunks(np.zeros(3200, dtype=np.int16).tobytes(), []))
+    assert sent == [960] * 10
+
+
+@pytest.mark.asyncio
+async def test_pacer_releases_frames_in_real_time():
+    pacer = RealtimePacer(frame_ms=10, lead_ms=20)
+    start = time.monotonic()
+    for _ in range(12):
+        await pacer.wait()
+    elapsed = time.monotonic() - start
+    assert 0.08 <= elapsed < 0.2  # 12 frames = 120 ms, minus the 20 ms lead
+
+    pacer.reset()
+    await pacer.wait()
+    await asyncio.sleep(0.1)  # stall: playout ran dry
+    before = time.monotonic()
+    await pacer.wait()
+    await pacer.wait()
+    assert pacer.late_resets == 1
+    assert time.monotonic() - before < 0.05  # no burst backlog, no long sleep either
+
+
+@pytest.mark.asyncio
+async def test_opus_batches_round_trip():
+    pytest.importorskip("opuslib")
+    codec = OpusCodec(48000, 20)
+    packets = []
+
+    async def sink(frame):
+        pass
+
+    stage = OutboundStage(sink, codec=codec, encode_batch=5, on_packets=packets.extend, lead_ms=1000)
+    tone = (np.sin(np.arange(960 * 12) / 10.0) * 8000).astype(np.int16)
+    await stage.play(chunks(tone.tobytes(), []))
+    await stage.drain()
+    assert len(packets) == 12 and stage.stats['encoded'] == 12
+    assert codec.decode_batch(packets).shape == (12, 960)
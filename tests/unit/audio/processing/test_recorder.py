@@ -0,0 +1,72 @@
+import wave
+import numpy as np
+import pytest
+from audio_processing.metrics import PipelineMetrics
+from audio_processing.recorder import CallRecorder, RecordingReader, RecordingWriter
+
+
+def test_both_directions_are_interleaved_on_one_timeline(tmp_path):
+    writer = RecordingWriter(metrics=PipelineMetrics())
+    path = str(tmp_path / "call.wav")
+    rec = CallRecorder(path, sample_rate=8000, chunk_ms=100, writer=writer)
+
+    caller = np.full(80, 1000, dtype=np.int16)  # 10 ms frames
+    agent = np.full(80, -2000, dtype=np.int16)
+    for _ in range(20):
+        rec.inbound(caller.tobytes())
+    for _ in range(5):
+        rec.outbound(agent)  # agent starts speaking at 200 ms
+    for _ in range(10):
+        rec.inbound(caller)
+    rec.close()
+    assert writer.flush(5)
+    assert writer.stats['closed'] == 1 and writer.stats['errors'] == 0
+
+    with wave.open(path) as w:
+        assert (w.getnchannels(), w.getframerate(), w.getnframes()) == (2, 8000, 2400)
+
+    reader = RecordingReader(path)
+    assert reader.duration == pytest.approx(0.3)
+    assert (reader.read(0, 0.3)[:, 0] == 1000).all()
+    speech = reader.read(0.2, 0.25)[:, 1]
+    assert (speech == -2000).all()
+    assert not reader.read(0, 0.2)[:, 1].any() and not reader.read(0.25)[:, 1].any()
+    reader.close()
+
+
+def test_writer_drops_instead_of_blocking_when_disk_lags():
+    # No writer thread is running, so nothing drains: the second chunk exceeds the backlog cap
+    writer = RecordingWriter(max_pending_bytes=1000, metrics=PipelineMetrics())
+    assert writer.write(0, b"\x00" * 800)
+    assert not writer.write(0, b"\x00" * 800)
+    assert writer.stats['dropped'] == 1
+    assert writer.metrics.counter('voice_recording_dropped_chunks_total') == 1
+
+
+def test_long_agent_burst_spills_across_blocks(tmp_path):
+    writer = RecordingWriter(metrics=PipelineMetrics())
+    path = str(tmp_path / "burst.wav")
+    rec = CallRecorder(path, sample_rate=8000, chunk_ms=100, writer=writer)
+    rec.outbound(np.arange(2500, dtype=np.int16))  # longer than the staging block
+    rec.close()
+    assert writer.flush(5)
+    reader = RecordingReader(path)
+    assert reader.read()[:, 1].tolist() == list(range(2500))
+    reader.close()
+
+
+def test_agent_running_ahead_of_the_caller_leaves_silence(tmp_path):
+    writer = RecordingWriter(metrics=PipelineMetrics())
+    path = str(tmp_path / "ahead.wav")
+    rec = CallRecorder(path, sample_rate=1000, chunk_ms=100, writer=writer)
+    rec.outbound(np.full(500, -2000, dtype=np.int16))  # 5 chunks of agent audio, no caller audio yet
+    rec.inbound(np.full(100, 1000, dtype=np.int16))
+    rec.close()
+    assert writer.flush(5) and writer.stats['errors'] == 0
+
+    reader = RecordingReader(path)
+    audio = reader.read()
+    assert (audio[:500, 1] == -2000).all()
+    caller = np.flatnonzero(audio[:, 0])
+    assert caller.size == 100 and caller[0] >= 100  # the stalled stretch is silent
+    reader.close()
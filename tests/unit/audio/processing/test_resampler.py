@@ -0,0 +1,32 @@
+import numpy as np
+from audio_processing.resampler import Resampler, get_plan, resample
+
+
+def _tone(freq: float, rate: int, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (np.sin(2 * np.pi * freq * t) * 10000).astype(np.int16)
+
+
+def test_downsample_preserves_tone_and_rejects_alias():
+    y = resample(_tone(440, 48000), 48000, 16000)
+    ref = _tone(440, 16000)
+    assert y.dtype == np.int16 and y.size == 16000
+    assert np.abs(y[100:-100].astype(int) - ref[100:-100]).max() < 50
+
+    alias = resample(_tone(12000, 48000), 48000, 16000)
+    assert np.abs(alias[200:-200]).max() < 100
+
+
+def test_streaming_matches_batch_and_downmixes_stereo():
+    x = _tone(300, 48000)
+    stream = Resampler(48000, 16000)
+    chunked = np.concatenate([stream.process(x[i:i + 960].tobytes()) for i in range(0, x.size, 960)])
+    assert np.array_equal(chunked, Resampler(48000, 16000).process(x))
+
+    stereo = np.stack([x, x], axis=1).ravel()
+    assert np.array_equal(resample(stereo, 48000, 16000, channels=2), resample(x, 48000, 16000))
+
+
+def test_plans_are_cached_per_rate_and_channels():
+    assert get_plan(48000, 16000, 1) is get_plan(48000, 16000, 1)
+    assert get_plan(48000, 16000, 2) is not get_plan(48000, 16000, 1)
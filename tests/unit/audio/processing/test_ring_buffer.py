@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from audio_processing.ring_buffer import AudioRingBuffer
+
+
+def test_windows_are_contiguous_views_across_wrap():
+    ring = AudioRingBuffer(capacity=10)
+    ring.write(np.arange(8, dtype=np.int16))
+    ring.write(np.arange(8, 14, dtype=np.int16).tobytes())  # wraps
+
+    window = ring.window(5, 14)
+    assert window.tolist() == list(range(5, 14))
+    assert np.shares_memory(window, ring._data)
+    assert ring.latest(3).tolist() == [11, 12, 13]
+
+    with pytest.raises(IndexError):
+        ring.window(2, 6)  # already overwritten
+
+
+def test_oversized_frame_keeps_tail():
+    ring = AudioRingBuffer(capacity=4)
+    ring.write(memoryview(np.arange(6, dtype=np.int16)))
+    assert ring.written == 6
+    assert ring.window(2, 6).tolist() == [2, 3, 4, 5]
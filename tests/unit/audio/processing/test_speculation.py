@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from audio_processing.metrics import PipelineMetrics
+from audio_processing.speculation import similarity
+from audio_processing.voice_pipeline import VoicePipeline
+
+
+@pytest.mark.asyncio
+async def test_stable_partial_hit_reuses_generation():
+    pipeline = VoicePipeline({'tenant': {'id': 't1'}}, metrics=PipelineMetrics())
+    pipeline.on_partial("I need help with my account")
+    pipeline.on_partial("I need help with my account.")
+    run = pipeline.speculation.run
+    assert run is not None
+    await asyncio.sleep(0.12)
+
+    chunks = [c async for c in pipeline.respond("I need help with my account")]
+    assert len(chunks) == 2 and run.done
+    stats = pipeline.speculation.stats()
+    assert stats['hits'] == 1 and stats['hit_rate'] == 1.0 and stats['saved_ms_total'] > 0
+
+
+@pytest.mark.asyncio
+async def test_barge_in_during_hit_stops_the_generation():
+    pipeline = VoicePipeline({}, metrics=PipelineMetrics())
+    for _ in range(2):
+        pipeline.on_partial("I need help with my account")
+    run = pipeline.speculation.take("I need help with my account")
+    stream = run.stream()
+    assert await stream.__anext__() == "I can help"
+    await stream.aclose()  # the turn was cancelled after the first token
+    await asyncio.sleep(0)
+    assert run.task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_diverging_final_cancels_speculation():
+    pipeline = VoicePipeline({}, metrics=PipelineMetrics())
+    for _ in range(2):
+        pipeline.on_partial("book an appointment")
+    run = pipeline.speculation.run
+
+    chunks = [c async for c in pipeline.respond("cancel my subscription today")]
+    await asyncio.sleep(0)
+    assert len(chunks) == 2
+    assert run.task.cancelled()
+    assert pipeline.speculation.stats()['misses'] == 1
+    assert similarity("Hello there!", "hello there") == 1.0
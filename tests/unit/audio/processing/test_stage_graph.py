@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+from audio_processing.stage_graph import SentenceSegmenter, stream_speech
+
+
+def test_segmenter_closes_sentences_and_long_clauses():
+    seg = SentenceSegmenter(min_clause_chars=10)
+    out = []
+    for token in ["Sure", ",", " I can", " help with that", ",", " give me", " a second.", " Bye"]:
+        out += seg.feed(token)
+    assert out == ["Sure, I can help with that,", "give me a second."]
+    assert seg.flush() == "Bye"
+
+
+@pytest.mark.asyncio
+async def test_first_audio_after_first_clause_with_backpressure():
+    events = []
+
+    async def tokens():
+        for token in ["Hello there.", " This", " is", " a", " long", " reply."]:
+            events.append(("token", token))
+            yield token
+            await asyncio.sleep(0.01)
+
+    async def tts(segment):
+        events.append(("tts", segment))
+        for i in range(3):
+            yield f"{segment}:{i}".encode()
+
+    chunks = []
+    async for chunk in stream_speech(tokens(), tts, audio_queue=1):
+        chunks.append(chunk)
+        if len(chunks) == 1:
+            # first audio is out before the LLM has finished the reply
+            assert ("token", " reply.") not in events
+        await asyncio.sleep(0.005)
+
+    assert [e for e in events if e[0] == "tts"] == [("tts", "Hello there."), ("tts", "This is a long reply.")]
+    assert len(chunks) == 6
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+import numpy as np
+from audio_processing.voice_pipeline import VoicePipeline
+from audio_processing.streaming_session import StreamingSession
+
+
+def _frames(speech_frames: int, silence_frames: int, samples: int = 960):
+    loud = (np.sin(np.arange(samples) / 8.0) * 8000).astype(np.int16).tobytes()
+    quiet = np.zeros(samples, dtype=np.int16).tobytes()
+    return [loud] * speech_frames + [quiet] * silence_frames
+
+
+@pytest.mark.asyncio
+async def test_one_turn_per_utterance():
+    turns = []
+
+    async def on_utterance(text):
+        turns.append(text)
+
+    async def stream():
+        for pcm in _frames(25, 40) + _frames(25, 40):
+            yield pcm
+            await asyncio.sleep(0)  # frames arrive over time; partials decode in between
+
+    session = StreamingSession(VoicePipeline({}), on_utterance)
+    await session.run(stream())
+
+    assert len(turns) == 2
+    assert session.stats['frames'] == 130
+    assert session.stats['partials'] >= 2
+    assert not session.in_speech
+
+
+@pytest.mark.asyncio
+async def test_barge_in_cancels_turn_in_flight():
+    started, finished, interrupts = [], [], []
+
+    async def on_utterance(text):
+        started.append(text)
+        await asyncio.sleep(10)  # long response
+        finished.append(text)
+
+    session = StreamingSession(VoicePipeline({}), on_utterance, on_interrupt=lambda: interrupts.append(1))
+
+    for pcm in _frames(25, 40):
+        await session.feed(pcm)
+    task = asyncio.create_task(session._turn_worker())
+    await asyncio.sleep(0.01)
+    assert session.responding and started
+
+    for pcm in _frames(10, 0):
+        await session.feed(pcm)
+    assert interrupts == [1]
+    assert session.stats['barge_ins'] == 1
+    assert await session.pipeline.check_interrupt()
+
+    await session._turns.put(None)
+    await asyncio.wait_for(task, 1)
+    assert not finished and not session.responding
+
+
+@pytest.mark.asyncio
+async def test_finish_turn_waits_then_cancels():
+    finished = []
+
+    async def on_utterance(text):
+        await asyncio.sleep(0.05 if not finished else 10)
+        finished.append(text)
+
+    session = StreamingSession(VoicePipeline({}), on_utterance)
+    worker = asyncio.create_task(session._turn_worker())
+
+    await session._turns.put("short reply")
+    await asyncio.sleep(0.01)
+    await session.finish_turn(timeout=1.0)
+    assert finished == ["short reply"] and session.stats['barge_ins'] == 0
+
+    await session._turns.put("long reply")
+    await asyncio.sleep(0.01)
+    await session.finish_turn(timeout=0.05)
+    assert finished == ["short reply"] and session.stats['barge_ins'] == 1
+
+    await session._turns.put(None)
+    await asyncio.wait_for(worker, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_turn_does_not_stop_later_turns():
+    handled = []
+
+    async def on_utterance(text):
+        handled.append(text)
+        if len(handled) == 1:
+            raise RuntimeError("LLM provider down")
+
+    async def stream():
+        for pcm in _frames(25, 40) * 3:
+            yield pcm
+
+    session = StreamingSession(VoicePipeline({}), on_utterance)
+    await session.run(stream())
+    assert len(handled) == 3
+    assert session.stats['turn_errors'] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_partial_asr_does_not_stall_frames():
+    class SlowASR(VoicePipeline):
+        async def partial_asr(self, data, key=None):
+            await asyncio.sleep(0.5)
+            return "slow"
+
+    session = StreamingSession(SlowASR({}), lambda text: asyncio.sleep(0), partial_interval_ms=100)
+    start = asyncio.get_running_loop().time()
+    for pcm in _frames(25, 0):
+        await session.feed(pcm)
+    assert asyncio.get_running_loop().time() - start < 0.2
+    assert session._partial_task is not None  # one partial in flight, not one per interval
+    session._cancel_partial()
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from audio_processing.metrics import PipelineMetrics
+from audio_processing.tts_cache import TTSCache, cache_key
+
+
+def synth(calls, audio=b"\x01\x02" * 3000, chunk=1000):
+    async def gen():
+        calls.append(1)
+        for i in range(0, len(audio), chunk):
+            await asyncio.sleep(0)
+            yield audio[i:i + chunk]
+    return gen
+
+
+def test_key_normalizes_text_but_not_voice_or_prosody():
+    assert cache_key("v1", "Thanks  for calling!") == cache_key("v1", " thanks for calling! ")
+    assert cache_key("v1", "Thanks for calling!") != cache_key("v1", "Thanks for calling?")
+    assert cache_key("v1", "hi") != cache_key("v2", "hi")
+    assert cache_key("v1", "hi", speed=1.1) != cache_key("v1", "hi")
+
+
+@pytest.mark.asyncio
+async def test_second_request_is_served_from_memory():
+    cache = TTSCache(chunk_bytes=4096, metrics=PipelineMetrics())
+    calls = []
+    first = b"".join([bytes(c) async for c in cache.stream("k", synth(calls))])
+    second = b"".join([bytes(c) async for c in cache.stream("k", synth(calls))])
+    assert first == second and len(calls) == 1
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['bytes_saved'] == len(first)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_synthesis_is_not_cached():
+    cache = TTSCache(metrics=PipelineMetrics())
+    stream = cache.stream("k", synth([]))
+    await stream.__anext__()
+    await stream.aclose()
+    assert cache.get("k") is None
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    cache = TTSCache(max_memory_bytes=250, metrics=PipelineMetrics())
+    for key in "abc":
+        cache.put(key, b"x" * 100)
+    assert cache.memory_bytes == 200
+    assert cache.get("a") is None and cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart_via_mmap(tmp_path):
+    calls = []
+    warm = TTSCache(disk_dir=str(tmp_path), metrics=PipelineMetrics())
+    audio = b"".join([bytes(c) async for c in warm.stream("greeting", synth(calls))])
+
+    cold = TTSCache(disk_dir=str(tmp_path), metrics=PipelineMetrics())
+    replay = b"".join([bytes(c) async for c in cold.stream("greeting", synth(calls))])
+    assert replay == audio and len(calls) == 1
+    assert cold.metrics.counter('voice_tts_cache_total', outcome='hit', tier='disk') == 1
+    assert cold.stats()['disk_bytes'] == len(audio)
+
+
+@pytest.mark.asyncio
+async def test_disk_writes_run_off_loop_but_bookkeeping_stays_on_it(tmp_path, monkeypatch):
+    import threading
+    cache = TTSCache(disk_dir=str(tmp_path), max_disk_bytes=20_000, metrics=PipelineMetrics())
+    threads = {'write': set(), 'index': set()}
+    write, add = cache._write_file, cache._add_disk
+
+    def tracked_write(key, audio):
+        threads['write'].add(threading.current_thread())
+        return write(key, audio)
+
+    def tracked_add(key, size):
+        threads['index'].add(threading.current_thread())
+        add(key, size)
+
+    monkeypatch.setattr(cache, "_write_file", tracked_write)
+    monkeypatch.setattr(cache, "_add_disk", tracked_add)
+
+    async def play(key):
+        return b"".join([bytes(c) async for c in cache.stream(key, synth([]))])
+
+    await asyncio.gather(*(play(f"phrase-{i}") for i in range(8)), play("phrase-0"))
+    assert threads['index'] == {threading.main_thread()}
+    assert threading.main_thread() not in threads['write']
+    on_disk = sorted(p.name[:-4] for p in tmp_path.glob("*.pcm"))
+    assert sorted(cache._disk) == on_disk and len(on_disk) == 3  # 6000-byte phrases, 20 kB cap
+    assert cache.disk_bytes == sum(p.stat().st_size for p in tmp_path.glob("*.pcm"))
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,70 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from audio_processing.metrics import PipelineMetrics
+from audio_processing.vad import VADBatcher, VADStream, frame_rms
+
+
+class LoudnessModel:
+    """Stands in for the ONNX model: probability from window loudness, counts state updates."""
+    sample_rate, window, context = 16000, 512, 64
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def initial_state(self):
+        return np.zeros((2, 1, 128), dtype=np.float32)
+
+    def infer(self, windows, state):
+        self.batch_sizes.append(len(windows))
+        probs = (np.abs(windows).mean(axis=1) > 0.05).astype(np.float32)
+        return probs, state + 1
+
+
+def tone(samples=960, amplitude=8000):
+    return (np.sin(np.arange(samples) / 8.0) * amplitude).astype(np.int16)
+
+
+def test_frame_rms_is_vectorized():
+    frames = np.stack([tone(), np.zeros(960, dtype=np.int16)])
+    rms = frame_rms(frames)
+    assert rms[0] == pytest.approx(8000 / np.sqrt(2), rel=0.01)
+    assert rms[1] == 0
+
+
+@pytest.mark.asyncio
+async def test_energy_only_stream():
+    vad = VADStream(48000, energy_threshold=500)
+    assert await vad.process(tone().tobytes())
+    assert not await vad.process(np.zeros(960, dtype=np.int16))
+
+
+@pytest.mark.asyncio
+async def test_one_inference_per_tick_across_calls():
+    model = LoudnessModel()
+    batcher = VADBatcher(model, max_batch=512, max_wait_ms=5, metrics=PipelineMetrics())
+    streams = [VADStream(48000, batcher=batcher) for _ in range(100)]
+
+    # 40 ms at 48 kHz -> 640 samples at 16 kHz -> one window per call
+    results = await asyncio.gather(*(s.process(tone(1920)) for s in streams))
+    assert all(results)
+    assert model.batch_sizes == [100]
+    assert all(float(s._state.max()) == 1.0 for s in streams)
+
+    quiet = await asyncio.gather(*(s.process(np.zeros(1920, dtype=np.int16)) for s in streams))
+    assert not any(quiet)
+    assert model.batch_sizes == [100]  # energy gate skipped the model entirely
+    assert batcher.metrics.counter('voice_vad_windows_total') == 100
+
+
+@pytest.mark.asyncio
+async def test_max_wait_bounds_single_call_latency():
+    model = LoudnessModel()
+    batcher = VADBatcher(model, max_batch=512, max_wait_ms=10, metrics=PipelineMetrics())
+    stream = VADStream(48000, batcher=batcher)
+
+    start = time.perf_counter()
+    await stream.process(tone(1920))
+    assert time.perf_counter() - start < 0.5
+    assert model.batch_sizes == [1]
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from audio_processing.metrics import PipelineMetrics
+from cost_optimization.complexity import ComplexityEstimator, ComplexityRouter, RoutingLog
+from cost_optimization.control import CostController
+
+
+def test_estimator_separates_simple_and_complex_turns():
+    estimator = ComplexityEstimator()
+    simple = ["What is my balance?", "Thanks, bye", "How do I reset my password?"]
+    complex_ = ["Can you explain why my invoice doubled compared to last month and whether I should switch plans?",
+                "My API integration keeps returning an error after the migration, what should I check?"]
+    assert max(estimator.estimate(t) for t in simple) < 50 <= min(estimator.estimate(t) for t in complex_)
+    # Depth and weak retrieval push borderline turns up
+    text = "When is my next payment due?"
+    assert estimator.estimate(text, depth=10, retrieval_confidence=0.1) > estimator.estimate(text)
+
+
+def test_controller_routes_turns_to_small_and_large_models():
+    controller = CostController()
+    controller.router = ComplexityRouter(controller.select_model, log=RoutingLog(), metrics=PipelineMetrics())
+    assert controller.route_model("s1", "What is my balance?") == "gpt-4o-mini"
+    assert controller.route_model("s2", "Why was I charged twice, and can you explain the refund policy?") == "gpt-4o"
+
+
+def test_decisions_are_cached_and_sticky_per_session(tmp_path):
+    path = tmp_path / "routes.jsonl"
+    metrics = PipelineMetrics()
+    router = ComplexityRouter(CostController().select_model, log=RoutingLog(str(path), batch=100),
+                              sticky_turns=1, metrics=metrics)
+
+    first = router.route("s1", "Explain the difference between your business and enterprise plans")
+    assert first.model == "gpt-4o" and first.reason == "score"
+    again = router.route("s1", "explain the difference between your  business and enterprise plans")
+    assert again.reason == "cached" and again.turn == first.turn
+
+    follow_up = router.route("s1", "When does it take effect?")
+    assert (follow_up.model, follow_up.reason) == ("gpt-4o", "sticky")
+    assert router.route("s1", "When does the next one start?").model == "gpt-4o-mini"
+    assert router.route("s2", "When does it take effect?").model == "gpt-4o-mini"  # other session
+
+    router.record_outcome("s1", follow_up, turn_ms=820.0, completed=True)
+    router.record_outcome("s1", None, turn_ms=40.0, completed=True, cached=True)  # no route this turn
+    router.end_session("s1")
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r['type'] for r in records] == ['route'] * 4 + ['outcome', 'unrouted']
+    assert records[-2]['turn'] == 2 and records[-2]['model'] == "gpt-4o" and records[-2]['completed'] is True
+    assert 'turn' not in records[-1] and records[-1]['cached'] is True
+    assert metrics.counter('voice_model_routes_total', model='gpt-4o', reason='sticky') == 1
+
+
+def test_peek_does_not_commit_a_turn():
+    log = RoutingLog()
+    router = ComplexityRouter(CostController().select_model, log=log, sticky_turns=1, metrics=PipelineMetrics())
+    router.route("s1", "Explain the difference between your business and enterprise plans")
+    peeked = router.peek("s1", "When does it take effect?")
+    assert (peeked.model, peeked.reason, peeked.turn) == ("gpt-4o", "sticky", 2)
+    assert router.peek("s1", "When does it take effect?") == peeked  # sticky follow-up not spent
+    assert len(log.recent) == 1 and router._sessions["s1"].turns == 1
+    assert router.peek("s9", "What is my balance?").model == "gpt-4o-mini" and "s9" not in router._sessions
+
+    committed = router.route("s1", "When does it take effect?")
+    assert (committed.model, committed.reason, committed.turn) == ("gpt-4o", "sticky", 2)
+    assert len(log.recent) == 2
+
+
+@pytest.mark.asyncio
+async def test_speculation_peeks_and_final_transcript_commits():
+    from audio_processing.voice_pipeline import VoicePipeline
+    router = ComplexityRouter(CostController().select_model, log=RoutingLog(), metrics=PipelineMetrics())
+    pipeline = VoicePipeline({'tts_cache': False}, metrics=PipelineMetrics())
+    pipeline.model_router = lambda text, commit=True: (router.route if commit else router.peek)("s1", text).model
+
+    for _ in range(3):
+        pipeline.on_partial("what is my balance")
+    assert pipeline.speculation.run is not None and "s1" not in router._sessions
+    async for _ in pipeline.respond("what is my balance"):
+        pass
+    assert router._sessions["s1"].turns == 1 and pipeline.speculation.stats()['hits'] == 1
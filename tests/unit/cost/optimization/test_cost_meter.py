@@ -0,0 +1,111 @@
+import pytest
+
+from audio_processing.metrics import PipelineMetrics
+from audio_processing.voice_pipeline import VoicePipeline
+from cost_optimization.budget import InMemoryBudgetStore, TokenBudget
+from cost_optimization.control import CostController
+from cost_optimization.cost_meter import CostMeter, UsageMeterSink
+from cost_optimization.kill_switch import KillSwitch
+
+
+@pytest.mark.asyncio
+async def test_live_cost_and_batched_flush():
+    rows = []
+
+    async def sink(batch):
+        rows.extend(batch)
+
+    meter = CostMeter(sink, metrics=PipelineMetrics())
+    call = meter.open_call("room:track", "acme")
+    for _ in range(100):
+        call.stt(0.5)
+        call.llm("gpt-4o-mini", 40, 10)
+        call.tts(30)
+
+    expected = (50 * meter.rates['stt_second'] + (4000 * 0.00015 + 1000 * 0.0006) / 1000
+                + 3000 * meter.rates['tts_char'])
+    assert meter.live_cost("room:track") == pytest.approx(expected)
+    assert meter.tenant_cost("acme") == pytest.approx(expected)
+    assert len(meter.events) == 400
+
+    assert await meter.flush() == 4  # one row per (call, metric, model)
+    by_metric = {r['metric']: r for r in rows}
+    assert by_metric['llm_prompt_tokens']['value'] == 4000
+    assert by_metric['llm_prompt_tokens']['model'] == "gpt-4o-mini"
+    assert by_metric['tts_characters']['value'] == 3000
+    assert sum(r['cost'] for r in rows) == pytest.approx(expected)
+    assert not meter.events
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried():
+    attempts = []
+
+    async def sink(batch):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            raise ConnectionError("billing down")
+
+    meter = CostMeter(sink, metrics=PipelineMetrics())
+    meter.open_call("c1", "acme").tts(10)
+    assert await meter.flush() == 0
+    meter.open_call("c2", "acme").tts(10)
+    assert await meter.flush() == 2
+    assert attempts == [1, 2] and meter.stats['errors'] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_backlog_is_capped_while_billing_is_down():
+    async def sink(batch):
+        raise ConnectionError("billing down")
+
+    metrics = PipelineMetrics()
+    meter = CostMeter(sink, max_retry_rows=3, metrics=metrics)
+    for i in range(5):
+        meter.open_call(f"c{i}", "acme").tts(10)
+        assert await meter.flush() == 0
+    assert [row['call_id'] for row in meter._retry] == ["c2", "c3", "c4"]
+    assert meter.stats['dropped'] == 2 and metrics.counter('voice_cost_rows_dropped_total') == 2
+
+
+@pytest.mark.asyncio
+async def test_usage_meter_sink_stores_model_and_cost():
+    import json
+    fakeredis = pytest.importorskip("fakeredis")
+    usage_metering = pytest.importorskip("business.revenue_operations.usage_metering")  # psycopg, pandas
+
+    usage_meter = usage_metering.UsageMeter("redis://localhost:6379/0", "postgresql://localhost/billing")
+    usage_meter.redis_conn, usage_meter.producer = fakeredis.FakeRedis(), None
+    meter = CostMeter(UsageMeterSink(usage_meter), metrics=PipelineMetrics())
+    call = meter.open_call("c1", "acme")
+    call.llm("gpt-4o-mini", 40, 10)
+    call.llm("gpt-4o", 20, 5)
+    assert await meter.flush() == 4
+
+    points = [json.loads(p) for p in usage_meter.redis_conn.lrange("usage:acme:llm_prompt_tokens", 0, -1)]
+    by_model = {p['tags']['model']: p for p in points}
+    assert by_model['gpt-4o-mini']['value'] == "40" and by_model['gpt-4o']['value'] == "20"
+    assert float(by_model['gpt-4o-mini']['tags']['cost_usd']) == pytest.approx(40 * 0.00015 / 1000)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_meters_turn_and_cap_applies_mid_call():
+    meter = CostMeter(metrics=PipelineMetrics())
+    controller = CostController(budget=TokenBudget(InMemoryBudgetStore()), kill_flags=KillSwitch(),
+                                cost_meter=meter)
+    pipeline = VoicePipeline({'speculative_llm': False, 'tts_cache': False})
+    call = meter.open_call("call", "acme")
+    other = meter.open_call("other", "acme")
+
+    async for _ in pipeline.respond("why is my invoice higher this month", call):
+        pass
+    usage = call.usage
+    assert usage['llm_prompt_tokens'] > 0 and usage['llm_completion_tokens'] > 0
+    assert 0 < usage['tts_characters'] <= len(pipeline.last_response)  # segments are stripped
+    assert controller.within_cap("acme")
+
+    assert other.cost == 0  # a second call on the same pipeline is metered separately
+
+    call.llm("gpt-4o", 0, 10_100_000)  # runaway generation, $101
+    assert not controller.within_cap("acme")
+    assert controller.within_cap("globex")
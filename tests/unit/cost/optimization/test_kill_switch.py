@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from audio_processing.metrics import PipelineMetrics
+from cost_optimization.control import CostController
+from cost_optimization.kill_switch import GLOBAL, KillSwitch, LocalBus
+
+
+@pytest.mark.asyncio
+async def test_tenant_and_global_flags_reach_every_worker():
+    bus = LocalBus()
+    workers = [KillSwitch(bus, metrics=PipelineMetrics()) for _ in range(3)]
+    seen = []
+    for w in workers:
+        await w.start()
+    workers[2].on_change(lambda scope, reason: seen.append((scope, reason)))
+
+    await workers[0].activate("acme", "runaway spend")
+    await asyncio.sleep(0.01)
+    assert all(w.killed("acme") == "runaway spend" for w in workers)
+    assert all(w.killed("globex") is None for w in workers)
+
+    await workers[1].activate(reason="provider incident")
+    await asyncio.sleep(0.01)
+    assert all(w.killed("globex") == "provider incident" for w in workers)
+
+    await workers[0].clear()
+    await workers[0].clear("acme")
+    await asyncio.sleep(0.01)
+    assert all(w.killed("acme") is None for w in workers)
+    assert seen == [("acme", "runaway spend"), (GLOBAL, "provider incident"), (GLOBAL, None), ("acme", None)]
+    for w in workers:
+        await w.close()
+
+
+@pytest.mark.asyncio
+async def test_late_worker_loads_current_flags():
+    bus = LocalBus()
+    await KillSwitch(bus, metrics=PipelineMetrics()).activate("acme", "over budget")
+    late = KillSwitch(bus, metrics=PipelineMetrics())
+    await late.start()
+    assert late.killed("acme") == "over budget"
+    await late.close()
+
+
+@pytest.mark.asyncio
+async def test_missed_message_is_recovered_by_resync():
+    class LossyBus(LocalBus):
+        async def publish(self, message):
+            self.state[message['scope']] = message['reason']  # stored, never delivered
+
+    bus = LossyBus()
+    worker = KillSwitch(bus, resync_s=0.05, metrics=PipelineMetrics())
+    await worker.start()
+    await KillSwitch(bus, metrics=PipelineMetrics()).activate("acme", "incident")
+    assert worker.killed("acme") is None
+    await asyncio.sleep(0.12)
+    assert worker.killed("acme") == "incident"
+    await worker.close()
+
+
+@pytest.mark.asyncio
+async def test_controller_kill_switch_sets_fleet_flag():
+    controller = CostController(kill_flags=KillSwitch(LocalBus(), metrics=PipelineMetrics()))
+    assert controller.is_killed("acme") is None
+    await controller.kill_switch("acme")
+    assert controller.is_killed("acme") == "cost overrun"
@@ -0,0 +1,109 @@
+import pytest
+
+from audio_processing.metrics import PipelineMetrics
+from cost_optimization.control import CostController
+from cost_optimization.semantic_cache import SemanticCache, VectorIndex
+
+
+class CountingEmbedder:
+    """HashingEmbedder stand-in that counts embed calls."""
+    def __init__(self):
+        from cost_optimization.semantic_cache import HashingEmbedder
+        self.inner = HashingEmbedder()
+        self.dim = self.inner.dim
+        self.default_threshold = self.inner.default_threshold
+        self.calls = 0
+
+    async def embed(self, texts):
+        self.calls += 1
+        return await self.inner.embed(texts)
+
+
+@pytest.mark.asyncio
+async def test_paraphrase_hits_and_exact_match_skips_embedding():
+    embedder = CountingEmbedder()
+    metrics = PipelineMetrics()
+    controller = CostController(SemanticCache(embedder, threshold=0.8, metrics=metrics))
+
+    assert await controller.semantic_cache_check("What is my account balance?", "acme") is None
+    await controller.semantic_cache_store("What is my account balance?", "Your balance is in the app.", "acme")
+
+    calls = embedder.calls
+    assert await controller.semantic_cache_check("what is my account balance", "acme") == \
+        "Your balance is in the app."
+    assert embedder.calls == calls  # normalized exact match
+
+    assert await controller.semantic_cache_check("What's my account balance?", "acme") == \
+        "Your balance is in the app."
+    assert await controller.semantic_cache_check("What is your refund policy?", "acme") is None
+    assert metrics.counter('voice_semantic_cache_total', tenant='acme', outcome='semantic') == 1
+
+
+@pytest.mark.asyncio
+async def test_default_cache_is_exact_and_keyed_by_context():
+    cache = SemanticCache(metrics=PipelineMetrics())
+    await cache.store_response("acme", "I want to cancel my subscription", "Cancelled.")
+    await cache.store_response("acme", "Book me for Tuesday at 3pm", "Booked Tuesday 3pm.")
+    assert await cache.lookup("acme", "I don't want to cancel my subscription") is None
+    assert await cache.lookup("acme", "Book me for Thursday at 3pm") is None
+    assert await cache.lookup("acme", "book me for tuesday at 3pm") == "Booked Tuesday 3pm."
+
+    await cache.store_response("acme", "yes", "Great, I have cancelled your policy.",
+                               context="Shall I cancel your policy?")
+    assert await cache.lookup("acme", "yes") is None
+    assert await cache.lookup("acme", "yes", context="Would you like a receipt?") is None
+    assert await cache.lookup("acme", "yes", context="Shall I cancel your policy?") is not None
+
+
+@pytest.mark.asyncio
+async def test_tenants_are_isolated():
+    cache = SemanticCache(metrics=PipelineMetrics())
+    await cache.store_response("acme", "How do I reset my password?", "Use the reset link.")
+    assert await cache.lookup("globex", "How do I reset my password?") is None
+    assert await cache.lookup("acme", "How do I reset my password?") == "Use the reset link."
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(monkeypatch):
+    import cost_optimization.semantic_cache as module
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    cache = SemanticCache(ttl_s=60, metrics=PipelineMetrics())
+    await cache.store_response("acme", "What are your opening hours?", "Nine to five.")
+    now[0] += 30
+    assert await cache.lookup("acme", "What are your opening hours?") == "Nine to five."
+    now[0] += 31
+    assert await cache.lookup("acme", "What are your opening hours?") is None
+
+
+def test_lru_and_lfu_eviction():
+    import numpy as np
+    vec = np.eye(4, dtype=np.float32)
+
+    lru = VectorIndex(4, capacity=2, ttl_s=3600, policy='lru')
+    lru.insert("a", vec[0], "A", now=1.0)
+    lru.insert("b", vec[1], "B", now=2.0)
+    lru.touch(lru.exact["a"], now=3.0)
+    lru.insert("c", vec[2], "C", now=4.0)
+    assert set(lru.exact) == {"a", "c"}
+
+    lfu = VectorIndex(4, capacity=2, ttl_s=3600, policy='lfu')
+    lfu.insert("a", vec[0], "A", now=1.0)
+    lfu.insert("b", vec[1], "B", now=2.0)
+    for t in (3.0, 4.0):
+        lfu.touch(lfu.exact["a"], now=t)
+    lfu.touch(lfu.exact["b"], now=5.0)
+    lfu.insert("c", vec[2], "C", now=6.0)
+    assert set(lfu.exact) == {"a", "c"}
+    assert lfu.search(vec[2], 0.9, now=7.0) == lfu.exact["c"]
+
+
+def test_index_grows_up_to_capacity():
+    import numpy as np
+    index = VectorIndex(8, capacity=100, ttl_s=3600)
+    for i in range(100):
+        v = np.zeros(8, dtype=np.float32)
+        v[i % 8] = 1.0
+        index.insert(f"q{i}", v, f"r{i}", now=float(i))
+    assert len(index.vectors) == 100 and index.size == 100 and index.evictions == 0
+    assert index.responses[index.exact["q5"]] == "r5"